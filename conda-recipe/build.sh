@@ -8,10 +8,10 @@ pushd $SRC_DIR/build
 export FC=gfortran
 export FFLAGS="-Ofast -ffree-line-length-512"
 
-$PYTHON -m numpy.f2py -c --quiet -m _outer $SRC_DIR/src/lightcones/outer.f90 --backend meson
-$PYTHON -m numpy.f2py -c --quiet -m _solve $SRC_DIR/src/lightcones/solvers/schrodinger/solve.f90 --backend meson
+$PYTHON -m numpy.f2py -c --quiet -m _outer $SRC_DIR/src/lightcones/outer.f90 --backend meson -I$SRC_DIR/src/lightcones
+$PYTHON -m numpy.f2py -c --quiet -m _solve $SRC_DIR/src/lightcones/solvers/schrodinger/solve.f90 --backend meson -I$SRC_DIR/src/lightcones/solvers/schrodinger
 $PYTHON -m numpy.f2py -c --quiet -m _dlancz $SRC_DIR/src/lightcones/linalg/dlancz.f --backend meson
-$PYTHON -m numpy.f2py -c --quiet -m _fastmul $SRC_DIR/src/lightcones/linalg/fastmul.f90 --backend meson
+$PYTHON -m numpy.f2py -c --quiet -m _fastmul $SRC_DIR/src/lightcones/linalg/fastmul.f90 --backend meson --dep openmp -I$SRC_DIR/src/lightcones/linalg
 
 cp _outer.*.so $SRC_DIR/lightcones
 cp _solve.*.so $SRC_DIR/lightcones/solvers/schrodinger
@@ -3,6 +3,7 @@ import lightcones.linalg as la
 from scipy.linalg import eig
 from scipy.linalg import expm
 from lightcones.solvers.schrodinger import solve
+from lightcones.solvers.schrodinger import solve_chebyshev
 
 def spread(e, h, nt, dt):
     """
@@ -28,13 +29,9 @@ def spread(e, h, nt, dt):
     # Here we store the propagated orbitals (the spread)
     phi_lc = np.zeros((n_sites, nt), dtype = np.cdouble) 
 
-    def apply_h(ti, phi_in, phi_out):
-        la.mv(H, phi_in, phi_out, cout=1)
-
-    def eval_o(ti, phi):
-        phi_lc[:, ti] = phi
-    
-    solve(0, nt-1, dt, apply_h, phi_0, eval_o = eval_o)
+    # the Hamiltonian is time-independent:
+    # propagate by large Chebyshev steps with the output on the fine grid
+    solve_chebyshev(0, nt-1, dt, H, phi_0, out = phi_lc)
     
     return phi_lc
 
@@ -9,7 +9,9 @@ from scipy.sparse import coo_matrix
 from scipy.sparse import identity
 from scipy.sparse import diags
 import warnings
+import lightcones.linalg as la
 from ._outer import outer
+from ._outer import outer_i8
 
 
 # this class enumrates retained basis vectors for the Fock space
@@ -273,6 +275,10 @@ class space:
         
         return self.outer_index(ket, bra, mode)
     
+    # matrix-free operator (see matrix_free_operator)
+    def matrix_free(self, quadratic = None, lowering = None, raising = None):
+        return matrix_free_operator(self, quadratic, lowering, raising)
+    
     def local_projections_f(self, f, m_max, n_max, id_s):
         
         from scipy.sparse import csc_matrix
@@ -299,12 +305,20 @@ class space:
             a_ = a[i]
             b_ = a_dag[i]
             
+            # the 64-bit kernel for the operators with int64 indices (passed without copying)
+            if a_.indptr.dtype == np.int64:
+                outer_kernel, index_dtype = outer_i8, np.int64
+            else:
+                outer_kernel, index_dtype = outer, np.int32
+            o_ind = o_ind.astype(index_dtype, copy = False)
+            o = o.astype(index_dtype)
+            
             mode_op = [[] for l in range(self.local_dim)]
             
             for p in range(self.local_dim):
                 for q in range(self.local_dim):
                     
-                    outer(a_.data, a_.indices, a_.indptr, \
+                    outer_kernel(a_.data, a_.indices, a_.indptr, \
                         b_.data, b_.indices, b_.indptr, \
                             o_data, o_ind, o, p, q)
 
@@ -382,8 +396,14 @@ class space:
         psi[0] = 1.0
         return psi
     
+# lazy: the annihilation, creation (and angular momentum) operators, eye, zero_op and
+#       the Pauli matrices are linalg.kron_operator, which are applied without assembling
+#       the Kronecker products (tocsc() materializes them) and can be summed with each other
 class space_kron:
-    def __init__(self, f1, f2):
+    def __init__(self, f1, f2, lazy = False):
+        
+        self.lazy = lazy
+        kron = self.kron
 
         self.f1 = f1
         self.f2 = f2
@@ -395,10 +415,13 @@ class space_kron:
         self.dimension  = f1.dimension * f2.dimension
 
         #3)
-        self.zero_op= coo_matrix((self.dimension , self.dimension ), dtype = complex).tocsc()
+        if lazy:
+            self.zero_op = la.kron_operator([(0, f1.eye, f2.eye)])
+        else:
+            self.zero_op= coo_matrix((self.dimension , self.dimension ), dtype = complex).tocsc()
 
         #4)
-        self.eye = sparse.eye(self.dimension).tocsc()
+        self.eye = kron(f1.eye, f2.eye) if lazy else sparse.eye(self.dimension).tocsc()
        
         self.max_total_occupation = max(f1.max_total_occupation, f2.max_total_occupation)
         self.max_local_occupation = None
@@ -424,16 +447,16 @@ class space_kron:
             self.annihilate=[]
         
             for k in range(f1.modes):
-                self.annihilate.append(sparse.kron(f1.annihilate[k], f2.eye).tocsc())
+                self.annihilate.append(kron(f1.annihilate[k], f2.eye))
             for k in range(f1.modes, self.modes):
-                self.annihilate.append(sparse.kron(self.parity_f1, f2.annihilate[k-f1.modes]).tocsc())
+                self.annihilate.append(kron(self.parity_f1, f2.annihilate[k-f1.modes]))
         #6)
             self.create=[]
         
             for k in range(f1.modes):
-                self.create.append(sparse.kron(f1.create[k], f2.eye).tocsc())
+                self.create.append(kron(f1.create[k], f2.eye))
             for k in range(f1.modes, self.modes):
-                self.create.append(sparse.kron(self.parity_f1, f2.create[k-f1.modes]).tocsc())
+                self.create.append(kron(self.parity_f1, f2.create[k-f1.modes]))
         
         else:
             
@@ -441,39 +464,39 @@ class space_kron:
             self.annihilate=[]
         
             for k in range(f1.modes):
-                self.annihilate.append(sparse.kron(f1.annihilate[k], f2.eye).tocsc())
+                self.annihilate.append(kron(f1.annihilate[k], f2.eye))
             for k in range(f1.modes, self.modes):
-                self.annihilate.append(sparse.kron(f1.eye, f2.annihilate[k-f1.modes]).tocsc())
+                self.annihilate.append(kron(f1.eye, f2.annihilate[k-f1.modes]))
         #6)
             self.create=[]
         
             for k in range(f1.modes):
-                self.create.append(sparse.kron(f1.create[k], f2.eye).tocsc())
+                self.create.append(kron(f1.create[k], f2.eye))
             for k in range(f1.modes, self.modes):
-                self.create.append(sparse.kron(f1.eye, f2.create[k-f1.modes]).tocsc())
+                self.create.append(kron(f1.eye, f2.create[k-f1.modes]))
                 
         #7)
         if f1.statistics=='Bose':
             
             self.j_m=[]
             for k in range(f1.modes):
-                self.j_m.append(sparse.kron(f1.j_m[k], f2.eye).tocsc())
+                self.j_m.append(kron(f1.j_m[k], f2.eye))
                 
             self.j_p=[]
             for k in range(f1.modes):
-                self.j_p.append(sparse.kron(f1.j_p[k], f2.eye).tocsc())
+                self.j_p.append(kron(f1.j_p[k], f2.eye))
                 
             self.j_x=[]
             for k in range(f1.modes):
-                self.j_x.append(sparse.kron(f1.j_x[k], f2.eye).tocsc())
+                self.j_x.append(kron(f1.j_x[k], f2.eye))
                 
             self.j_y=[]
             for k in range(f1.modes):
-                self.j_y.append(sparse.kron(f1.j_y[k], f2.eye).tocsc())
+                self.j_y.append(kron(f1.j_y[k], f2.eye))
             
             self.j_z=[]
             for k in range(f1.modes):
-                self.j_z.append(sparse.kron(f1.j_z[k], f2.eye).tocsc())
+                self.j_z.append(kron(f1.j_z[k], f2.eye))
         
             self.j = np.copy(f1.j)
             
@@ -500,6 +523,10 @@ class space_kron:
             return self.outer_list(ket, bra, mode)
         
         return self.outer_index(ket, bra, mode)
+    
+    # matrix-free operator (see matrix_free_operator)
+    def matrix_free(self, quadratic = None, lowering = None, raising = None):
+        return matrix_free_operator(self, quadratic, lowering, raising)
         
     def local_projections_f(self, f, m_max, n_max, id_s):
         
@@ -524,15 +551,24 @@ class space_kron:
             
             o = np.array([f.occupations(j)[i] for j in range(self.K)])
             
-            a_ = a[i]
-            b_ = a_dag[i]
+            # the lazy operators are materialized one mode at a time
+            a_ = a[i].tocsc() if isinstance(a[i], la.kron_operator) else a[i]
+            b_ = a_dag[i].tocsc() if isinstance(a_dag[i], la.kron_operator) else a_dag[i]
+            
+            # the 64-bit kernel for the operators with int64 indices (passed without copying)
+            if a_.indptr.dtype == np.int64:
+                outer_kernel, index_dtype = outer_i8, np.int64
+            else:
+                outer_kernel, index_dtype = outer, np.int32
+            o_ind = o_ind.astype(index_dtype, copy = False)
+            o = o.astype(index_dtype)
             
             mode_op = [[] for l in range(self.local_dim)]
             
             for p in range(self.local_dim):
                 for q in range(self.local_dim):
                     
-                    outer(a_.data, a_.indices, a_.indptr, \
+                    outer_kernel(a_.data, a_.indices, a_.indptr, \
                         b_.data, b_.indices, b_.indptr, \
                             o_data, o_ind, o, p, q)
 
@@ -549,28 +585,32 @@ class space_kron:
         
         return local_ops
             
+    # Kronecker product of the operators a of f1 and b of f2 (a linalg.kron_operator if lazy)
+    def kron(self, a, b):
+        return la.kron_operator([(1, a, b)]) if self.lazy else sparse.kron(a, b).tocsc()
+
     # sigma_x Pauli matrix
     def sigma_x(self, i):
         if (i<self.f1.modes):
-             return(sparse.kron(self.f1.sigma_x(i), self.f2.eye).tocsc())
+             return(self.kron(self.f1.sigma_x(i), self.f2.eye))
         else:
-            return(sparse.kron(self.f1.eye, self.f2.sigma_x(i-self.f1.modes)).tocsc())
+            return(self.kron(self.f1.eye, self.f2.sigma_x(i-self.f1.modes)))
 
     # sigma_y Pauli matrix
     def sigma_y(self, i):
        
         if (i<self.f1.modes):
-             return(sparse.kron(self.f1.sigma_y(i), self.f2.eye).tocsc())
+             return(self.kron(self.f1.sigma_y(i), self.f2.eye))
         else:
-            return(sparse.kron(self.f1.eye, self.f2.sigma_y(i-self.f1.modes)).tocsc())
+            return(self.kron(self.f1.eye, self.f2.sigma_y(i-self.f1.modes)))
 
     # sigma_z Pauli matrix    
     def sigma_z(self, i):
         
         if (i<self.f1.modes):
-             return(sparse.kron(self.f1.sigma_z(i), self.f2.eye).tocsc())
+             return(self.kron(self.f1.sigma_z(i), self.f2.eye))
         else:
-            return(sparse.kron(self.f1.eye, self.f2.sigma_z(i-self.f1.modes)).tocsc())
+            return(self.kron(self.f1.eye, self.f2.sigma_z(i-self.f1.modes)))
     
     # raising Pauli matrix
     def sigma_p(self, i):
@@ -599,6 +639,28 @@ class space_kron:
             s = list(state)
             return(self.f1.index(state[:self.f1.modes]) * self.f2.dimension + self.f2.index(state[self.f1.modes:]))
         
+# matrix-free operator (linalg.indexmap) of the fock space f (space or space_kron)
+#   sum c * create[q] @ annihilate[p] for (c, q, p) in quadratic
+# + sum c * annihilate[p] for (c, p) in lowering
+# + sum c * create[q] for (c, q) in raising
+# which is applied by linalg.mv and accepted by solve without building the matrices of the terms:
+# the index maps of the annihilation and creation operators are computed on the first call
+# and shared by all the matrix-free operators of the space, so that the memory is
+# O(dimension * modes) for any number of the quadratic terms
+# (None stands for no terms of the kind)
+def matrix_free_operator(f, quadratic, lowering, raising):
+    if quadratic is None:
+        quadratic = []
+    if lowering is None:
+        lowering = []
+    if raising is None:
+        raising = []
+    if getattr(f, 'index_maps', None) is None:
+        f.index_maps = la.indexmap([m.tocsc() if isinstance(m, la.kron_operator) else m for m in f.annihilate + f.create], [])
+    m = f.modes
+    terms = [(c, p, m + q) for c, q, p in quadratic] + [(c, p) for c, p in lowering] + [(c, m + q) for c, q in raising]
+    return la.indexmap(f.index_maps, terms)
+
 def real_time_solver(psi0, dt, tmax, H, Q = None, final_state = None):
     K = psi0.size
     Nt = int(tmax/dt)+1
@@ -9,9 +9,16 @@ __all__ = [
     'find_smallest_eigs', 
     'find_eigs_ascending', 
     'find_eigs_descending', 
-    'kron'
+    'kron',
+    'single',
+    'parametric',
+    'multiterm',
+    'indexmap',
+    'kron_operator',
+    'set_num_threads'
 ]
 
+import os
 import math
 import numpy as np
 import scipy.sparse
@@ -20,6 +27,23 @@ from scipy.linalg import eigh
 from typing import List
 from typing import Any
 from ._fastmul import fastmul
+from ._fastmul import fastmul_block
+from ._fastmul import fastmul_c
+from ._fastmul import fastmul_block_c
+from ._fastmul import fastmul_csr
+from ._fastmul import fastmul_block_csr
+from ._fastmul import fastmul_terms
+from ._fastmul import fastmul_block_terms
+from ._fastmul import fastmul_maps
+from ._fastmul import fastmul_block_maps
+from ._fastmul import fastmul_i8
+from ._fastmul import fastmul_block_i8
+from ._fastmul import fastmul_c_i8
+from ._fastmul import fastmul_block_c_i8
+from ._fastmul import fastmul_csr_i8
+from ._fastmul import fastmul_block_csr_i8
+from ._fastmul import fastmul_terms_i8
+from ._fastmul import fastmul_block_terms_i8
 from . import _dlancz
 
 def eye(m):
@@ -29,8 +53,388 @@ def eye(m):
 # vout = cin * m @ vin + cout * vout
 # using the fortran optimized code
 # (on intel compiler it is faster then numpy)
+# vin and vout can also be C-ordered blocks of shape (n, n_vec),
+# then m is applied to each of the n_vec columns in one pass over m;
+# complex64 vectors are multiplied in single precision
+# (m should then be converted by single to avoid copying its data);
+# for m in the CSR format (e.g. H.tocsr(), converted once, a csr_matrix or a csr_array) the rows are
+# distributed over num_threads OpenMP threads (see set_num_threads);
+# m can also be a multiterm sum of the matrices applied in one pass
+# or a matrix-free indexmap or kron_operator operator;
+# vout is written in place, so it should be C-contiguous, complex128 or complex64
+# (otherwise the compiled kernel would silently write to a converted copy);
+# vin is only read and is converted to the dtype of vout
 def mv(m, vin, vout, cin=1, cout=0):
-    fastmul(m.data, m.indices, m.indptr, cin, vin, cout, vout)
+    if not vout.flags.c_contiguous:
+        raise ValueError("vout should be C-contiguous")
+    if vout.dtype != complex and vout.dtype != np.complex64:
+        raise ValueError("vout should be a complex128 or complex64 array, got " + str(vout.dtype))
+    vin = np.asarray(vin, dtype = vout.dtype)
+    if isinstance(m, kron_operator):
+        m.apply(vin, vout, cin, cout)
+        return
+    if isinstance(m, indexmap):
+        if vin.dtype != complex:
+            raise ValueError("The indexmap product is implemented for complex128 vectors only")
+        if vin.ndim == 2:
+            fastmul_block_maps(m.coef, m.first, m.second, m.ind.T, m.w.T, cin, vin.T, cout, vout.T)
+        else:
+            fastmul_maps(m.coef, m.first, m.second, m.ind.T, m.w.T, cin, vin, cout, vout)
+        return
+    if isinstance(m, multiterm):
+        if vin.dtype != complex:
+            raise ValueError("The multiterm product is implemented for complex128 vectors only")
+        if vin.ndim == 2:
+            kernel(fastmul_block_terms, m)(m.coef, m.data, m.indices, m.indptr, cin, vin.T, cout, vout.T)
+        else:
+            kernel(fastmul_terms, m)(m.coef, m.data, m.indices, m.indptr, cin, vin, cout, vout)
+        return
+    if scipy.sparse.issparse(m) and m.format == 'csr':
+        if vin.dtype != complex:
+            raise ValueError("The multithreaded CSR product is implemented for complex128 vectors only")
+        if vin.ndim == 2:
+            kernel(fastmul_block_csr, m)(m.data, m.indices, m.indptr, cin, vin.T, cout, vout.T, num_threads)
+        else:
+            kernel(fastmul_csr, m)(m.data, m.indices, m.indptr, cin, vin, cout, vout, num_threads)
+        return
+    if vin.dtype == np.complex64:
+        if vin.ndim == 2:
+            kernel(fastmul_block_c, m)(m.data, m.indices, m.indptr, cin, vin.T, cout, vout.T)
+        else:
+            kernel(fastmul_c, m)(m.data, m.indices, m.indptr, cin, vin, cout, vout)
+        return
+    if vin.ndim == 2:
+        kernel(fastmul_block, m)(m.data, m.indices, m.indptr, cin, vin.T, cout, vout.T)
+        return
+    kernel(fastmul, m)(m.data, m.indices, m.indptr, cin, vin, cout, vout)
+
+# the 64-bit index versions of the compiled kernels
+wide_kernels = {fastmul: fastmul_i8, fastmul_block: fastmul_block_i8,
+                fastmul_c: fastmul_c_i8, fastmul_block_c: fastmul_block_c_i8,
+                fastmul_csr: fastmul_csr_i8, fastmul_block_csr: fastmul_block_csr_i8,
+                fastmul_terms: fastmul_terms_i8, fastmul_block_terms: fastmul_block_terms_i8}
+
+# check whether the sparse matrix (or multiterm) m has the 64-bit indices:
+# scipy switches indptr and indices to int64 when nnz does not fit into int32;
+# the indices are never converted silently (which would copy or truncate them),
+# so the other combinations of the dtypes are rejected
+def wide_indices(m):
+    if m.indices.dtype == np.int32 and m.indptr.dtype == np.int32:
+        return False
+    if m.indices.dtype == np.int64 and m.indptr.dtype == np.int64:
+        return True
+    raise ValueError("indices and indptr should be both int32 or both int64, got " +
+                     str(m.indices.dtype) + " and " + str(m.indptr.dtype))
+
+# the kernel k or its 64-bit index version, according to the indices of m
+def kernel(k, m):
+    return wide_kernels[k] if wide_indices(m) else k
+
+# integer dtype of the indices of the sparse matrix with nnz nonzero elements and n columns
+def index_dtype(nnz, n):
+    return np.int32 if max(nnz, n) <= np.iinfo(np.int32).max else np.int64
+
+# default number of the threads of the CSR product in mv: the first field
+# of OMP_NUM_THREADS (which may list the threads of the nested levels, e.g. '4,2')
+# or the number of the processors if it is not set, empty or invalid
+def default_num_threads():
+    try:
+        n = int(os.environ.get('OMP_NUM_THREADS', '').split(',')[0])
+    except ValueError:
+        n = 0
+    return n if n > 0 else os.cpu_count() or 1
+
+# number of the threads of the CSR product in mv
+num_threads = default_num_threads()
+
+def set_num_threads(n):
+    global num_threads
+    if n < 1:
+        raise ValueError("The number of threads should be positive, got " + str(n))
+    num_threads = n
+
+# single precision (complex64) copy of the CSC matrix m
+# for the single precision mode of mv and solve;
+# m can also be a list of matrices or of (coefficient, matrix) terms
+def single(m):
+    if isinstance(m, list):
+        return [single(t) for t in m]
+    if isinstance(m, tuple):
+        return (m[0], single(m[1]))
+    m = scipy.sparse.csc_matrix(m, dtype = np.complex64)
+    m.indices = m.indices.astype(index_dtype(m.nnz, m.shape[1]))
+    m.indptr = m.indptr.astype(m.indices.dtype)
+    return m
+
+# sum of the square sparse matrices H = sum_k coef[k] * m_k which is never assembled:
+# mv accumulates all the terms into vout in one pass over the columns
+# (vin is read once), and solve accepts it as the native Hamiltonian
+# terms: list of (c_k, m_k) with the numbers c_k and the sparse matrices m_k
+# self.coef: complex array of the coefficients, which can be changed in place
+#            (e.g. by begin_step of solve to drive a term); the next product uses the new values
+# self.data, self.indices, self.indptr: the CSC matrices m_k concatenated
+#            (self.indptr[:, k] are the column pointers of m_k shifted by its offset in self.data)
+class multiterm:
+    def __init__(self, terms):
+        mats = [scipy.sparse.csc_matrix(m, dtype = complex) for _, m in terms]
+        if len(mats) == 0:
+            raise ValueError("multiterm needs at least one term")
+        for m in mats:
+            if m.shape != mats[0].shape or m.shape[0] != m.shape[1]:
+                raise ValueError("Terms of the multiterm matrix should be square matrices of the same shape")
+
+        self.shape = mats[0].shape
+        self.coef = np.array([c for c, _ in terms], dtype = complex)
+        self.offsets = np.cumsum([0] + [m.nnz for m in mats])
+        self.data = np.concatenate([m.data[: m.nnz] for m in mats])
+        dtype = index_dtype(self.offsets[-1], self.shape[1])
+        self.indices = np.concatenate([m.indices[: m.nnz] for m in mats]).astype(dtype)
+        self.indptr = np.asfortranarray(np.column_stack([m.indptr.astype(dtype) + o for m, o in zip(mats, self.offsets)]), dtype = dtype)
+
+    # list of (coefficient, CSC matrix) terms sharing the data with this object
+    def terms(self):
+        return [(c, scipy.sparse.csc_matrix((self.data[o0 : o1], self.indices[o0 : o1], self.indptr[:, k] - o0), shape = self.shape))
+                for k, (c, o0, o1) in enumerate(zip(self.coef, self.offsets[: -1], self.offsets[1 :]))]
+
+# matrix-free operator H = sum_k coef[k] B_k A_k built from the weighted index maps:
+# a square sparse matrix with at most one nonzero real element in each column
+# (e.g. an annihilation or creation operator of fock.space) sends the basis vector i
+# to w[i] times the basis vector ind[i], so it is stored as the integer vector ind
+# (ind[i] = -1 if the column i is zero) and the real vector w; mv applies the terms
+# by following the maps, and solve accepts the operator as the Hamiltonian
+# (it is applied by mv through the callback)
+# maps: list of such matrices, or another indexmap whose maps are shared (not copied)
+# terms: list of (c_k, p) for the map maps[p] or (c_k, p, q) for the product maps[q] @ maps[p]
+# self.ind, self.w: C-ordered arrays of shape (dimension, number of maps), so that
+#           the memory is O(dimension * number of maps) whatever the number of the terms
+# self.coef: complex array of the coefficients, which can be changed in place
+#           (e.g. by begin_step of solve); the next product uses the new values
+class indexmap:
+    def __init__(self, maps, terms):
+        if isinstance(maps, indexmap):
+            self.shape, self.ind, self.w = maps.shape, maps.ind, maps.w
+        else:
+            mats = [scipy.sparse.csc_matrix(m, dtype = complex, copy = True) for m in maps]
+            if len(mats) == 0:
+                raise ValueError("indexmap needs at least one map")
+            for m in mats:
+                if m.shape != mats[0].shape or m.shape[0] != m.shape[1]:
+                    raise ValueError("Maps of the indexmap operator should be square matrices of the same shape")
+                m.sum_duplicates()
+                m.eliminate_zeros()
+                if np.any(np.diff(m.indptr) > 1) or np.any(m.data.imag != 0):
+                    raise ValueError("Maps of the indexmap operator should have at most one nonzero real element in each column")
+
+            self.shape = mats[0].shape
+            self.ind = np.full((self.shape[0], len(mats)), -1, dtype = np.int32)
+            self.w = np.zeros((self.shape[0], len(mats)))
+            for k, m in enumerate(mats):
+                cols = np.flatnonzero(np.diff(m.indptr))
+                self.ind[cols, k] = m.indices
+                self.w[cols, k] = m.data.real
+
+        n_maps = self.ind.shape[1]
+        for t in terms:
+            if not len(t) in [2, 3] or not all(0 <= p < n_maps for p in t[1 :]):
+                raise ValueError("Terms of the indexmap operator should be (c, p) or (c, p, q) with the map indices below " + str(n_maps))
+        self.coef = np.array([t[0] for t in terms], dtype = complex)
+        self.first = np.array([t[1] for t in terms], dtype = np.int32)
+        self.second = np.array([t[2] if len(t) == 3 else -1 for t in terms], dtype = np.int32)
+
+    # the explicit CSC matrix of the operator (e.g. for the methods which need it)
+    def tocsc(self):
+        n = self.shape[0]
+        rows, cols, data = [], [], []
+        for c, p, q in zip(self.coef, self.first, self.second):
+            col = np.flatnonzero(self.ind[:, p] >= 0)
+            row = self.ind[col, p]
+            x = c * self.w[col, p]
+            if q >= 0:
+                x = x * self.w[row, q]
+                row = self.ind[row, q]
+                keep = row >= 0
+                col, row, x = col[keep], row[keep], x[keep]
+            rows.append(row)
+            cols.append(col)
+            data.append(x)
+        if len(data) == 0:
+            return scipy.sparse.csc_matrix((n, n), dtype = complex)
+        m = scipy.sparse.coo_matrix((np.concatenate(data), (np.concatenate(rows), np.concatenate(cols))), shape = (n, n))
+        return m.tocsc()
+
+# CSC complex128 factor of kron_operator (m itself if it is already such)
+def kron_factor(m):
+    if isinstance(m, scipy.sparse.csc_matrix) and m.dtype == complex:
+        return m
+    return scipy.sparse.csc_matrix(m, dtype = complex)
+
+# check whether the CSC matrix m is the identity (stored in the canonical form)
+def is_identity(m):
+    n = m.shape[0]
+    return m.nnz == n and np.array_equal(m.indptr, np.arange(n + 1)) and \
+        np.array_equal(m.indices, np.arange(n)) and np.all(m.data == 1)
+
+# sum of the Kronecker products H = sum_k c_k A_k (x) B_k which is never assembled:
+# the state psi of size n_a * n_b is the matrix X of shape (n_a, n_b) (the index i_a * n_b + i_b,
+# as in kron), and (A (x) B) psi = A X B^T is computed by two sparse products with the factors,
+# so that the memory is that of the factors instead of nnz(A) * nnz(B)
+# (an identity factor, e.g. f.eye of a fock space, is not applied at all)
+# terms: list of (c_k, A_k, B_k) with the square sparse (or dense) matrices A_k
+#        of the same shape (n_a, n_a) and B_k of the same shape (n_b, n_b)
+# mv applies it (also to the blocks of vectors), and solve accepts it as the Hamiltonian
+# (it is applied by mv through the callback); the sums, the products with the numbers and
+# the products (A (x) B) @ (C (x) D) = (A @ C) (x) (B @ D) of the operators are kron_operator again,
+# op @ psi returns the product with the vector (or the block) psi,
+# and tocsc() materializes the operator
+# self.coef: complex array of the coefficients, which can be changed in place
+class kron_operator:
+    def __init__(self, terms):
+        if len(terms) == 0:
+            raise ValueError("kron_operator needs at least one term")
+        self.coef = np.array([c for c, _, _ in terms], dtype = complex)
+        self.a = [kron_factor(a) for _, a, _ in terms]
+        self.b = [kron_factor(b) for _, _, b in terms]
+        self.n_a = self.a[0].shape[0]
+        self.n_b = self.b[0].shape[0]
+        for a, b in zip(self.a, self.b):
+            if a.shape != (self.n_a, self.n_a) or b.shape != (self.n_b, self.n_b):
+                raise ValueError("Factors of the kron_operator terms should be square matrices of the same shapes")
+        self.shape = (self.n_a * self.n_b, self.n_a * self.n_b)
+        self.a_eye = [is_identity(a) for a in self.a]
+        self.b_eye = [is_identity(b) for b in self.b]
+
+    # vout = cin * H @ vin + cout * vout (see mv)
+    def apply(self, vin, vout, cin = 1, cout = 0):
+        if vin.dtype != complex:
+            raise ValueError("The kron_operator product is implemented for complex128 vectors only")
+        if vin.shape != vout.shape or vin.shape[0] != self.shape[0] or not vout.flags.c_contiguous:
+            raise ValueError("vin and vout should be of the same shape with " + str(self.shape[0]) + " rows, vout C-ordered")
+        n_vec = vin.size // self.shape[0]
+
+        if cout == 0:
+            vout[...] = 0
+        elif cout != 1:
+            vout *= cout
+
+        # the rows of x and y are the indices i_a, so that A is applied to them as to a block
+        x = np.ascontiguousarray(vin).reshape(self.n_a, self.n_b * n_vec)
+        y = vout.reshape(self.n_a, self.n_b * n_vec)
+        # the rows of xb are the indices i_b, so that B is applied to them as to a block
+        xb = None
+        for c, a, b, a_eye, b_eye in zip(self.coef, self.a, self.b, self.a_eye, self.b_eye):
+            t = x
+            if not b_eye:
+                if xb is None:
+                    xb = np.ascontiguousarray(x.reshape(self.n_a, self.n_b, n_vec).transpose(1, 0, 2)).reshape(self.n_b, -1)
+                    tb = np.zeros(xb.shape, dtype = complex)
+                mv(b, xb, tb)
+                t = np.ascontiguousarray(tb.reshape(self.n_b, self.n_a, n_vec).transpose(1, 0, 2)).reshape(self.n_a, -1)
+            if a_eye:
+                y += (cin * c) * t
+            else:
+                mv(a, t, y, cin = cin * c, cout = 1)
+
+    # the explicit CSC matrix of the operator
+    def tocsc(self):
+        return sum([c * scipy.sparse.kron(a, b, format = 'csc') for c, a, b in zip(self.coef, self.a, self.b)]).tocsc()
+
+    def __matmul__(self, other):
+        if isinstance(other, kron_operator):
+            if (other.n_a, other.n_b) != (self.n_a, self.n_b):
+                raise ValueError("kron_operator factors of different shapes")
+            def product(m1, eye1, m2, eye2):
+                return m2 if eye1 else m1 if eye2 else m1 @ m2
+            return kron_operator([(c1 * c2, product(a1, ae1, a2, ae2), product(b1, be1, b2, be2))
+                                  for c1, a1, b1, ae1, be1 in zip(self.coef, self.a, self.b, self.a_eye, self.b_eye)
+                                  for c2, a2, b2, ae2, be2 in zip(other.coef, other.a, other.b, other.a_eye, other.b_eye)])
+        if isinstance(other, np.ndarray):
+            vout = np.zeros(other.shape, dtype = complex)
+            self.apply(np.asarray(other, dtype = complex), vout)
+            return vout
+        return NotImplemented
+
+    def __add__(self, other):
+        # 0 + op for sum([...])
+        if np.isscalar(other) and other == 0:
+            return self
+        if not isinstance(other, kron_operator):
+            return NotImplemented
+        if (other.n_a, other.n_b) != (self.n_a, self.n_b):
+            raise ValueError("kron_operator factors of different shapes")
+        return kron_operator(list(zip(self.coef, self.a, self.b)) + list(zip(other.coef, other.a, other.b)))
+
+    __radd__ = __add__
+
+    def __sub__(self, other):
+        return self + (-1) * other
+
+    def __mul__(self, c):
+        if not np.isscalar(c):
+            return NotImplemented
+        return kron_operator([(c * ck, a, b) for ck, a, b in zip(self.coef, self.a, self.b)])
+
+    __rmul__ = __mul__
+
+    def __neg__(self):
+        return (-1) * self
+
+# time-dependent sparse matrix H(t) = sum_k c_k(t) O_k with a fixed sparsity pattern
+# terms: list of (c_k, O_k), where O_k is a sparse matrix and c_k is either a number
+#        or a function c_k(ti) of the time step
+# The union sparsity pattern of the terms is computed once, together with the positions
+# of the nonzero elements of each term in it, so that update(ti) or set(c) rewrites the data
+# of the CSC matrix self.m in place, in O(nnz_1 + ... + nnz_K) operations, without assembling
+# a new sparse matrix;
+# self.m is a complex128 CSC matrix (with int32 indices up to 2^31 - 1 nonzero elements), so it can be passed to mv or
+# to solve as the native Hamiltonian updated in place by begin_step.
+class parametric:
+    def __init__(self, terms):
+        self.coefficients = [c for c, _ in terms]
+        mats = [scipy.sparse.csc_matrix(o, dtype = complex) for _, o in terms]
+        for o in mats:
+            o.sum_duplicates()
+            if o.shape != mats[0].shape:
+                raise ValueError("Terms of the parametric matrix have different shapes")
+
+        # union sparsity pattern (the pattern matrices have positive elements, so nothing cancels)
+        pattern = sum([scipy.sparse.csc_matrix((np.ones(o.nnz), o.indices, o.indptr), shape = o.shape) for o in mats])
+        pattern = scipy.sparse.csc_matrix(pattern)
+        pattern.sort_indices()
+
+        n_rows = pattern.shape[0]
+        def keys(o):
+            cols = np.repeat(np.arange(o.shape[1], dtype = np.int64), np.diff(o.indptr))
+            return cols * n_rows + o.indices
+
+        # positions of the nonzero elements of each term in the union pattern
+        union_keys = keys(pattern)
+        self.positions = [np.searchsorted(union_keys, keys(o)) for o in mats]
+        self.data = [o.data for o in mats]
+
+        dtype = index_dtype(pattern.nnz, pattern.shape[1])
+        self.m = scipy.sparse.csc_matrix((np.zeros(pattern.nnz, dtype = complex),
+                                          pattern.indices.astype(dtype),
+                                          pattern.indptr.astype(dtype)), shape = pattern.shape)
+        self.c = np.zeros(len(mats), dtype = complex)
+
+    # rewrite the data of self.m in place by the coefficients self.c
+    # (the positions of a term are unique, so the fancy-indexed += is exact)
+    def scatter(self):
+        self.m.data[:] = 0
+        for c, positions, data in zip(self.c, self.positions, self.data):
+            self.m.data[positions] += c * data
+        return self.m
+
+    # set the coefficients c_k and rewrite the data of self.m in place
+    def set(self, c):
+        self.c[:] = c
+        return self.scatter()
+
+    # evaluate the coefficients at the time step ti and rewrite the data of self.m in place
+    def update(self, ti):
+        for k, c in enumerate(self.coefficients):
+            self.c[k] = c(ti) if callable(c) else c
+        return self.scatter()
 
 # lanczos algorithm
 def lancz(w, J, n = None):
@@ -144,31 +548,31 @@ def kron_sparse_dense(a, b):
 def kron_sparse_sparse(a, b):
     return scipy.sparse.kron(a, b, format = 'csc')
 
-def kron_list_sparse(a, b):
+def kron_list_sparse(a, b, lazy = False):
     kr = []
     n = len(a)
     for i in range(n):
-        kr.append(kron(a[i], b))
+        kr.append(kron(a[i], b, lazy))
         
     return kr
 
-def kron_sparse_list(a, b):
+def kron_sparse_list(a, b, lazy = False):
     kr = []
     n = len(b)
     for i in range(n):
-        kr.append(kron(a, b[i]))
+        kr.append(kron(a, b[i], lazy))
         
     return kr
 
-def kron_list_list(a, b):
+def kron_list_list(a, b, lazy = False):
     kr = []
     n = len(a)
     for i in range(n):
-        kr.append(kron(a[i], b))
+        kr.append(kron(a[i], b, lazy))
     
     return kr    
 
-def kron_list2_list2(a, b): 
+def kron_list2_list2(a, b, lazy = False): 
     n1 = len(a)
     m1 = len(a[0])
     n2 = len(b)
@@ -182,15 +586,20 @@ def kron_list2_list2(a, b):
         for j1 in range(m1):
             for i2 in range(n2):
                 for j2 in range(m2):
-                    kr[i1 * n2 + i2].append(kron(a[i1][j1], b[i2][j2]))
+                    kr[i1 * n2 + i2].append(kron(a[i1][j1], b[i2][j2], lazy))
     
     return kr
 
 # kron of sparse matrices a and b
 # if either a or b are lists of sparse matrices
 # then do elementwise kron
+# lazy: the products of the sparse matrices are kron_operator
+#       (applied without assembling, see kron_operator)
 
-def kron(a, b):
+def kron(a, b, lazy = False):
+    
+    if lazy and is_sparse_matrix(a) and is_sparse_matrix(b):
+        return kron_operator([(1, a, b)])
     
     if is_dense_matrix(a) and is_dense_matrix(b):
         return kron_dense_dense(a, b)
@@ -205,16 +614,16 @@ def kron(a, b):
         return kron_sparse_sparse(a, b)
     
     if is_list_list_of_any(a) and is_list_list_of_any(b):
-        return kron_list2_list2(a, b)
+        return kron_list2_list2(a, b, lazy)
     
     if is_list_of_any(a) and is_sparse_matrix(b):
-        return kron_list_sparse(a, b)
+        return kron_list_sparse(a, b, lazy)
     
     if is_list_of_any(a) and is_list_of_any(b):
-        return kron_list_list(a, b)
+        return kron_list_list(a, b, lazy)
     
     if is_sparse_matrix(a) and is_list_of_any(b):
-        return kron_sparse_list(a, b)
+        return kron_sparse_list(a, b, lazy)
     
     raise Exception('Unsupported types for kron')
 
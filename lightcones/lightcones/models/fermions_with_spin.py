@@ -3,8 +3,10 @@ import numpy as np
 import lightcones.space as sp
 from lightcones.linalg import kron
 
+# lazy: the operators are linalg.kron_operator (applied without assembling the Kronecker products,
+#       their sums and products are kron_operator again, tocsc() materializes them)
 class fermions_with_spin:
-    def __init__(self, num_modes):
+    def __init__(self, num_modes, lazy = False):
         states = sp.states(num_modes, bounding_condition=sp.bounding_condition.more_than_singly_occupied())
         f = sp.fermions(states)
         
@@ -14,18 +16,18 @@ class fermions_with_spin:
         #
         self.dimension = f.states.dimension**2
         
-        self.eye = kron(f.eye, f.eye)
-        self.parity = kron(f.parity, f.parity)
+        self.eye = kron(f.eye, f.eye, lazy)
+        self.parity = kron(f.parity, f.parity, lazy)
         
         # ordering is the following:
         # up down
         
         # a and a_dag are odd operators
-        self.a = [kron(f.a, f.eye),  kron(f.parity, f.a)]
-        self.a_dag = [kron(f.a_dag, f.eye), kron(f.parity, f.a_dag)]
+        self.a = [kron(f.a, f.eye, lazy),  kron(f.parity, f.a, lazy)]
+        self.a_dag = [kron(f.a_dag, f.eye, lazy), kron(f.parity, f.a_dag, lazy)]
         
         # n is even operator
-        self.n = [kron(f.n, f.eye),  kron(f.eye, f.n)]
+        self.n = [kron(f.n, f.eye, lazy),  kron(f.eye, f.n, lazy)]
         
     # vacuum state
     def vac(self):
@@ -0,0 +1 @@
+from .auto import *
@@ -0,0 +1,184 @@
+import os
+import json
+import time
+import warnings
+import platform
+import numpy as np
+import scipy.sparse
+import scipy.linalg
+import lightcones.linalg as la
+
+# crossover points used when no calibration file is found
+default_calibration = {'dense_max_dim': 300}
+
+# location of the calibration file: $LIGHTCONES_CALIBRATION or ~/.lightcones/calibration.json
+def calibration_path():
+    return os.environ.get('LIGHTCONES_CALIBRATION', os.path.join(os.path.expanduser('~'), '.lightcones', 'calibration.json'))
+
+# the crossover points stored by calibrate (the defaults for the missing ones);
+# a file calibrated on another machine (e.g. in a home directory shared between the hosts)
+# is ignored with a warning
+def load_calibration(path = None):
+    if path is None:
+        path = calibration_path()
+    calibration = dict(default_calibration)
+    if os.path.exists(path):
+        with open(path) as f:
+            stored = json.load(f)
+        if stored.get('machine', platform.node()) != platform.node():
+            warnings.warn("The calibration " + str(path) + " was made on " + str(stored['machine']) +
+                          ", not on " + platform.node() + "; the default crossover points are used", RuntimeWarning)
+        else:
+            calibration.update(stored)
+    return calibration
+
+# list of (coefficient, CSC matrix) terms of the native Hamiltonian
+def as_terms(h):
+    if scipy.sparse.issparse(h) and h.format == 'csc':
+        return [(1, h)]
+    if isinstance(h, la.multiterm):
+        return h.terms()
+    return h
+
+# dense Hermitean matrix of the native Hamiltonian
+def dense_hamiltonian(h):
+    return sum([c * m.toarray() for c, m in as_terms(h)])
+
+# check whether the native Hamiltonian is Hermitean (up to the rounding errors)
+def is_hermitean(h):
+    s = sum([c * m for c, m in as_terms(h)])
+    d = abs(s - s.conj().T)
+    return d.nnz == 0 or d.max() <= 1e-12 * max(1.0, abs(s).max())
+
+# upper bound of the spectral norm of the native Hamiltonian (maximal absolute column sum)
+def norm_bound(h):
+    return sum([abs(c) * abs(m).sum(axis = 0).max() for c, m in as_terms(h)])
+
+# the backend chosen by propagate: 'midpoint' (compiled implicit midpoint loop),
+# 'dense' (eigendecomposition of the dense Hamiltonian, or its exact one-step exponential
+# for a non-Hermitean H) or 'krylov' (sparse Krylov exponential, Hermitean H only)
+# native: whether the Hamiltonian is given as a CSC matrix or a list of terms
+# time_dependent: whether the Hamiltonian changes in time (callback apply_h or begin_step)
+# n_psi, nnz: dimension and number of the nonzero elements (ignored for the callback)
+# n_steps: number of the time steps; h_norm: upper bound of ||H|| (None: unknown)
+# hermitean: whether H is Hermitean; the Krylov propagator (Lanczos) assumes it,
+#            so a non-Hermitean H is propagated by the midpoint rule or by the dense one
+# The midpoint rule is the cheapest per step, but its phase error is ~ (dt ||H||)^3 / 12 per step
+# and its fixed-point iteration needs dt ||H|| < 2; it is chosen when the estimated global
+# error n_steps (dt ||H||)^3 / 12 is below tol (or ||H|| is unknown). Otherwise the exact
+# propagators are used: the dense one for the time-independent Hamiltonian of the dimension
+# up to calibration['dense_max_dim'] (see calibrate) or with more than a quarter of the elements
+# nonzero (then a Krylov step costs as much as a dense one), and the Krylov one for the rest.
+def select_backend(native, time_dependent, n_psi, nnz, n_steps, dt, h_norm, tol, calibration, hermitean = True):
+    if h_norm is None or n_steps * (abs(dt) * h_norm)**3 / 12 <= tol and abs(dt) * h_norm < 1:
+        return 'midpoint'
+    if native and not time_dependent and (n_psi <= calibration['dense_max_dim'] or 4 * nnz > n_psi**2):
+        return 'dense'
+    return 'krylov' if hermitean else 'midpoint'
+
+# solve the Schrodinger equation from time a to time b and a time step dt
+# by the backend chosen according to the problem (see select_backend)
+# h: CSC matrix or list of (coefficient, CSC matrix) terms (time-independent unless begin_step
+#    changes it) or the callback apply_h(ti, psi_in, psi_out) (time-dependent, see solve)
+# begin_step, eval_o, psi, eval_a, schedule: the same as in solve (psi receives the final state)
+# backend: 'auto' or one of 'midpoint', 'dense', 'krylov'
+# tol: tolerated global error of the state
+# h_norm: upper bound of ||H|| (estimated from the matrices for the native Hamiltonian;
+#         for the callback the midpoint rule is used unless h_norm is given)
+# calibration: dict of the crossover points (None: load_calibration())
+# returns: the name of the backend used
+def propagate(a, b, dt, h, psi_0, begin_step = None, eval_o = None, psi = None, eval_a = 1, schedule = None,
+              backend = 'auto', tol = 1e-6, h_norm = None, calibration = None):
+    from .schrodinger import solve, output_steps, takes_index, is_native_hamiltonian
+
+    native = is_native_hamiltonian(h)
+    time_dependent = not native or not begin_step is None
+    n_psi = psi_0.shape[0]
+
+    if backend == 'auto':
+        if calibration is None:
+            calibration = load_calibration()
+        if native and h_norm is None:
+            h_norm = norm_bound(h)
+        nnz = sum([m.nnz for _, m in as_terms(h)]) if native else 0
+        backend = select_backend(native, time_dependent, n_psi, nnz, abs(b - a), dt, h_norm, tol, calibration,
+                                 hermitean = not native or is_hermitean(h))
+
+    if psi is None:
+        psi = np.zeros(psi_0.shape, dtype = complex)
+
+    if backend == 'midpoint':
+        solve(a, b, dt, h, psi_0, begin_step = begin_step, eval_o = eval_o, psi = psi, eval_a = eval_a, schedule = schedule)
+    elif backend == 'krylov':
+        if native and not is_hermitean(h):
+            raise ValueError("The krylov backend (Lanczos) needs a Hermitean Hamiltonian")
+        solve(a, b, dt, h, psi_0, begin_step = begin_step, eval_o = eval_o, psi = psi, eval_a = eval_a, schedule = schedule,
+              method = 'krylov', krylov_tol = tol / max(abs(b - a), 1))
+    elif backend == 'dense':
+        if time_dependent:
+            raise ValueError("The dense backend needs the time-independent Hamiltonian given as a CSC matrix or a list of terms")
+        if is_hermitean(h):
+            e, v = np.linalg.eigh(dense_hamiltonian(h))
+            c = v.conj().T @ psi_0
+            # the state (or the block of states) at the step ti
+            def evolve(ti):
+                psi[...] = v @ (np.exp(-1j * e * (ti - a) * dt) * c.T).T
+        else:
+            # the eigenvectors of a non-Hermitean H need not be orthogonal (or complete):
+            # the exact one-step propagator is applied step by step instead
+            s = 1 if b >= a else -1
+            u = scipy.linalg.expm(-1j * s * dt * dense_hamiltonian(h))
+            state = {'ti': a, 'psi': np.array(psi_0, dtype = complex)}
+            def evolve(ti):
+                while state['ti'] != ti:
+                    state['psi'] = u @ state['psi']
+                    state['ti'] += s
+                psi[...] = state['psi']
+        with_index = not eval_o is None and takes_index(eval_o)
+        for k, ti in enumerate(output_steps(a, b, eval_a, schedule)):
+            evolve(ti)
+            if with_index:
+                eval_o(ti, psi, k)
+            elif not eval_o is None:
+                eval_o(ti, psi)
+        evolve(b)
+    else:
+        raise ValueError("Unknown backend: " + str(backend))
+
+    return backend
+
+# measures the crossover dimension between the dense and the Krylov backends on this machine
+# (random sparse Hermitean matrices with dt ||H|| = 1, the state evaluated at every step)
+# and stores it in the calibration file (see calibration_path) for propagate
+# returns: the calibration dict
+def calibrate(path = None, dims = (32, 64, 128, 256, 512, 1024), n_steps = 100):
+    rng = np.random.default_rng(0)
+    timings = []
+    for n in dims:
+        m = scipy.sparse.random(n, n, density = min(1.0, 6 / n), random_state = rng) + scipy.sparse.diags(rng.normal(size = n))
+        m = m + m.T
+        h = scipy.sparse.csc_matrix(m / norm_bound(scipy.sparse.csc_matrix(m)), dtype = complex)
+        psi_0 = np.zeros(n, dtype = complex)
+        psi_0[0] = 1
+        def eval_o(ti, psi):
+            pass
+        t = []
+        for backend in ['dense', 'krylov']:
+            t0 = time.perf_counter()
+            propagate(0, n_steps, 1.0, h, psi_0, eval_o = eval_o, backend = backend)
+            t.append(time.perf_counter() - t0)
+        timings.append(t)
+
+    faster = [n for n, (t_dense, t_krylov) in zip(dims, timings) if t_dense < t_krylov]
+    calibration = {'dense_max_dim': max(faster) if len(faster) > 0 else 0,
+                   'machine': platform.node(), 'dims': list(dims), 'timings': timings}
+
+    if path is None:
+        path = calibration_path()
+    if os.path.dirname(path) != '':
+        os.makedirs(os.path.dirname(path), exist_ok = True)
+    with open(path, 'w') as f:
+        json.dump(calibration, f)
+    return calibration
+
+__all__ = ['propagate', 'select_backend', 'calibrate', 'load_calibration']
@@ -1,25 +1,474 @@
+import time
+import inspect
+import warnings
 import numpy as np
+import scipy.sparse
+import lightcones.linalg as la
 from . import _solve
+from .krylov import *
+from .adaptive import *
+from .magnus import *
+from .chebyshev import *
+from .checkpoint import *
+from .stats import *
+from .imag import *
+from .split import *
+from .adjoint import *
+from .native import *
+from .stream import *
+
+# check whether m is a CSC matrix (a scipy.sparse csc_matrix or csc_array)
+def is_csc(m):
+    return scipy.sparse.issparse(m) and m.format == 'csc'
+
+# check whether h is given as a CSC matrix
+# or as a list of (coefficient, CSC matrix) terms or as a linalg.multiterm
+def is_native_hamiltonian(h):
+    if is_csc(h) or isinstance(h, la.multiterm):
+        return True
+    return isinstance(h, list) and all(isinstance(t, tuple) and len(t) == 2 and is_csc(t[1]) for t in h)
+
+# check whether the native Hamiltonian does not fit the compiled solver loop, whose indices are 32-bit:
+# a matrix with the 64-bit indices (see linalg.wide_indices) or the terms with more than
+# 2^31 - 1 nonzero elements in total; solve and solve_imag then apply it by linalg.mv
+# (which has the 64-bit kernels) through the callback instead of truncating the indices
+def wide_hamiltonian(h):
+    if isinstance(h, la.multiterm):
+        return la.wide_indices(h)
+    if is_csc(h):
+        h = [(1, h)]
+    if len(h) == 0:
+        return False
+    if any([la.wide_indices(m) for _, m in h]):
+        return True
+    return la.index_dtype(sum([m.nnz for _, m in h]), h[0][1].shape[1]) == np.int64
+
+# arrays (h_coef, h_data, h_ind, h_ptr) describing the Hamiltonian
+# H = sum_k h_coef[k] * H_k for the compiled solver loop;
+# a single CSC matrix of the given dtype with int32 indices is passed without copying,
+# so that the in-place updates of its data (e.g. in begin_step) are seen by the solver;
+# the same holds for the coefficients and the data of a linalg.multiterm in double precision
+# (in the single precision mode solve refreshes their complex64 copies after every begin_step)
+def native_hamiltonian(h, n_psi, dtype = complex):
+    if wide_hamiltonian(h):
+        raise ValueError("The compiled loop supports only the 32-bit indices (at most 2^31 - 1 nonzero elements); "
+                         "apply the matrices with the 64-bit indices by linalg.mv in a callback")
+    if isinstance(h, la.multiterm):
+        if h.shape != (n_psi, n_psi):
+            raise ValueError("Hamiltonian shape " + str(h.shape) + " does not match the state size " + str(n_psi))
+        return h.coef.astype(dtype, copy = False), h.data.astype(dtype, copy = False), h.indices, h.indptr
+
+    if is_csc(h):
+        h = [(1, h)]
+
+    h_coef = np.array([c for c, _ in h], dtype = dtype)
+    mats = [m for _, m in h]
+
+    for m in mats:
+        if m.shape != (n_psi, n_psi):
+            raise ValueError("Hamiltonian shape " + str(m.shape) + " does not match the state size " + str(n_psi))
+
+    if len(mats) == 1:
+        m = mats[0]
+        h_data = np.asarray(m.data, dtype = dtype)
+        h_ind = np.asarray(m.indices, dtype = np.int32)
+        h_ptr = np.asarray(m.indptr, dtype = np.int32)[:, None]
+        return h_coef, h_data, h_ind, h_ptr
+
+    offsets = np.cumsum([0] + [m.nnz for m in mats[: -1]])
+    h_data = np.concatenate([m.data[: m.nnz] for m in mats]).astype(dtype)
+    h_ind = np.concatenate([m.indices[: m.nnz] for m in mats]).astype(np.int32)
+    h_ptr = np.asfortranarray(np.column_stack([m.indptr + o for m, o in zip(mats, offsets)]), dtype = np.int32)
+    return h_coef, h_data, h_ind, h_ptr
+
+# arrays (n_sp, o_data, o_ind, o_ptr, n_dg, o_diag, o_row) describing the observable bank
+# of the compiled solver loop: observables is a list of CSC matrices (averages <psi|O|psi>)
+# and real vectors (diagonal observables, averages sum_j o_j |psi_j|^2),
+# the averages are stored in the order of the list (an empty list gives an empty bank)
+def native_observables(observables, n_psi):
+    sparse = [k for k, o in enumerate(observables) if is_csc(o)]
+    diagonal = [k for k, o in enumerate(observables) if not is_csc(o)]
+
+    for k in diagonal:
+        o = observables[k]
+        if scipy.sparse.issparse(o) or np.ndim(o) != 1 or np.size(o) != n_psi:
+            raise ValueError("Observable " + str(k) + " should be a CSC matrix or a vector of size " + str(n_psi))
+
+    # f2py does not accept empty arrays: the unused parts are dummies of size 1
+    if len(sparse) > 0:
+        _, o_data, o_ind, o_ptr = native_hamiltonian([(1, observables[k]) for k in sparse], n_psi)
+    else:
+        o_data = np.zeros(1, dtype = complex)
+        o_ind = np.zeros(1, dtype = np.int32)
+        o_ptr = np.zeros((n_psi + 1, 1), dtype = np.int32)
+
+    if len(diagonal) > 0:
+        o_diag = np.asfortranarray(np.column_stack([np.asarray(observables[k], dtype = float) for k in diagonal]))
+    else:
+        o_diag = np.zeros((n_psi, 1), order = 'F')
+
+    o_row = np.array(sparse + diagonal + [0], dtype = np.int32)
+    return len(sparse), o_data, o_ind, o_ptr, len(diagonal), o_diag, o_row
+
+# callback apply_h(ti, psi_in, psi_out) for the Hamiltonian
+# given as a CSC matrix or as a list of (coefficient, CSC matrix) terms
+# (or as a linalg.multiterm, linalg.indexmap or linalg.kron_operator)
+def native_callback(h):
+    if isinstance(h, la.multiterm) or isinstance(h, la.indexmap) or isinstance(h, la.kron_operator):
+        def apply_h(ti, psi_in, psi_out):
+            la.mv(h, psi_in, psi_out, cout = 1)
+        return apply_h
+    if is_csc(h):
+        h = [(1, h)]
+    def apply_h(ti, psi_in, psi_out):
+        for c, m in h:
+            la.mv(m, psi_in, psi_out, cin = c, cout = 1)
+    return apply_h
+
+# the Hamiltonian h in the form accepted by the compiled solver loop: the matrix-free
+# linalg.indexmap and linalg.kron_operator operators and the matrices with the 64-bit indices
+# (see wide_hamiltonian) are replaced by the callback applying them by linalg.mv
+def loop_hamiltonian(h):
+    if isinstance(h, la.indexmap) or isinstance(h, la.kron_operator):
+        return native_callback(h)
+    if is_native_hamiltonian(h) and wide_hamiltonian(h):
+        return native_callback(h)
+    return h
+
+# array of the time steps between a and b at which the observables are evaluated,
+# in the order of the propagation (decreasing for the backward propagation, b < a):
+# schedule is None (every step), or a stride s (the steps a, a +- s, a +- 2s, ...),
+# or an increasing list of the step indices; the step a is dropped if eval_a != 1
+def output_steps(a, b, eval_a, schedule):
+    s = 1 if b >= a else -1
+    if schedule is None:
+        steps = np.arange(a, b + s, s)
+    elif np.isscalar(schedule):
+        if int(schedule) < 1:
+            raise ValueError("The schedule stride should be positive, got " + str(schedule))
+        steps = np.arange(a, b + s, s * int(schedule))
+    else:
+        steps = np.asarray(schedule, dtype = int).flatten()
+        if np.any(np.diff(steps) <= 0):
+            raise ValueError("The schedule should be an increasing list of time steps")
+        steps = steps[(steps >= min(a, b)) & (steps <= max(a, b))][:: s]
+    if eval_a != 1:
+        steps = steps[steps != a]
+    return steps.astype(np.int32)
+
+# check whether the callback eval_o declares the index of the schedule entry
+# as the third positional parameter without a default: eval_o(ti, psi, k);
+# any other callback (e.g. eval_o(ti, psi, *args) or eval_o(ti, psi, store = ...))
+# is called as eval_o(ti, psi)
+def takes_index(eval_o):
+    try:
+        params = inspect.signature(eval_o).parameters.values()
+    except (TypeError, ValueError):
+        return False
+    return len([p for p in params if p.kind in (p.POSITIONAL_ONLY, p.POSITIONAL_OR_KEYWORD)
+                and p.default is p.empty]) >= 3
+
+# callback eval_o(ti, psi, k) for the compiled loops, which always pass the index k
+# of the schedule entry: f2py would pass k according to the signature it finds
+# (and fail for a callable object or a partial), so the user callback eval_o
+# is called here with or without k
+def indexed_callback(eval_o):
+    with_index = takes_index(eval_o)
+    def eval_o_indexed(ti, psi, k):
+        if with_index:
+            eval_o(ti, psi, k)
+        else:
+            eval_o(ti, psi)
+    return eval_o_indexed
+
+# callback eval_o(ti, psi) for the solvers calling it at every step,
+# which calls the user callback only at the scheduled steps
+def scheduled_callback(eval_o, steps):
+    index = {int(ti): k for k, ti in enumerate(steps)}
+    with_index = takes_index(eval_o)
+    def eval_o_scheduled(ti, psi):
+        k = index.get(int(ti))
+        if k is None:
+            return
+        if with_index:
+            eval_o(ti, psi, k)
+        else:
+            eval_o(ti, psi)
+    return eval_o_scheduled
 
 # solve the Schrodinger equation from time a to time b and a time step dt
-def solve(a, b, dt, apply_h, psi_0, begin_step = None, eval_o = None, psi = None, psi_mid = None, psi_mid_next = None, eval_a = 1):
+# (b < a: backward propagation, 'midpoint' method only)
+# apply_h: callback apply_h(ti, psi_in, psi_out) which adds H @ psi_in to psi_out,
+#          or the Hamiltonian as a CSC matrix, a list of (coefficient, CSC matrix) terms or a linalg operator
+#          (the matrices are applied in the compiled loop, see loop_hamiltonian)
+# psi_0: initial state, or a block of shape (n_psi, n_traj) of trajectories (ensemble mode, 'midpoint' only)
+# method: 'midpoint' (implicit midpoint rule) or 'krylov' (see solve_krylov)
+#         or 'adaptive' (see solve_adaptive, apply_h is called with a fractional ti)
+#         or 'cfm4' (see solve_cfm4, apply_h is then apply_h(ti, s, psi_in, psi_out))
+#         or 'chebyshev' (see solve_chebyshev, time-independent Hamiltonian only)
+#         or 'split' (see solve_split, apply_h applies the off-diagonal part V and h_diag is required)
+# krylov_tol, krylov_dim: tolerance per step and maximal subspace dimension for 'krylov', 'cfm4' and 'adaptive'
+# adaptive_tol: local error tolerance for the 'adaptive' method
+# split_order, taylor_order: order of the splitting and of the Taylor series of exp(-i V dt) for 'split'
+# schedule: the steps at which eval_o is called (see output_steps); if eval_o declares
+#           a third positional parameter, it is called as eval_o(ti, psi, k) with the index k of the entry
+# stats: None, True or a solve_stats instance to be filled and returned
+# precision: 'double' or 'single' ('midpoint' only; convert the matrices by linalg.single, see solve_c in solve.f90)
+# renorm_every: renormalization period of the single precision mode (0 disables it)
+# h_diag: real diagonal part D of the Hamiltonian, then apply_h applies H - diag(D)
+#         ('midpoint' and 'split' in double precision)
+# anderson: history depth of the Anderson mixing of the fixed-point iterates (0: plain iteration, double precision)
+# max_iter: None or the maximal number of the fixed-point iterations per step
+#           (the capped steps are counted in stats.n_capped and reported by a RuntimeWarning)
+# observables, averages: the observable bank (CSC matrices and real diagonal vectors) and the preallocated
+#                        C-ordered complex array of shape (len(observables), number of the output steps)
+#                        receiving their averages, computed in the compiled loop ('midpoint' in double precision)
+def solve(a, b, dt, apply_h, psi_0, begin_step = None, eval_o = None, psi = None, psi_mid = None, psi_mid_next = None, eval_a = 1,
+          method = 'midpoint', krylov_tol = 1e-12, krylov_dim = 30, adaptive_tol = 1e-8, schedule = None, stats = None,
+          precision = 'double', renorm_every = 100, h_diag = None, split_order = 2, taylor_order = 4,
+          anderson = 0, max_iter = None, observables = None, averages = None):
+    ensemble = psi_0.ndim == 2
+    
+    if method != 'chebyshev':
+        apply_h = loop_hamiltonian(apply_h)
+    elif isinstance(apply_h, la.indexmap) or isinstance(apply_h, la.kron_operator):
+        apply_h = apply_h.tocsc()
+    
+    if b < a and method != 'midpoint':
+        raise ValueError("The backward propagation (b < a) is supported only by the 'midpoint' method")
+    
+    if precision != 'double' and precision != 'single':
+        raise ValueError("Unknown precision: " + str(precision))
+    single = precision == 'single'
+    if single and (ensemble or method != 'midpoint' or b < a):
+        raise ValueError("The single precision mode is supported only by the forward 'midpoint' method without the ensemble mode")
+    dtype = np.complex64 if single else complex
+    
+    if not h_diag is None and (single or not method in ['midpoint', 'split']):
+        raise ValueError("The diagonal part h_diag is supported only by the 'midpoint' and 'split' methods in double precision")
+    
+    if (anderson != 0 or not max_iter is None) and method != 'midpoint':
+        raise ValueError("anderson and max_iter are supported only by the 'midpoint' method")
+    if anderson != 0 and single:
+        raise ValueError("anderson is supported only in double precision")
+    if anderson < 0 or (not max_iter is None and max_iter < 1):
+        raise ValueError("anderson should be non-negative and max_iter positive")
+    
+    o_steps = output_steps(a, b, eval_a, schedule)
+    
+    if not observables is None:
+        if single or ensemble or method != 'midpoint':
+            raise ValueError("The observable bank is supported only by the 'midpoint' method in double precision without the ensemble mode")
+        bank = native_observables(observables, psi_0.shape[0])
+        shape = (len(observables), o_steps.size)
+        if averages is None or averages.shape != shape or averages.dtype != complex or not averages.flags.c_contiguous:
+            raise ValueError("averages should be a preallocated C-ordered complex array of shape " + str(shape))
+        # the compiled loop fills the transposed (Fortran-ordered) array
+        averages_t = averages.T if o_steps.size > 0 else np.zeros((1, len(observables)), dtype = complex, order = 'F')
+    else:
+        bank = native_observables([], psi_0.shape[0])
+        averages_t = np.zeros((1, 1), dtype = complex, order = 'F')
+    
+    if stats is True:
+        stats = solve_stats()
+    if not stats is None:
+        t_start = time.perf_counter()
+        if not begin_step is None:
+            begin_step = stats.timed(begin_step, 'begin_step', 2)
+        if not eval_o is None:
+            eval_o = stats.timed(eval_o, 'eval_o', 3 if takes_index(eval_o) else 2)
+        if not is_native_hamiltonian(apply_h):
+            apply_h = stats.timed(apply_h, 'apply', 4 if method == 'cfm4' else 3)
+            
+    def done():
+        if not stats is None:
+            stats.time_total += time.perf_counter() - t_start
+        return stats
+    
+    # the observables are evaluated on the grid ti = a ... b, but the solver chooses its own steps,
+    # so apply_h is called with a fractional ti (H is taken at the time moment (ti + 0.5)*dt)
+    if method == 'adaptive':
+        if ensemble or not begin_step is None:
+            raise ValueError("The 'adaptive' method supports neither the ensemble mode nor begin_step")
+        if is_native_hamiltonian(apply_h):
+            apply_h = native_callback(apply_h)
+            if not stats is None:
+                apply_h = stats.timed(apply_h, 'apply', 3)
+            
+        def apply_h_t(t, psi_in, psi_out):
+            apply_h(t / dt - 0.5, psi_in, psi_out)
+            
+        # the output moments are the scheduled steps only
+        t_steps = np.unique(np.concatenate([[a], o_steps, [b]]))
+        
+        eval_o_i = None
+        if not eval_o is None:
+            eval_o_s = scheduled_callback(eval_o, o_steps)
+            def eval_o_i(i, psi):
+                eval_o_s(t_steps[i], psi)
+                    
+        _, n_accepted, n_rejected = solve_adaptive(t_steps * dt, apply_h_t, psi_0, eval_o = eval_o_i, psi = psi,
+                                                   tol = adaptive_tol, dt0 = dt, krylov_dim = krylov_dim)
+        if not stats is None:
+            stats.n_accepted += n_accepted
+            stats.n_rejected += n_rejected
+        return done()
+    
+    if method == 'chebyshev':
+        if ensemble or not begin_step is None or not is_native_hamiltonian(apply_h):
+            raise ValueError("The 'chebyshev' method needs the time-independent Hamiltonian given as a matrix "
+                             "and supports neither the ensemble mode nor begin_step")
+        if isinstance(apply_h, la.multiterm):
+            apply_h = apply_h.terms()
+        if isinstance(apply_h, list):
+            apply_h = sum([c * m for c, m in apply_h]).tocsc()
+        if not eval_o is None:
+            eval_o = scheduled_callback(eval_o, o_steps)
+        solve_chebyshev(a, b, dt, apply_h, psi_0, eval_o = eval_o, psi = psi)
+        return done()
+    
+    if method == 'split':
+        if ensemble or h_diag is None:
+            raise ValueError("The 'split' method needs the diagonal part h_diag and does not support the ensemble mode")
+        if is_native_hamiltonian(apply_h):
+            apply_h = native_callback(apply_h)
+            if not stats is None:
+                apply_h = stats.timed(apply_h, 'apply', 3)
+        if not eval_o is None:
+            eval_o = scheduled_callback(eval_o, o_steps)
+        solve_split(a, b, dt, apply_h, h_diag, psi_0, begin_step = begin_step, eval_o = eval_o, psi = psi,
+                    order = split_order, taylor_order = taylor_order)
+        return done()
+    
+    if method == 'krylov' or method == 'cfm4':
+        if ensemble:
+            raise ValueError("The ensemble mode is supported only by the 'midpoint' method")
+        if is_native_hamiltonian(apply_h):
+            apply_h_native = native_callback(apply_h)
+            if not stats is None:
+                apply_h_native = stats.timed(apply_h_native, 'apply', 3)
+            apply_h = apply_h_native
+            if method == 'cfm4':
+                def apply_h(ti, s, psi_in, psi_out):
+                    apply_h_native(ti, psi_in, psi_out)
+        if not eval_o is None:
+            eval_o = scheduled_callback(eval_o, o_steps)
+        solver = solve_krylov if method == 'krylov' else solve_cfm4
+        solver(a, b, dt, apply_h, psi_0, begin_step = begin_step, eval_o = eval_o, psi = psi,
+               tol = krylov_tol, max_dim = krylov_dim)
+        return done()
+    
+    if method != 'midpoint':
+        raise ValueError("Unknown method: " + str(method))
+    
+    call_begin = 1
     if begin_step is None:
+        call_begin = 0
         def begin_step(ti, psi):
             pass
         
+    call_eval = 1
     if eval_o is None:
+        call_eval = 0
         def eval_o(ti, psi):
             pass
         
+    eval_o = indexed_callback(eval_o)
+        
+    native = 0
+    if is_native_hamiltonian(apply_h):
+        native = 1
+        h_coef, h_data, h_ind, h_ptr = native_hamiltonian(apply_h, psi_0.shape[0], dtype)
+        # the complex64 copies of the coefficients and the data of the complex128 operator
+        # follow the changes made by begin_step
+        if single and call_begin == 1 and (isinstance(apply_h, la.multiterm) or is_csc(apply_h)):
+            h_native, begin_step_user = apply_h, begin_step
+            def begin_step(ti, psi):
+                begin_step_user(ti, psi)
+                c, d, _, _ = native_hamiltonian(h_native, psi_0.shape[0], dtype)
+                h_coef[:] = c
+                h_data[:] = d
+        def apply_h(ti, psi_in, psi_out):
+            pass
+    else:
+        h_coef = np.zeros(1, dtype = dtype)
+        h_data = np.zeros(1, dtype = dtype)
+        h_ind = np.zeros(1, dtype = np.int32)
+        h_ptr = np.zeros((psi_0.shape[0] + 1, 1), dtype = np.int32)
+        
+    # f2py does not accept empty arrays: without the statistics
+    # only the first step is recorded, and an empty schedule is replaced
+    # by a step which is never reached
+    n_stat = 1 if stats is None else max(abs(b - a), 1)
+    n_iter = np.zeros(n_stat, dtype = np.int32)
+    err_step = np.zeros(n_stat)
+    
+    if o_steps.size == 0:
+        o_steps = np.array([max(a, b) + 1], dtype = np.int32)
+    
+    diag = 0
+    d_phase = np.ones(psi_0.shape[0], dtype = complex)
+    if not h_diag is None:
+        diag = 1
+        d_phase = np.exp(-0.5j * np.sign(b - a) * dt * np.asarray(h_diag, dtype = float))
+        
     if psi is None:
-        psi = np.zeros(psi_0.size, dtype = complex)
+        psi = np.zeros(psi_0.shape, dtype = dtype)
         
     if psi_mid is None:
-        psi_mid = np.zeros(psi_0.size, dtype = complex)
+        psi_mid = np.zeros(psi_0.shape, dtype = dtype)
         
     if psi_mid_next is None:
-        psi_mid_next = np.zeros(psi_0.size, dtype = complex)
+        psi_mid_next = np.zeros(psi_0.shape, dtype = dtype)
+        
+    if single:
+        for v in [psi, psi_mid, psi_mid_next]:
+            if v.shape != psi_0.shape or v.dtype != np.complex64:
+                raise ValueError("Buffers for the single precision mode should be complex64 arrays of shape " + str(psi_0.shape))
         
-    _solve.solve(a, b, dt, begin_step, apply_h, eval_o, psi_0, psi, psi_mid, psi_mid_next, eval_a)
+        n_capped = _solve.solve_c(a, b, dt, begin_step, apply_h, eval_o, psi_0.astype(np.complex64), psi, psi_mid, psi_mid_next,
+                                  o_steps, call_begin, call_eval, native, h_coef, h_data, h_ind, h_ptr, n_iter, err_step,
+                                  renorm_every, max_iter or 0)[-1]
+    elif ensemble:
+        for v in [psi, psi_mid, psi_mid_next]:
+            if v.shape != psi_0.shape or v.dtype != complex or not v.flags.c_contiguous:
+                raise ValueError("Buffers for the ensemble mode should be C-ordered complex arrays of shape " + str(psi_0.shape))
+        
+        # the callbacks receive the whole block, so begin_step can modify (e.g. make jumps in)
+        # individual columns, and apply_h can apply a sparse matrix to the block by linalg.mv in one pass;
+        # the compiled loop works with the transposed (trajectory index fastest) block
+        begin_step_t, apply_h_t, eval_o_t = begin_step, apply_h, eval_o
+        
+        def begin_step(ti, psi):
+            begin_step_t(ti, psi.T)
+        
+        def apply_h(ti, psi_in, psi_out):
+            apply_h_t(ti, psi_in.T, psi_out.T)
+            
+        def eval_o(ti, psi, k):
+            eval_o_t(ti, psi.T, k)
+            
+        n_capped = _solve.solve_block(a, b, dt, begin_step, apply_h, eval_o, psi_0.T, psi.T, psi_mid.T, psi_mid_next.T, o_steps,
+                                      call_begin, call_eval, native, h_coef, h_data, h_ind, h_ptr, n_iter, err_step, diag, d_phase,
+                                      anderson, max_iter or 0)[-1]
+    else:
+        n_capped = _solve.solve(a, b, dt, begin_step, apply_h, eval_o, psi_0, psi, psi_mid, psi_mid_next, o_steps,
+                                call_begin, call_eval, native, h_coef, h_data, h_ind, h_ptr, n_iter, err_step, diag, d_phase,
+                                *bank, averages_t, anderson, max_iter or 0)[-1]
+    
+    if n_capped > 0:
+        warnings.warn(str(n_capped) + " steps did not converge in max_iter = " + str(max_iter) + " fixed-point iterations",
+                      RuntimeWarning)
+    
+    if not stats is None:
+        stats.n_iter = np.concatenate([stats.n_iter, n_iter[: abs(b - a)]])
+        stats.err = np.concatenate([stats.err, err_step[: abs(b - a)]])
+        stats.n_capped += int(n_capped)
+        if native == 1:
+            stats.n_apply += int(n_iter.sum())
+    return done()
     
-__all__ = ['solve']
\ No newline at end of file
+__all__ = ['solve', 'solve_krylov', 'expm_krylov', 'solve_adaptive', 'solve_cfm4', 'solve_chebyshev', 'spectral_bounds',
+           'solve_checkpointed', 'resume', 'solve_stats',
+           'solve_imag', 'solve_split', 'gradient', 'correlator', 'solve_native',
+           'propagator']
\ No newline at end of file
@@ -0,0 +1,93 @@
+import numpy as np
+from .krylov import expm_krylov
+
+# solve the Schrodinger equation with the adaptive time step
+# t_out: increasing array of time moments at which the observables are evaluated;
+#        the propagation starts at t_out[0] and ends at t_out[-1]
+# apply_h(t, psi_in, psi_out): adds H(t) @ psi_in to psi_out, t is the (real) time
+# eval_o(i, psi): evaluates observables at t_out[i]; the state at the output moments
+#                 which fall inside a step is obtained by the propagation
+#                 psi(t + s) = exp(-i s H(t + s/2)) psi(t) from the beginning of the step,
+#                 which is exact for the time-independent segments
+#                 (where the steps are much larger than the spacing of t_out)
+# Each step psi(t + h) = exp(-i h H(t + h/2)) psi(t) is made by the Krylov propagator,
+# the local error is estimated by comparing one step of size h with two steps of size h/2,
+# and the step size is chosen to keep this estimate below tol.
+# dt0: initial step size, dt_max: maximal step size
+# returns: the final state and the number of accepted and rejected steps
+def solve_adaptive(t_out, apply_h, psi_0, eval_o = None, psi = None, tol = 1e-8, dt0 = None, dt_max = None, krylov_dim = 30):
+    t_out = np.asarray(t_out, dtype = float)
+
+    if psi is None:
+        psi = np.zeros(psi_0.size, dtype = complex)
+    psi[:] = psi_0
+
+    if dt0 is None:
+        dt0 = (t_out[-1] - t_out[0]) / 100
+    if dt_max is None:
+        dt_max = t_out[-1] - t_out[0]
+
+    n = psi_0.size
+    v = np.zeros((krylov_dim + 1, n), dtype = complex)
+    psi_coarse = np.zeros(n, dtype = complex)
+    psi_fine = np.zeros(n, dtype = complex)
+    psi_dense = np.zeros(n, dtype = complex)
+
+    krylov_tol = tol / 10
+
+    def step(t, h, psi_in, psi_out):
+        def apply(phi_in, phi_out):
+            apply_h(t + h / 2, phi_in, phi_out)
+        expm_krylov(apply, psi_in, psi_out, h, krylov_tol, krylov_dim, v)
+
+    i_out = 0
+    if not eval_o is None:
+        eval_o(i_out, psi)
+    i_out += 1
+
+    t = t_out[0]
+    h = dt0
+    n_accepted = 0
+    n_rejected = 0
+
+    while i_out < len(t_out):
+        h = min(h, dt_max, t_out[-1] - t)
+
+        step(t, h, psi, psi_coarse)
+        step(t, h / 2, psi, psi_fine)
+        step(t + h / 2, h / 2, psi_fine, psi_fine)
+
+        err = np.linalg.norm(psi_fine - psi_coarse) / 3
+
+        if err > tol and h > 1e-14 * max(1.0, abs(t)):
+            n_rejected += 1
+            h = h * max(0.2, 0.9 * (tol / err)**(1 / 3))
+            continue
+
+        n_accepted += 1
+        t_next = t + h
+        if i_out == len(t_out) - 1 and t_out[-1] - t_next < 1e-12 * max(1.0, abs(t_next)):
+            t_next = t_out[-1]
+
+        # dense output inside the step
+        while not eval_o is None and i_out < len(t_out) and t_out[i_out] < t_next:
+            step(t, t_out[i_out] - t, psi, psi_dense)
+            eval_o(i_out, psi_dense)
+            i_out += 1
+
+        psi[:] = psi_fine
+        t = t_next
+
+        while i_out < len(t_out) and t_out[i_out] <= t:
+            if not eval_o is None:
+                eval_o(i_out, psi)
+            i_out += 1
+
+        if err == 0:
+            h = 2 * h
+        else:
+            h = h * min(2.0, max(0.2, 0.9 * (tol / err)**(1 / 3)))
+
+    return psi, n_accepted, n_rejected
+
+__all__ = ['solve_adaptive']
@@ -0,0 +1,95 @@
+import numpy as np
+import lightcones.linalg as la
+
+# boundaries of the segments between the checkpoints of the forward propagation
+def segment_bounds(a, b, n_checkpoints):
+    return np.unique(np.round(np.linspace(a, b, max(n_checkpoints, 1) + 1)).astype(int))
+
+# gradient of the observable J = <psi(b)|o|psi(b)> with respect to the drive amplitudes
+# c_k(ti) of the Hamiltonian H(ti) = H_0(ti) + sum_k c_k(ti) V_k by the adjoint method:
+# the costate lambda(b) = o psi(b) is propagated backward in time with the same Hamiltonian
+# schedule, and dJ/dc_k(ti) = 2 dt Im <lambda_mid|V_k|psi_mid> is the exact gradient of the
+# discrete midpoint propagation (up to the tolerance of the fixed-point iteration)
+# apply_h, begin_step: the same as in solve (the Hamiltonian including the drive terms)
+# o: Hermitean CSC matrix of the observable
+# terms: list of the CSC matrices V_k
+# n_checkpoints: number of the states stored in the forward pass; the states inside a segment
+#                between the checkpoints are recomputed from its checkpoint during the backward pass,
+#                so that the memory holds n_checkpoints + (b - a) / n_checkpoints states,
+#                and the whole gradient costs three propagations
+# returns: J and the array g of shape (b - a, len(terms)), g[ti - a, k] = dJ/dc_k(ti)
+def gradient(a, b, dt, apply_h, psi_0, o, terms, n_checkpoints = 10, begin_step = None):
+    from . import solve
+
+    bounds = segment_bounds(a, b, n_checkpoints)
+    n = psi_0.size
+
+    # forward pass storing the checkpoints
+    checkpoints = []
+    psi = np.array(psi_0, dtype = complex)
+    psi_next = np.zeros(n, dtype = complex)
+    for s0, s1 in zip(bounds[: -1], bounds[1 :]):
+        checkpoints.append(psi.copy())
+        solve(s0, s1, dt, apply_h, psi, begin_step = begin_step, psi = psi_next)
+        psi, psi_next = psi_next, psi
+
+    o_psi = np.zeros(n, dtype = complex)
+    la.mv(o, psi, o_psi)
+    j = np.vdot(psi, o_psi).real
+
+    g = np.zeros((b - a, len(terms)))
+    lam = o_psi
+    lam_next = np.zeros(n, dtype = complex)
+    lam_prev = np.zeros(n, dtype = complex)
+    v_psi = np.zeros(n, dtype = complex)
+
+    for i in range(len(bounds) - 2, -1, -1):
+        s0, s1 = bounds[i], bounds[i + 1]
+
+        # recompute the states of the segment
+        states = np.zeros((s1 - s0 + 1, n), dtype = complex)
+        def eval_o(ti, psi):
+            states[ti - s0] = psi
+        solve(s0, s1, dt, apply_h, checkpoints[i], begin_step = begin_step, eval_o = eval_o, psi = psi_next)
+
+        # backward pass of the costate through the segment
+        lam_prev[:] = lam
+        def eval_o(ti, lam_ti):
+            if ti == s1:
+                return
+            lam_mid = (lam_ti + lam_prev) / 2
+            psi_mid = (states[ti - s0] + states[ti + 1 - s0]) / 2
+            for k, v in enumerate(terms):
+                la.mv(v, psi_mid, v_psi)
+                g[ti - a, k] = 2 * dt * np.vdot(lam_mid, v_psi).imag
+            lam_prev[:] = lam_ti
+        solve(s1, s0, dt, apply_h, lam, begin_step = begin_step, eval_o = eval_o, psi = lam_next)
+        lam, lam_next = lam_next, lam
+
+    return j, g
+
+# two-time correlation function C(ti) = <psi_0|A(ti) B(a)|psi_0> for ti = a ... b,
+# where A(ti) = U^dagger(ti, a) A U(ti, a) is in the Heisenberg picture:
+# the states psi_0 and B psi_0 are propagated together in the ensemble mode of solve,
+# so that all the times cost one propagation of a block of two states
+# apply_h, begin_step: the same as in solve in the ensemble mode
+# A, B: CSC matrices
+# returns: the array C of length b - a + 1
+def correlator(a, b, dt, apply_h, psi_0, A, B, begin_step = None):
+    from . import solve
+
+    n = psi_0.size
+    b_psi = np.zeros(n, dtype = complex)
+    la.mv(B, psi_0, b_psi)
+    block = np.column_stack([psi_0, b_psi]).astype(complex)
+
+    c = np.zeros(b - a + 1, dtype = complex)
+    a_phi = np.zeros(n, dtype = complex)
+    def eval_o(ti, psi):
+        la.mv(A, np.ascontiguousarray(psi[:, 1]), a_phi)
+        c[ti - a] = np.vdot(psi[:, 0], a_phi)
+
+    solve(a, b, dt, apply_h, block, begin_step = begin_step, eval_o = eval_o)
+    return c
+
+__all__ = ['gradient', 'correlator']
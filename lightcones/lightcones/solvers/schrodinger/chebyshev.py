@@ -0,0 +1,139 @@
+import numpy as np
+from scipy.special import jv
+import lightcones.linalg as la
+
+# maximal number of elements in the temporary array
+# holding the states on the fine grid
+chunk_size = 2**22
+
+# bounds (e_min, e_max) of the spectrum of the Hermitean
+# sparse matrix H given by the Gershgorin circles
+def spectral_bounds(H):
+    d = H.diagonal().real
+    r = np.asarray(abs(H).sum(axis = 0)).flatten() - abs(H.diagonal())
+    return (d - r).min(), (d + r).max()
+
+# number of terms in the Chebyshev expansion of exp(-i x T)
+# such that the omitted Bessel coefficients are below tol
+def chebyshev_order(x, tol):
+    n = int(x) + 10
+    while True:
+        tail = abs(jv(np.arange(n, n + 10), x))
+        if tail.max() < tol:
+            return n
+        n += 10
+
+# Bessel functions J_n(x) for n = 0 ... n_max - 1 and the array x > 0
+# by the Miller's algorithm: the downward recurrence J_{n-1} = (2n / x) J_n - J_{n+1}
+# started well above max(n_max, x) and normalized by J_0 + 2 sum_k J_{2k} = 1;
+# returns an array of shape (len(x), n_max)
+def bessel_table(n_max, x):
+    m = n_max + int(x.max()) + 30
+    m += m % 2
+    j = np.zeros((len(x), n_max))
+    f_next = np.zeros(len(x))
+    f = np.full(len(x), 1e-30)
+    norm = np.zeros(len(x))
+    for n in range(m, 0, -1):
+        f, f_next = (2 * n / x) * f - f_next, f
+        # now f = J_{n-1}, f_next = J_n (up to normalization)
+        if n - 1 < n_max:
+            j[:, n - 1] = f
+        if (n - 1) % 2 == 0:
+            norm += f if n == 1 else 2 * f
+        big = abs(f) > 1e100
+        if big.any():
+            f[big] *= 1e-100
+            f_next[big] *= 1e-100
+            norm[big] *= 1e-100
+            j[big, :] *= 1e-100
+    return j / norm[:, None]
+
+# solve the Schrodinger equation from time a to time b and a time step dt
+# for the time-independent Hamiltonian H (CSC matrix) by the Chebyshev propagator:
+# the spectral bounds are estimated once, and then the state is propagated by large
+# steps spanning many time steps dt; in each large step the Chebyshev vectors
+#   phi_n = T_n((H - e_c) / e_r) psi
+# are computed once, and the states on the fine grid are obtained as their
+# linear combinations with the Bessel function coefficients
+# eval_o(ti, psi): the same as in solve
+# out: optional array of shape (len(psi_0), b - a + 1) in which the states
+#      at all time steps a ... b are stored
+# tol: truncation threshold for the Chebyshev expansion
+# max_vectors: maximal number of the Chebyshev vectors kept in memory,
+#              which limits the length of the large step; ValueError is raised
+#              if even a single step dt needs more of them (reduce dt or increase max_vectors)
+# bounds: optional (e_min, e_max) bounds of the spectrum of H
+def solve_chebyshev(a, b, dt, H, psi_0, eval_o = None, psi = None, eval_a = 1, out = None, tol = 1e-12, max_vectors = 64, bounds = None):
+    if psi is None:
+        psi = np.zeros(psi_0.size, dtype = complex)
+
+    psi[:] = psi_0
+
+    if bounds is None:
+        bounds = spectral_bounds(H)
+    e_min, e_max = bounds
+    e_c = (e_max + e_min) / 2
+    e_r = max((e_max - e_min) / 2, 1e-14)
+
+    if not out is None:
+        out[:, 0] = psi
+    if eval_a == 1 and not eval_o is None:
+        eval_o(a, psi)
+
+    # the length of the large step (in units of dt)
+    n_steps = max(1, int((max_vectors - 20) / (e_r * dt)))
+    while n_steps > 1 and chebyshev_order(e_r * n_steps * dt, tol) > max_vectors:
+        n_steps = n_steps // 2
+    if chebyshev_order(e_r * n_steps * dt, tol) > max_vectors:
+        raise ValueError("The Chebyshev expansion of a single time step needs " + str(chebyshev_order(e_r * dt, tol)) +
+                         " vectors, more than max_vectors = " + str(max_vectors) + "; reduce dt or increase max_vectors")
+
+    n = psi_0.size
+    phi = np.zeros((max_vectors, n), dtype = complex)
+    tmp = np.zeros(n, dtype = complex)
+
+    # applies (H - e_c) / e_r
+    def apply(phi_in, phi_out):
+        la.mv(H, phi_in, phi_out, cin = 1 / e_r)
+        phi_out -= (e_c / e_r) * phi_in
+
+    ti = a
+    while ti < b:
+        k = min(n_steps, b - ti)
+        s = dt * np.arange(1, k + 1)
+        n_cheb = chebyshev_order(e_r * s[-1], tol)
+
+        # the Chebyshev vectors
+        phi[0, :] = psi
+        if n_cheb > 1:
+            apply(phi[0, :], phi[1, :])
+        for j in range(2, n_cheb):
+            apply(phi[j - 1, :], tmp)
+            phi[j, :] = 2 * tmp - phi[j - 2, :]
+
+        # coefficients of the expansion for each fine time step
+        orders = np.arange(n_cheb)
+        c = bessel_table(n_cheb, e_r * s) * ((-1j)**orders)[None, :]
+        c[:, 1 :] *= 2
+        c *= np.exp(-1j * e_c * s)[:, None]
+
+        # the states on the fine grid are combined in chunks
+        # of at most chunk_size elements
+        n_chunk = max(1, chunk_size // n)
+        for j0 in range(0, k, n_chunk):
+            j1 = min(j0 + n_chunk, k)
+            psi_chunk = phi[: n_cheb, :].T @ c[j0 : j1, :].T
+            if not out is None:
+                out[:, ti + j0 + 1 - a : ti + j1 + 1 - a] = psi_chunk
+            if not eval_o is None:
+                for j in range(j0, j1):
+                    eval_o(ti + j + 1, psi_chunk[:, j - j0])
+
+        psi[:] = psi_chunk[:, -1]
+
+        ti += k
+
+    return psi
+
+__all__ = ['solve_chebyshev', 'spectral_bounds']
@@ -0,0 +1,126 @@
+import os
+import json
+import numpy as np
+
+# methods whose state between the time steps is the wavefunction alone,
+# so that the propagation split into segments is bit-identical to the uninterrupted one
+checkpoint_methods = ['midpoint', 'krylov', 'cfm4']
+
+# options of solve which are stored in the checkpoint (as json) and reused by resume;
+# the others (e.g. precision, h_diag or stats) hold the arrays, objects or buffers
+# which the checkpoint does not restore
+checkpoint_options = ['method', 'krylov_tol', 'krylov_dim', 'anderson', 'max_iter']
+
+# atomically writes the checkpoint: the file is first written under
+# a temporary name and then renamed, so that a killed job leaves either
+# the previous or the new checkpoint, but never a broken one
+def write_checkpoint(path, state, accumulators):
+    arrays = dict(state)
+    for name, v in accumulators.items():
+        arrays['acc_' + name] = v
+    tmp = os.fspath(path) + '.tmp'
+    with open(tmp, 'wb') as f:
+        np.savez(f, **arrays)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+# propagates from the step state['step'] to state['b'] segment by segment
+# (backward for b < a) and writes the checkpoint after each segment
+def run_segments(path, state, apply_h, begin_step, eval_o, psi, accumulators, psi_mid, psi_mid_next):
+    from . import solve, takes_index
+
+    a, b, dt, every = int(state['a']), int(state['b']), float(state['dt']), int(state['every'])
+    o_steps = state['o_steps']
+    options = json.loads(str(state['options']))
+    s = 1 if b >= a else -1
+
+    psi_start = np.array(psi, dtype = complex)
+
+    step = int(state['step'])
+    while s * (b - step) > 0:
+        end = step + s * min(every, s * (b - step))
+
+        # the step a is evaluated in the first segment only,
+        # the other segments start from the already evaluated step;
+        # o_steps are in the order of the propagation, and the schedule of solve is increasing
+        lo = step if step == a else step + s
+        segment_steps = np.sort(o_steps[(s * o_steps >= s * lo) & (s * o_steps <= s * end)])
+        offset = int(np.count_nonzero(s * o_steps < s * lo))
+
+        eval_o_segment = eval_o
+        if not eval_o is None and takes_index(eval_o):
+            def eval_o_segment(ti, psi, k):
+                eval_o(ti, psi, k + offset)
+
+        psi_start[...] = psi
+        solve(step, end, dt, apply_h, psi_start, begin_step = begin_step, eval_o = eval_o_segment, psi = psi,
+              psi_mid = psi_mid, psi_mid_next = psi_mid_next, schedule = segment_steps, **options)
+
+        step = end
+        state['step'] = step
+        state['psi'] = psi
+        write_checkpoint(path, state, accumulators)
+
+    return psi
+
+# solve the Schrodinger equation from time a to time b and a time step dt (see solve)
+# writing the checkpoint of the solver state to the file path (str or pathlib.Path, npz format)
+# every `every` time steps; the propagation can then be continued by resume
+# accumulators: dict of the named arrays (e.g. the averages filled by eval_o)
+#               which are saved in the checkpoint together with the state
+# options: further keyword arguments of solve (method, krylov_tol, krylov_dim, anderson, max_iter),
+#          they are stored in the checkpoint and reused by resume;
+#          only the methods 'midpoint', 'krylov' and 'cfm4' are supported
+#          (and only 'midpoint' for the backward propagation b < a, as in solve)
+# returns: the final state
+def solve_checkpointed(a, b, dt, apply_h, psi_0, path, every = 1000, accumulators = None, begin_step = None, eval_o = None,
+                       psi = None, psi_mid = None, psi_mid_next = None, eval_a = 1, schedule = None, **options):
+    from . import output_steps
+
+    if options.get('method', 'midpoint') not in checkpoint_methods:
+        raise ValueError("Checkpointing supports only the methods " + str(checkpoint_methods))
+    unsupported = [k for k in options if not k in checkpoint_options]
+    if len(unsupported) > 0:
+        raise ValueError("Options " + str(unsupported) + " cannot be checkpointed, the supported options are " +
+                         str(checkpoint_options))
+    if every < 1:
+        raise ValueError("The checkpoint interval should be positive, got " + str(every))
+    if accumulators is None:
+        accumulators = {}
+
+    if psi is None:
+        psi = np.zeros(psi_0.shape, dtype = complex)
+    psi[...] = psi_0
+
+    state = {'a': a, 'b': b, 'dt': dt, 'step': a, 'every': every,
+             'o_steps': output_steps(a, b, eval_a, schedule),
+             'options': json.dumps(options)}
+
+    return run_segments(path, state, apply_h, begin_step, eval_o, psi, accumulators, psi_mid, psi_mid_next)
+
+# continue the propagation from the checkpoint written by solve_checkpointed
+# apply_h, begin_step, eval_o: the same callbacks as in the interrupted run
+# accumulators: dict of the arrays with the same names as in the interrupted run;
+#               their contents are restored from the checkpoint in place,
+#               so that eval_o continues filling them
+# The result is bit-identical to the uninterrupted propagation.
+# returns: the final state
+def resume(path, apply_h, begin_step = None, eval_o = None, accumulators = None, psi = None, psi_mid = None, psi_mid_next = None):
+    if accumulators is None:
+        accumulators = {}
+
+    with np.load(path) as f:
+        state = {k: f[k] for k in f.files if not k.startswith('acc_')}
+        for name, v in accumulators.items():
+            if not 'acc_' + name in f.files:
+                raise ValueError("Accumulator " + name + " is not found in the checkpoint " + os.fspath(path))
+            v[...] = f['acc_' + name]
+
+    if psi is None:
+        psi = np.zeros(state['psi'].shape, dtype = complex)
+    psi[...] = state['psi']
+
+    return run_segments(path, state, apply_h, begin_step, eval_o, psi, accumulators, psi_mid, psi_mid_next)
+
+__all__ = ['solve_checkpointed', 'resume']
@@ -0,0 +1,77 @@
+import numpy as np
+from . import _solve
+
+# imaginary-time propagation d psi / d tau = - H psi from the step a to the step b
+# with the step dt in the compiled loop (implicit midpoint rule, as in solve),
+# the state is renormalized after each step;
+# for a large enough b - a the state converges to the ground state of H
+# (or to the normalized thermal-like state exp(-H tau) psi_0 for e_tol = 0 and tau = (b - a) * dt,
+# up to the O(dt^2) error of the midpoint rule)
+# apply_h: the same as in solve, i.e. either the callback apply_h(ti, psi_in, psi_out)
+#          which adds H @ psi_in to psi_out or the Hamiltonian given as a CSC matrix,
+#          as a list of (coefficient, CSC matrix) terms or as a linalg.multiterm,
+#          linalg.indexmap or linalg.kron_operator operator
+# begin_step, eval_o, psi, psi_mid, psi_mid_next, eval_a, schedule: the same as in solve
+# e_tol: the propagation stops when the energy changes by less than e_tol in one step
+#        (e_tol = 0: propagate up to b)
+# max_iter: maximal number of the fixed-point iterations per step, RuntimeError is raised
+#           if a step has not converged in max_iter iterations
+# The fixed-point iteration of each step converges for dt * ||H|| < 2.
+# returns: the energy <psi|H|psi> at the last step, the number of the steps made
+#          and the normalized state psi
+def solve_imag(a, b, dt, apply_h, psi_0, begin_step = None, eval_o = None, psi = None, psi_mid = None, psi_mid_next = None,
+               eval_a = 1, schedule = None, e_tol = 1e-10, max_iter = 1000):
+    if max_iter < 1:
+        raise ValueError("max_iter should be positive")
+
+    from . import output_steps, indexed_callback, is_native_hamiltonian, native_hamiltonian, loop_hamiltonian
+
+    o_steps = output_steps(a, b, eval_a, schedule)
+    if o_steps.size == 0:
+        o_steps = np.array([max(a, b) + 1], dtype = np.int32)
+
+    call_begin = 1
+    if begin_step is None:
+        call_begin = 0
+        def begin_step(ti, psi):
+            pass
+
+    call_eval = 1
+    if eval_o is None:
+        call_eval = 0
+        def eval_o(ti, psi):
+            pass
+    eval_o = indexed_callback(eval_o)
+
+    apply_h = loop_hamiltonian(apply_h)
+
+    native = 0
+    if is_native_hamiltonian(apply_h):
+        native = 1
+        h_coef, h_data, h_ind, h_ptr = native_hamiltonian(apply_h, psi_0.size)
+        def apply_h(ti, psi_in, psi_out):
+            pass
+    else:
+        h_coef = np.zeros(1, dtype = complex)
+        h_data = np.zeros(1, dtype = complex)
+        h_ind = np.zeros(1, dtype = np.int32)
+        h_ptr = np.zeros((psi_0.size + 1, 1), dtype = np.int32)
+
+    if psi is None:
+        psi = np.zeros(psi_0.size, dtype = complex)
+
+    if psi_mid is None:
+        psi_mid = np.zeros(psi_0.size, dtype = complex)
+
+    if psi_mid_next is None:
+        psi_mid_next = np.zeros(psi_0.size, dtype = complex)
+
+    _, _, _, _, energy, n_done, n_capped = _solve.solve_imag(a, b, dt, begin_step, apply_h, eval_o, psi_0, psi, psi_mid, psi_mid_next,
+                                                             o_steps, call_begin, call_eval, native, h_coef, h_data, h_ind, h_ptr,
+                                                             e_tol, max_iter)
+    if n_capped != 0:
+        raise RuntimeError("The step " + str(a + n_done) + " did not converge in max_iter = " + str(max_iter) +
+                           " fixed-point iterations (dt * ||H|| should be below 2)")
+    return energy, n_done, psi
+
+__all__ = ['solve_imag']
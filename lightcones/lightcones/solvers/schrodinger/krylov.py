@@ -0,0 +1,123 @@
+import numpy as np
+from scipy.linalg import eigh_tridiagonal
+
+# the residual norm below which the Krylov subspace
+# is considered to be invariant (Lanczos breakdown)
+breakdown_tol = 1e-14
+
+# exponential of the tridiagonal matrix T = tridiag(alpha, beta)
+# applied to the first basis vector: y = exp(-i tau T) e_0
+def expm_tridiag_e0(alpha, beta, tau):
+    if len(alpha) == 1:
+        return np.array([np.exp(-1j * tau * alpha[0])])
+    e, s = eigh_tridiagonal(alpha, beta)
+    return s @ (np.exp(-1j * tau * e) * s[0, :])
+
+# compute psi_out = exp(-i tau H) psi_in
+# by the short-iterative Lanczos method
+# apply(phi_in, phi_out) adds H @ phi_in to phi_out
+# (the same convention as for the apply_h callback of solve)
+# the Krylov subspace is extended until the a-posteriori
+# error estimate
+#   err = |psi_in| * tau * beta_m * |y_{m-1}|
+# drops below tol or until its dimension reaches max_dim
+# v: optional workspace of shape (max_dim + 1, len(psi_in))
+# returns: (err, m) the error estimate and the dimension of the subspace
+def expm_krylov(apply, psi_in, psi_out, tau, tol = 1e-12, max_dim = 30, v = None):
+    n = psi_in.size
+    if v is None:
+        v = np.zeros((max_dim + 1, n), dtype = complex)
+
+    alpha = np.zeros(max_dim)
+    beta = np.zeros(max_dim)
+
+    norm = np.linalg.norm(psi_in)
+    if norm == 0:
+        psi_out[:] = 0
+        return 0.0, 0
+
+    v[0, :] = psi_in / norm
+
+    for m in range(1, max_dim + 1):
+        w = v[m, :]
+        w[:] = 0
+        apply(v[m - 1, :], w)
+        alpha[m - 1] = np.vdot(v[m - 1, :], w).real
+        w -= alpha[m - 1] * v[m - 1, :]
+        if m > 1:
+            w -= beta[m - 2] * v[m - 2, :]
+        beta[m - 1] = np.linalg.norm(w)
+
+        y = expm_tridiag_e0(alpha[: m], beta[: m - 1], tau)
+
+        if beta[m - 1] < breakdown_tol * max(1.0, abs(alpha[m - 1])):
+            err = 0.0
+        else:
+            err = norm * tau * beta[m - 1] * abs(y[m - 1])
+
+        if err < tol or m == max_dim:
+            break
+
+        w /= beta[m - 1]
+
+    psi_out[:] = norm * (y @ v[: m, :])
+
+    return err, m
+
+# make one step psi -> exp(-i dt H) psi in place;
+# if the Krylov subspace of dimension max_dim is not sufficient
+# to reach the tolerance then the step is split into substeps
+# returns the number of the applications of H
+def step_krylov(apply, psi, dt, tol, max_dim, v, psi_next):
+    n_sub = 1
+    while True:
+        psi_next[:] = psi
+        n_apply = 0
+        converged = True
+        for k in range(n_sub):
+            err, m = expm_krylov(apply, psi_next, psi_next, dt / n_sub, tol / n_sub, max_dim, v)
+            n_apply += m
+            if err >= tol / n_sub:
+                converged = False
+                break
+        if converged:
+            psi[:] = psi_next
+            return n_apply
+        n_sub *= 2
+
+# solve the Schrodinger equation from time a to time b and a time step dt
+# by the Krylov-exponential propagator:
+#   psi(ti + 1) = exp(-i dt H(ti)) psi(ti)
+# where H(ti) is given by the apply_h(ti, psi_in, psi_out) callback
+# (as in the midpoint solver, it corresponds to the time moment (ti + 0.5)*dt).
+# The callbacks begin_step and eval_o follow the same contract as in solve.
+# tol: tolerance for the a-posteriori error estimate of each step
+# max_dim: maximal dimension of the Krylov subspace
+def solve_krylov(a, b, dt, apply_h, psi_0, begin_step = None, eval_o = None, psi = None, eval_a = 1, tol = 1e-12, max_dim = 30):
+    if psi is None:
+        psi = np.zeros(psi_0.size, dtype = complex)
+
+    psi[:] = psi_0
+
+    v = np.zeros((max_dim + 1, psi_0.size), dtype = complex)
+    psi_next = np.zeros(psi_0.size, dtype = complex)
+
+    if eval_a == 1 and not eval_o is None:
+        eval_o(a, psi)
+
+    for ti in range(a, b):
+
+        if not begin_step is None:
+            begin_step(ti, psi)
+
+        def apply(phi_in, phi_out):
+            apply_h(ti, phi_in, phi_out)
+
+        step_krylov(apply, psi, dt, tol, max_dim, v, psi_next)
+
+        if not eval_o is None:
+            eval_o(ti + 1, psi)
+
+    return psi
+
+__all__ = ['expm_krylov', 'solve_krylov']
@@ -0,0 +1,58 @@
+import math
+import numpy as np
+from .krylov import step_krylov
+
+# Gauss-Legendre nodes (as fractions of the time step)
+# and the weights of the fourth-order commutator-free Magnus integrator:
+# psi(t + dt) = exp(-i dt (w1 H1 + w2 H2)) exp(-i dt (w2 H1 + w1 H2)) psi(t),
+# H1 = H(t + c1*dt), H2 = H(t + c2*dt)
+c1 = 0.5 - math.sqrt(3) / 6
+c2 = 0.5 + math.sqrt(3) / 6
+w1 = 0.25 - math.sqrt(3) / 6
+w2 = 0.25 + math.sqrt(3) / 6
+
+# solve the Schrodinger equation from time a to time b and a time step dt
+# by the fourth-order commutator-free Magnus integrator (CFM4)
+# apply_h(ti, s, psi_in, psi_out): extended callback which adds H @ psi_in to psi_out,
+#                                  where H is taken at the time moment (ti + s)*dt, 0 <= s <= 1
+#                                  (s = 0.5 corresponds to the midpoint used by the other methods)
+# The callbacks begin_step and eval_o follow the same contract as in solve.
+# The two exponentials of each step are computed by the Krylov propagator with
+# the tolerance tol and the maximal subspace dimension max_dim.
+def solve_cfm4(a, b, dt, apply_h, psi_0, begin_step = None, eval_o = None, psi = None, eval_a = 1, tol = 1e-12, max_dim = 30):
+    if psi is None:
+        psi = np.zeros(psi_0.size, dtype = complex)
+
+    psi[:] = psi_0
+
+    v = np.zeros((max_dim + 1, psi_0.size), dtype = complex)
+    psi_next = np.zeros(psi_0.size, dtype = complex)
+    tmp = np.zeros(psi_0.size, dtype = complex)
+
+    if eval_a == 1 and not eval_o is None:
+        eval_o(a, psi)
+
+    for ti in range(a, b):
+
+        if not begin_step is None:
+            begin_step(ti, psi)
+
+        def generator(wa, wb):
+            def apply(phi_in, phi_out):
+                tmp[:] = 0
+                apply_h(ti, c1, phi_in, tmp)
+                phi_out += wa * tmp
+                tmp[:] = 0
+                apply_h(ti, c2, phi_in, tmp)
+                phi_out += wb * tmp
+            return apply
+
+        step_krylov(generator(w2, w1), psi, dt, tol / 2, max_dim, v, psi_next)
+        step_krylov(generator(w1, w2), psi, dt, tol / 2, max_dim, v, psi_next)
+
+        if not eval_o is None:
+            eval_o(ti + 1, psi)
+
+    return psi
+
+__all__ = ['solve_cfm4']
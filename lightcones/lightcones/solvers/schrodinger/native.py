@@ -0,0 +1,63 @@
+import warnings
+import numpy as np
+from . import _solve
+
+# solve the Schrodinger equation from time a to time b and a time step dt
+# entirely in the compiled loop (midpoint rule, as in solve): the Hamiltonian is native
+# and the averages of the observables are computed in the loop (the observable bank of solve),
+# so that no Python callback is made and the GIL is released
+# for the whole propagation; independent trajectories can then be propagated
+# in parallel threads (e.g. by concurrent.futures.ThreadPoolExecutor) sharing
+# the same operators without copying or pickling them
+# h: CSC matrix or list of (coefficient, CSC matrix) terms
+# observables: list of CSC matrices and real vectors (diagonal observables), see solve
+#              (may be empty, then only psi is propagated)
+# psi, psi_mid, psi_mid_next, eval_a, schedule, h_diag, max_iter: the same as in solve;
+#                                                                  the buffers are not shared between the threads
+#                                                                  (use max_iter for the steps which may be too stiff:
+#                                                                  the loop cannot be interrupted from Python)
+# returns: the complex array of shape (len(observables), number of the output steps)
+#          of the averages at the output steps (see output_steps)
+def solve_native(a, b, dt, h, psi_0, observables, psi = None, psi_mid = None, psi_mid_next = None, eval_a = 1,
+                 schedule = None, h_diag = None, max_iter = None):
+    from . import output_steps, is_native_hamiltonian, native_hamiltonian, native_observables
+
+    if not is_native_hamiltonian(h):
+        raise ValueError("solve_native needs the Hamiltonian given as a CSC matrix or as a list of (coefficient, CSC matrix) terms")
+    if not max_iter is None and max_iter < 1:
+        raise ValueError("max_iter should be positive")
+
+    n = psi_0.size
+    h_coef, h_data, h_ind, h_ptr = native_hamiltonian(h, n)
+    bank = native_observables(observables, n)
+
+    o_steps = output_steps(a, b, eval_a, schedule)
+    n_out = o_steps.size
+    if n_out == 0:
+        o_steps = np.array([max(a, b) + 1], dtype = np.int32)
+    # f2py does not accept empty arrays
+    averages = np.zeros((max(len(observables), 1), max(n_out, 1)), dtype = complex)
+
+    diag = 0
+    d_phase = np.ones(n, dtype = complex)
+    if not h_diag is None:
+        diag = 1
+        d_phase = np.exp(-0.5j * np.sign(b - a) * dt * np.asarray(h_diag, dtype = float))
+
+    if psi is None:
+        psi = np.zeros(n, dtype = complex)
+
+    if psi_mid is None:
+        psi_mid = np.zeros(n, dtype = complex)
+
+    if psi_mid_next is None:
+        psi_mid_next = np.zeros(n, dtype = complex)
+
+    n_capped = _solve.solve_native(a, b, dt, psi_0, psi, psi_mid, psi_mid_next, o_steps, h_coef, h_data, h_ind, h_ptr,
+                                   *bank, averages.T, diag, d_phase, max_iter or 0)[-1]
+    if n_capped > 0:
+        warnings.warn(str(n_capped) + " steps did not converge in max_iter = " + str(max_iter) + " fixed-point iterations",
+                      RuntimeWarning)
+    return averages[: len(observables), : n_out]
+
+__all__ = ['solve_native']
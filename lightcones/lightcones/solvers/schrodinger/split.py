@@ -0,0 +1,81 @@
+import numpy as np
+
+# weights of the Yoshida triple jump: the fourth-order step is
+# S4(dt) = S2(y1 dt) S2(y0 dt) S2(y1 dt), where S2 is the second-order Strang step
+y1 = 1 / (2 - 2**(1 / 3))
+y0 = -2**(1 / 3) / (2 - 2**(1 / 3))
+
+# psi_out = exp(-i tau V) psi by the Taylor series truncated at the order n,
+# which costs exactly n applications of V;
+# term and tmp: buffers of the size of psi
+def expm_taylor(apply, psi, tau, n, term, tmp):
+    term[:] = psi
+    for k in range(1, n + 1):
+        tmp[:] = 0
+        apply(term, tmp)
+        np.multiply(tmp, -1j * tau / k, out = term)
+        psi += term
+
+# solve the Schrodinger equation from time a to time b and a time step dt
+# for the Hamiltonian H = diag(h_diag) + V by the split-operator method:
+# the diagonal part is applied as the elementwise phases exp(-i h_diag s),
+# and the hopping (off-diagonal) part V by the Taylor series of exp(-i V s)
+# truncated at the order taylor_order, so that each step costs a fixed number
+# of applications of V (taylor_order for order = 2, 3 * taylor_order for order = 4)
+# and no fixed-point iteration is needed
+# apply_h(ti, psi_in, psi_out): adds V @ psi_in to psi_out, V is taken at the time moment (ti + 0.5)*dt
+#                               (ti is fractional for the substeps of the fourth-order method)
+# h_diag: real vector, the time-independent diagonal part of the Hamiltonian
+# order: 2 (Strang splitting) or 4 (Yoshida triple jump of the Strang steps)
+# The callbacks begin_step and eval_o follow the same contract as in solve.
+def solve_split(a, b, dt, apply_h, h_diag, psi_0, begin_step = None, eval_o = None, psi = None, eval_a = 1,
+                order = 2, taylor_order = 4):
+    if order == 2:
+        stages = [1.0]
+    elif order == 4:
+        stages = [y1, y0, y1]
+    else:
+        raise ValueError("The split-operator method is of order 2 or 4, got " + str(order))
+
+    if psi is None:
+        psi = np.zeros(psi_0.size, dtype = complex)
+
+    psi[:] = psi_0
+
+    # the diagonal phases before, between and after the hopping substeps
+    # (the adjacent half-steps of the Strang steps are merged)
+    d = np.asarray(h_diag, dtype = float)
+    fractions = [stages[0] / 2] + [(stages[j] + stages[j + 1]) / 2 for j in range(len(stages) - 1)] + [stages[-1] / 2]
+    phases = [np.exp(-1j * f * dt * d) for f in fractions]
+
+    # centers of the hopping substeps as fractions of the step
+    centers = np.cumsum(stages) - np.array(stages) / 2
+
+    term = np.zeros(psi_0.size, dtype = complex)
+    tmp = np.zeros(psi_0.size, dtype = complex)
+
+    if eval_a == 1 and not eval_o is None:
+        eval_o(a, psi)
+
+    for ti in range(a, b):
+
+        if not begin_step is None:
+            begin_step(ti, psi)
+
+        psi *= phases[0]
+
+        for j, w in enumerate(stages):
+
+            def apply(phi_in, phi_out):
+                apply_h(ti + centers[j] - 0.5, phi_in, phi_out)
+
+            expm_taylor(apply, psi, w * dt, taylor_order, term, tmp)
+
+            psi *= phases[j + 1]
+
+        if not eval_o is None:
+            eval_o(ti + 1, psi)
+
+    return psi
+
+__all__ = ['solve_split']
@@ -0,0 +1,95 @@
+import time
+import numpy as np
+
+# performance counters and convergence telemetry of solve:
+# pass an instance as solve(..., stats = solve_stats()) or stats = True
+# n_iter: number of the fixed-point iterations of each step
+#         ('midpoint' method only, the step a + i is at the index i)
+# err: final error of the fixed-point iteration of each step ('midpoint' method only)
+# n_capped: number of the steps stopped by max_iter before reaching the tolerance
+# n_accepted, n_rejected: number of the accepted and the rejected steps of the error control
+#                         ('adaptive' method only)
+# n_apply: total number of the Hamiltonian applications
+# time_apply_h, time_begin_step, time_eval_o: wall time spent in the callbacks
+#                                             (apply_h is not called back for the native Hamiltonian)
+# time_total: wall time of the whole solve call
+class solve_stats:
+    def __init__(self):
+        self.n_iter = np.zeros(0, dtype = np.int32)
+        self.err = np.zeros(0)
+        self.n_capped = 0
+        self.n_accepted = 0
+        self.n_rejected = 0
+        self.n_apply = 0
+        self.n_begin_step = 0
+        self.n_eval_o = 0
+        self.time_apply_h = 0.0
+        self.time_begin_step = 0.0
+        self.time_eval_o = 0.0
+        self.time_total = 0.0
+
+    # the steps with at least n fixed-point iterations
+    # (e.g. the steps where the iteration nearly stalls)
+    def slow_steps(self, n, a = 0):
+        return a + np.flatnonzero(self.n_iter >= n)
+
+    @property
+    def err_max(self):
+        return self.err.max() if self.err.size > 0 else 0.0
+
+    @property
+    def err_mean(self):
+        return self.err.mean() if self.err.size > 0 else 0.0
+
+    # wall time spent outside of the callbacks (the solver itself)
+    @property
+    def time_solver(self):
+        return self.time_total - self.time_apply_h - self.time_begin_step - self.time_eval_o
+
+    def __repr__(self):
+        s = 'solve_stats(steps = ' + str(self.n_iter.size) + ', n_apply = ' + str(self.n_apply)
+        if self.n_iter.size > 0:
+            s += ', iterations per step: mean ' + format(self.n_iter.mean(), '.2f') + ' max ' + str(self.n_iter.max())
+            s += ', err: mean ' + format(self.err_mean, '.3e') + ' max ' + format(self.err_max, '.3e')
+        if self.n_accepted > 0:
+            s += ', adaptive steps: accepted ' + str(self.n_accepted) + ' rejected ' + str(self.n_rejected)
+        s += ', time: total ' + format(self.time_total, '.3f') + ' s, solver ' + format(self.time_solver, '.3f') + ' s'
+        s += ', apply_h ' + format(self.time_apply_h, '.3f') + ' s'
+        s += ', begin_step ' + format(self.time_begin_step, '.3f') + ' s'
+        s += ', eval_o ' + format(self.time_eval_o, '.3f') + ' s)'
+        return s
+
+    # wraps the callback f so that its calls are counted and timed
+    # in the counter `name` ('apply', 'begin_step' or 'eval_o');
+    # the number of the positional arguments of f is preserved
+    # (f2py passes to the callback only the arguments it accepts)
+    def timed(self, f, name, n_args):
+        stats = self
+        def record(t):
+            if name == 'apply':
+                stats.n_apply += 1
+                stats.time_apply_h += t
+            elif name == 'begin_step':
+                stats.n_begin_step += 1
+                stats.time_begin_step += t
+            else:
+                stats.n_eval_o += 1
+                stats.time_eval_o += t
+        if n_args == 2:
+            def g(x, y):
+                t0 = time.perf_counter()
+                f(x, y)
+                record(time.perf_counter() - t0)
+        elif n_args == 3:
+            def g(x, y, z):
+                t0 = time.perf_counter()
+                f(x, y, z)
+                record(time.perf_counter() - t0)
+        else:
+            def g(x, y, z, w):
+                t0 = time.perf_counter()
+                f(x, y, z, w)
+                record(time.perf_counter() - t0)
+        return g
+
+__all__ = ['solve_stats']
@@ -0,0 +1,110 @@
+import asyncio
+import numpy as np
+
+# resumable propagation from time a to time b with a time step dt (see solve)
+# which yields the states at the steps of the schedule instead of calling eval_o:
+#
+#     for ti, psi in propagator(a, b, dt, apply_h, psi_0, schedule = 10):
+#         ...
+#
+# psi is a view of an internal buffer, valid until the next state is requested
+# (copy it to keep it); the iteration can be interrupted and continued later
+# from the same object, and the result does not depend on the interruptions
+# (the propagation between the yielded steps is made by solve, segment by segment)
+# The asynchronous iteration
+#
+#     async for ti, psi in propagator(...):
+#         ...
+#
+# propagates to the next step in a worker thread of the event loop while the consumer
+# processes the current state (two state buffers are used). For the native Hamiltonian
+# (CSC matrix or list of terms) without begin_step the segments are propagated
+# by solve_native, which releases the GIL, so that the propagation really overlaps
+# with the processing; otherwise the callbacks run in the worker thread.
+# Do not mix the synchronous and asynchronous iteration of the same object.
+# apply_h, begin_step, eval_a, schedule: the same as in solve
+# options: further keyword arguments of solve; only the methods 'midpoint', 'krylov'
+#          and 'cfm4' are supported (the methods whose propagation split into segments
+#          is identical to the uninterrupted one)
+class propagator:
+    def __init__(self, a, b, dt, apply_h, psi_0, begin_step = None, eval_a = 1, schedule = None, **options):
+        from . import output_steps, is_native_hamiltonian, wide_hamiltonian
+        from .checkpoint import checkpoint_methods
+
+        if options.get('method', 'midpoint') not in checkpoint_methods:
+            raise ValueError("propagator supports only the methods " + str(checkpoint_methods))
+        if 'eval_o' in options or 'observables' in options:
+            raise ValueError("propagator yields the states instead of calling eval_o or evaluating the observables")
+
+        self.a = a
+        self.b = b
+        self.dt = dt
+        self.apply_h = apply_h
+        self.begin_step = begin_step
+        self.options = options
+        self.steps = output_steps(a, b, eval_a, schedule)
+
+        # the compiled loop without callbacks is used when solve would not need them
+        self.native = is_native_hamiltonian(apply_h) and not wide_hamiltonian(apply_h) and begin_step is None and np.ndim(psi_0) == 1 and \
+            set(options) <= {'method', 'h_diag', 'max_iter'} and options.get('method', 'midpoint') == 'midpoint'
+
+        self.ti = a
+        self.buffers = [np.array(psi_0, dtype = complex), np.zeros(np.shape(psi_0), dtype = complex)]
+        self.current = 0
+        self.k = 0
+        self.pending = None
+
+    # the state at the current step ti
+    @property
+    def psi(self):
+        return self.buffers[self.current]
+
+    # propagates the current state to the step target into the other buffer
+    def advance(self, target):
+        from . import solve, solve_native
+
+        if target == self.ti:
+            return
+        psi_in, psi_out = self.buffers[self.current], self.buffers[1 - self.current]
+        if self.native:
+            solve_native(self.ti, target, self.dt, self.apply_h, psi_in, [], psi = psi_out, schedule = [],
+                         h_diag = self.options.get('h_diag'), max_iter = self.options.get('max_iter'))
+        else:
+            solve(self.ti, target, self.dt, self.apply_h, psi_in, begin_step = self.begin_step, psi = psi_out,
+                  schedule = [], **self.options)
+        self.current = 1 - self.current
+        self.ti = target
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        if self.k >= len(self.steps):
+            raise StopIteration
+        self.advance(int(self.steps[self.k]))
+        self.k += 1
+        return self.ti, self.psi
+
+    def __aiter__(self):
+        return self
+
+    def prefetch(self):
+        return asyncio.get_running_loop().run_in_executor(None, self.advance, int(self.steps[self.k]))
+
+    async def __anext__(self):
+        if self.k >= len(self.steps):
+            raise StopAsyncIteration
+        if self.pending is None:
+            self.pending = self.prefetch()
+        await self.pending
+        self.pending = None
+
+        ti, psi = self.ti, self.psi
+        self.k += 1
+
+        # the next segment reads psi and overwrites the buffer of the previous state
+        if self.k < len(self.steps):
+            self.pending = self.prefetch()
+        return ti, psi
+
+__all__ = ['propagator']
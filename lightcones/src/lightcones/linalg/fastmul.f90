@@ -1,72 +1,283 @@
+! the kernel bodies are in fastmul/*.inc, written with the integer kind ik of the indices;
+! each body is included here with ik = 4 and below with ik = 8 (the _i8 versions),
+! so the directory of this file should be on the include path (-I)
+
 subroutine fastmul(a_data, n_data, a_ind, n_ind, a_ptr, n_ptr, cin, vin, n_vin, cout, vout)
     implicit none
     
-    complex*16, intent(inout), dimension(n_data) :: a_data
-    integer :: n_data
-    !f2py intent(in,out,overwrite) a_data
-    !f2py integer intent(hide), depend(a_data) :: n_data = len(a_data)
+    integer, parameter :: ik = 4
+    
+    include 'fastmul/fastmul.inc'
+    
+end subroutine fastmul
+
+! the same as fastmul, but for the block of vectors:
+! vout(:, k) = cin * sum_i m(k, i) * vin(:, i) + cout * vout(:, k)
+! the block is stored with the vector index running fastest,
+! i.e. vin(l, i) is the component i of the vector l
+! (this is the memory layout of the C-ordered numpy array of shape (n_vin, n_vec)
+! passed as its transpose)
+subroutine fastmul_block(a_data, n_data, a_ind, n_ind, a_ptr, n_ptr, cin, vin, n_vec, n_vin, cout, vout)
+    implicit none
+    
+    integer, parameter :: ik = 4
+    
+    include 'fastmul/fastmul_block.inc'
+    
+end subroutine fastmul_block
+
+! single precision (complex*8) versions of fastmul and fastmul_block
+subroutine fastmul_c(a_data, n_data, a_ind, n_ind, a_ptr, n_ptr, cin, vin, n_vin, cout, vout)
+    implicit none
+    
+    integer, parameter :: ik = 4
+    
+    include 'fastmul/fastmul_c.inc'
+    
+end subroutine fastmul_c
+
+subroutine fastmul_block_c(a_data, n_data, a_ind, n_ind, a_ptr, n_ptr, cin, vin, n_vec, n_vin, cout, vout)
+    implicit none
+    
+    integer, parameter :: ik = 4
+    
+    include 'fastmul/fastmul_block_c.inc'
+    
+end subroutine fastmul_block_c
+
+! the same as fastmul, but for the matrix in the CSR format (a_ptr are the row pointers):
+! each element vout(k) = cin * sum_i m(k, i) * vin(i) + cout * vout(k) is gathered
+! by one thread, so that the rows are distributed over n_threads OpenMP threads
+! without the write conflicts of the CSC scatter loop (and the result does not depend
+! on the number of threads); the GIL is released during the multiplication
+subroutine fastmul_csr(a_data, n_data, a_ind, a_ptr, cin, vin, n_vin, cout, vout, n_threads)
+    implicit none
+    
+    integer, parameter :: ik = 4
+    
+    include 'fastmul/fastmul_csr.inc'
+    
+end subroutine fastmul_csr
+
+! the same as fastmul_csr, but for the block of vectors (see fastmul_block)
+subroutine fastmul_block_csr(a_data, n_data, a_ind, a_ptr, cin, vin, n_vec, n_vin, cout, vout, n_threads)
+    implicit none
     
-    integer, intent(inout), dimension(n_ind) :: a_ind
-    integer :: n_ind
-    !f2py intent(in,out,overwrite) a_ind
-    !f2py integer intent(hide), depend(a_ind) :: n_ind = len(a_ind)
+    integer, parameter :: ik = 4
     
-    integer, intent(out), dimension(n_ptr) :: a_ptr
-    integer :: n_ptr
-    !f2py intent(in,out,overwrite) a_ptr
-    !f2py integer intent(hide), depend(a_ptr) :: n_ptr = len(a_ptr)
+    include 'fastmul/fastmul_block_csr.inc'
+    
+end subroutine fastmul_block_csr
+
+! vout = cin * sum_k coef(k) * m_k @ vin + cout * vout for the CSC matrices m_k
+! concatenated in a_data, a_ind, where a_ptr(:, k) are the column pointers of m_k
+! (already shifted by the offset of m_k in a_data); all the terms are accumulated
+! in one pass over the columns, so that vin is read once and no sum of the matrices
+! has to be assembled
+subroutine fastmul_terms(coef, n_terms, a_data, n_data, a_ind, a_ptr, cin, vin, n_vin, cout, vout)
+    implicit none
+    
+    integer, parameter :: ik = 4
+    
+    include 'fastmul/fastmul_terms.inc'
+    
+end subroutine fastmul_terms
+
+! the same as fastmul_terms, but for the block of vectors (see fastmul_block)
+subroutine fastmul_block_terms(coef, n_terms, a_data, n_data, a_ind, a_ptr, cin, vin, n_vec, n_vin, cout, vout)
+    implicit none
+    
+    integer, parameter :: ik = 4
+    
+    include 'fastmul/fastmul_block_terms.inc'
+    
+end subroutine fastmul_block_terms
+
+! compute vout = cin * H vin + cout * vout
+! for the matrix-free operator H = sum_k coef(k) B_k A_k given by the weighted index maps
+! (see linalg.indexmap): the map m sends the basis vector i to w(m, i) times the basis vector
+! ind(m, i) + 1 (ind(m, i) = -1: to zero); the term k applies the map t_first(k) + 1 and then
+! the map t_second(k) + 1 (t_second(k) = -1: the term is the single map);
+! the terms are accumulated in one pass over the components of vin
+subroutine fastmul_maps(coef, n_terms, t_first, t_second, ind, w, n_maps, cin, vin, n_vin, cout, vout)
+    implicit none
+    
+    complex*16, intent(in), dimension(n_terms) :: coef
+    integer :: n_terms
+    !f2py integer intent(hide), depend(coef) :: n_terms = len(coef)
+    
+    integer, intent(in), dimension(n_terms) :: t_first, t_second
+    
+    integer, intent(in), dimension(n_maps, n_vin) :: ind
+    integer :: n_maps
+    !f2py integer intent(hide), depend(ind) :: n_maps = shape(ind, 0)
+    
+    real*8, intent(in), dimension(n_maps, n_vin) :: w
     
     complex*16, intent(in) :: cin, cout
     
-    complex*16, intent(inout), dimension(n_vin) :: vin
+    complex*16, intent(in), dimension(n_vin) :: vin
     integer :: n_vin
-    !f2py intent(in,out,overwrite) vin
     !f2py integer intent(hide), depend(vin) :: n_vin = len(vin)
     
     complex*16, intent(inout), dimension(n_vin) :: vout
     !f2py intent(in,out,overwrite) vout
     
-    integer :: i, j, k
-    complex*16 :: vd, md
+    integer :: i, k, p
+    real*8 :: x
+    complex*16, dimension(n_terms) :: c
     
     if (cout .eq. (0d0, 0d0)) then
-    
         vout = 0d0
+    else if (cout .ne. (1d0, 0d0)) then
+        vout = cout * vout
+    end if
     
-    else 
+    c = cin * coef
     
-        if (cout .ne. (1d0, 0d0)) then
+    do i = 1, n_vin
+        do k = 1, n_terms
+            p = ind(t_first(k) + 1, i)
+            if (p .lt. 0) cycle
+            x = w(t_first(k) + 1, i)
+            if (t_second(k) .ge. 0) then
+                x = x * w(t_second(k) + 1, p + 1)
+                p = ind(t_second(k) + 1, p + 1)
+                if (p .lt. 0) cycle
+            end if
+            vout(p + 1) = vout(p + 1) + (c(k) * x) * vin(i)
+        end do
+    end do
+    
+end subroutine fastmul_maps
 
-            vout = cout * vout
-            
-        end if
+! the same as fastmul_maps, but for the block of vectors (see fastmul_block)
+subroutine fastmul_block_maps(coef, n_terms, t_first, t_second, ind, w, n_maps, cin, vin, n_vec, n_vin, cout, vout)
+    implicit none
+    
+    complex*16, intent(in), dimension(n_terms) :: coef
+    integer :: n_terms
+    !f2py integer intent(hide), depend(coef) :: n_terms = len(coef)
+    
+    integer, intent(in), dimension(n_terms) :: t_first, t_second
+    
+    integer, intent(in), dimension(n_maps, n_vin) :: ind
+    integer :: n_maps
+    !f2py integer intent(hide), depend(ind) :: n_maps = shape(ind, 0)
     
+    real*8, intent(in), dimension(n_maps, n_vin) :: w
+    
+    complex*16, intent(in) :: cin, cout
+    
+    complex*16, intent(in), dimension(n_vec, n_vin) :: vin
+    integer :: n_vec, n_vin
+    !f2py integer intent(hide), depend(vin) :: n_vec = shape(vin, 0)
+    !f2py integer intent(hide), depend(vin) :: n_vin = shape(vin, 1)
+    
+    complex*16, intent(inout), dimension(n_vec, n_vin) :: vout
+    !f2py intent(in,out,overwrite) vout
+    
+    integer :: i, k, p
+    real*8 :: x
+    complex*16, dimension(n_terms) :: c
+    
+    if (cout .eq. (0d0, 0d0)) then
+        vout = 0d0
+    else if (cout .ne. (1d0, 0d0)) then
+        vout = cout * vout
     end if
     
+    c = cin * coef
+    
+    do i = 1, n_vin
+        do k = 1, n_terms
+            p = ind(t_first(k) + 1, i)
+            if (p .lt. 0) cycle
+            x = w(t_first(k) + 1, i)
+            if (t_second(k) .ge. 0) then
+                x = x * w(t_second(k) + 1, p + 1)
+                p = ind(t_second(k) + 1, p + 1)
+                if (p .lt. 0) cycle
+            end if
+            vout(:, p + 1) = vout(:, p + 1) + (c(k) * x) * vin(:, i)
+        end do
+    end do
+    
+end subroutine fastmul_block_maps
+
+! 64-bit index versions (suffix _i8) of the kernels above for the matrices whose indices
+! and pointers are int64 (scipy switches to them when nnz does not fit into int32),
+! so that such matrices are passed without copying or truncating the indices;
+! linalg.mv selects them by the dtype of indptr
 
+subroutine fastmul_i8(a_data, n_data, a_ind, n_ind, a_ptr, n_ptr, cin, vin, n_vin, cout, vout)
+    implicit none
     
-    if (cin .ne. (1d0, 0d0)) then
+    integer, parameter :: ik = 8
     
-        do i = 1, n_vin
-            vd = vin(i)
-            do j = a_ptr(i) + 1, a_ptr(i + 1)
-                k = a_ind(j) + 1
-                md = a_data(j)
-                vout(k) = vout(k) + cin * md * vd
-            end do
-        end do
+    include 'fastmul/fastmul.inc'
     
-    else
+end subroutine fastmul_i8
+
+subroutine fastmul_block_i8(a_data, n_data, a_ind, n_ind, a_ptr, n_ptr, cin, vin, n_vec, n_vin, cout, vout)
+    implicit none
     
-        do i = 1, n_vin
-            vd = vin(i)
-            do j = a_ptr(i) + 1, a_ptr(i + 1)
-                k = a_ind(j) + 1
-                md = a_data(j)
-                vout(k) = vout(k) + md * vd
-            end do
-        end do
+    integer, parameter :: ik = 8
     
-    end if
+    include 'fastmul/fastmul_block.inc'
     
-end subroutine fastmul
+end subroutine fastmul_block_i8
+
+subroutine fastmul_c_i8(a_data, n_data, a_ind, n_ind, a_ptr, n_ptr, cin, vin, n_vin, cout, vout)
+    implicit none
+    
+    integer, parameter :: ik = 8
+    
+    include 'fastmul/fastmul_c.inc'
+    
+end subroutine fastmul_c_i8
+
+subroutine fastmul_block_c_i8(a_data, n_data, a_ind, n_ind, a_ptr, n_ptr, cin, vin, n_vec, n_vin, cout, vout)
+    implicit none
+    
+    integer, parameter :: ik = 8
+    
+    include 'fastmul/fastmul_block_c.inc'
+    
+end subroutine fastmul_block_c_i8
+
+subroutine fastmul_csr_i8(a_data, n_data, a_ind, a_ptr, cin, vin, n_vin, cout, vout, n_threads)
+    implicit none
+    
+    integer, parameter :: ik = 8
+    
+    include 'fastmul/fastmul_csr.inc'
+    
+end subroutine fastmul_csr_i8
+
+subroutine fastmul_block_csr_i8(a_data, n_data, a_ind, a_ptr, cin, vin, n_vec, n_vin, cout, vout, n_threads)
+    implicit none
+    
+    integer, parameter :: ik = 8
+    
+    include 'fastmul/fastmul_block_csr.inc'
+    
+end subroutine fastmul_block_csr_i8
+
+subroutine fastmul_terms_i8(coef, n_terms, a_data, n_data, a_ind, a_ptr, cin, vin, n_vin, cout, vout)
+    implicit none
+    
+    integer, parameter :: ik = 8
+    
+    include 'fastmul/fastmul_terms.inc'
+    
+end subroutine fastmul_terms_i8
+
+subroutine fastmul_block_terms_i8(coef, n_terms, a_data, n_data, a_ind, a_ptr, cin, vin, n_vec, n_vin, cout, vout)
+    implicit none
+    
+    integer, parameter :: ik = 8
+    
+    include 'fastmul/fastmul_block_terms.inc'
+    
+end subroutine fastmul_block_terms_i8
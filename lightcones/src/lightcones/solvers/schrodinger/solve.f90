@@ -1,4 +1,7 @@
-subroutine solve(a, b, dt, begin_step, apply_H, eval_o, psi_in, n_psi, psi, psi_mid, psi_mid_next, eval_a)
+subroutine solve(a, b, dt, begin_step, apply_H, eval_o, psi_in, n_psi, psi, psi_mid, psi_mid_next, o_steps, n_o, &
+    call_begin, call_eval, native, h_coef, n_terms, h_data, n_data, h_ind, h_ptr, &
+    n_iter, err_step, n_stat, diag, d_phase, n_sp, o_data, n_odata, o_ind, o_ptr, n_sp_cols, n_dg, o_diag, n_dg_cols, &
+    o_row, n_rows, averages, n_out, n_avg, n_anderson, max_iter, n_capped)
 
     implicit none
     
@@ -19,9 +22,103 @@ subroutine solve(a, b, dt, begin_step, apply_H, eval_o, psi_in, n_psi, psi, psi_
     complex*16, intent(inout), dimension(n_psi) :: psi_mid_next
     !f2py intent(in,out,overwrite) psi_mid_next
     
-    integer, intent(in) :: eval_a
+    ! o_steps: increasing list of the time steps at which eval_o is called;
+    !          eval_o also receives the index of the entry in o_steps (starting from 0)
+    integer, intent(in), dimension(n_o) :: o_steps
+    integer :: n_o
+    !f2py integer intent(hide), depend(o_steps) :: n_o = len(o_steps)
     
-    real*8 :: tol, err
+    ! call_begin = 0: do not call begin_step
+    ! call_eval = 0: do not call eval_o
+    ! native = 1: apply the Hamiltonian H = sum_k h_coef(k) * H_k
+    !             given in the CSC format instead of calling apply_H;
+    !             the terms H_k are concatenated in h_data, h_ind,
+    !             and h_ptr(:, k) are the column pointers of the term k
+    !             (already shifted by the offset of the term in h_data)
+    !             (all the terms are applied in one pass over the columns)
+    integer, intent(in) :: call_begin, call_eval, native
+    
+    complex*16, intent(in), dimension(n_terms) :: h_coef
+    integer :: n_terms
+    !f2py integer intent(hide), depend(h_coef) :: n_terms = len(h_coef)
+    
+    complex*16, intent(in), dimension(n_data) :: h_data
+    integer :: n_data
+    !f2py integer intent(hide), depend(h_data) :: n_data = len(h_data)
+    
+    integer, intent(in), dimension(n_data) :: h_ind
+    
+    integer, intent(in), dimension(n_psi + 1, n_terms) :: h_ptr
+    
+    ! n_iter(i - a + 1), err_step(i - a + 1): the number of the fixed-point iterations
+    !                                         and the final error of the step i
+    !                                         (only the first n_stat steps are recorded)
+    integer, intent(inout), dimension(n_stat) :: n_iter
+    !f2py intent(in,out,overwrite) n_iter
+    real*8, intent(inout), dimension(n_stat) :: err_step
+    !f2py intent(in,out,overwrite) err_step
+    integer :: n_stat
+    !f2py integer intent(hide), depend(n_iter) :: n_stat = len(n_iter)
+    
+    ! b < a: backward propagation from the step a down to the step b;
+    !        the step between i and i - 1 is the inverse of the forward step from i - 1 to i,
+    !        begin_step and apply_H are called with i - 1 (the index of the time interval)
+    ! diag = 1: interaction picture with respect to the diagonal part D of the Hamiltonian:
+    !           each step is exp(-i D dt / 2) (midpoint step with apply_H) exp(-i D dt / 2),
+    !           d_phase = exp(-i D dt / 2) (then apply_H and h_* give the remainder H - D);
+    !           the fast oscillations due to D do not limit dt, and the states passed
+    !           to the callbacks at the time steps are in the Schrodinger picture
+    integer, intent(in) :: diag
+    
+    complex*16, intent(in), dimension(n_psi) :: d_phase
+    
+    ! observable bank: the averages of the observables are computed at the steps o_steps
+    ! (together with eval_o) into the row io of averages; n_sp CSC observables are
+    ! concatenated in o_data, o_ind, o_ptr (as the terms of the Hamiltonian),
+    ! n_dg diagonal observables are the columns of o_diag, and o_row(k) is the column
+    ! of averages (starting from 0) for the observable k (the CSC ones first); see eval_averages
+    integer, intent(in) :: n_sp, n_dg
+    
+    complex*16, intent(in), dimension(n_odata) :: o_data
+    integer :: n_odata
+    !f2py integer intent(hide), depend(o_data) :: n_odata = len(o_data)
+    
+    integer, intent(in), dimension(n_odata) :: o_ind
+    
+    integer, intent(in), dimension(n_psi + 1, n_sp_cols) :: o_ptr
+    integer :: n_sp_cols
+    !f2py integer intent(hide), depend(o_ptr) :: n_sp_cols = shape(o_ptr, 1)
+    
+    real*8, intent(in), dimension(n_psi, n_dg_cols) :: o_diag
+    integer :: n_dg_cols
+    !f2py integer intent(hide), depend(o_diag) :: n_dg_cols = shape(o_diag, 1)
+    
+    integer, intent(in), dimension(n_rows) :: o_row
+    integer :: n_rows
+    !f2py integer intent(hide), depend(o_row) :: n_rows = len(o_row)
+    
+    complex*16, intent(inout), dimension(n_out, n_avg) :: averages
+    !f2py intent(in,out,overwrite) averages
+    integer :: n_out, n_avg
+    !f2py integer intent(hide), depend(averages) :: n_out = shape(averages, 0)
+    !f2py integer intent(hide), depend(averages) :: n_avg = shape(averages, 1)
+    
+    ! n_anderson > 0: the fixed-point iteration is accelerated by the Anderson mixing
+    !                 with the history of n_anderson last iterates (see anderson_mix in solve/midpoint_step.inc),
+    !                 which converges also for the stiff steps dt * ||H|| > 2
+    !                 where the plain iteration diverges (the plain iteration converges
+    !                 for dt * ||H|| < 2 at the rate ~ dt * ||H|| / 2); a depth of 5 ... 10
+    !                 is usually enough
+    ! max_iter > 0: at most max_iter iterations per step; n_capped is the number of
+    !               the steps stopped by this cap before reaching the tolerance
+    integer, intent(in) :: n_anderson, max_iter
+    integer, intent(out) :: n_capped
+    
+    ! the history of the Anderson mixing (see midpoint_step)
+    complex*16, allocatable :: work(:)
+    integer :: nh, ph
+    
+    real*8 :: tol, err, energy
     
     integer :: cont 
 
@@ -29,45 +126,799 @@ subroutine solve(a, b, dt, begin_step, apply_H, eval_o, psi_in, n_psi, psi, psi_
     external apply_H
     external eval_o
     
-    integer :: i
+    integer :: i, io, it, ti, s
+    real*8 :: dts
+    complex*16 :: c
+    logical :: midpoint_step
     
-    tol = dt**3
+    tol = abs(dt)**3
+    
+    n_capped = 0
+    allocate(work(min(n_anderson, 1) * (n_psi * (3 + 2 * n_anderson) + n_anderson**2)))
+    
+    ! backward propagation for b < a
+    s = 1
+    if (b .lt. a) s = -1
+    dts = s * abs(dt)
+    c = (0d0, -1d0) * dts / 2
     
     psi = psi_in
     
-    if (eval_a .eq. 1) then
+    io = 1
+    do while (io .le. n_o)
+        if (s * o_steps(io) .ge. s * a) exit
+        io = io + 1
+    end do
+    
+    if (io .le. n_o) then
+        if (o_steps(io) .eq. a) then
+    
+            if (call_eval .eq. 1) then
+                call eval_o(a, psi, io - 1, n_psi)
+            end if
+            if (n_sp + n_dg .gt. 0) then
+                call eval_averages(n_psi, psi, n_sp, o_data, n_odata, o_ind, o_ptr, n_sp_cols, n_dg, o_diag, n_dg_cols, &
+                    o_row, n_rows, averages, n_out, n_avg, io)
+            end if
+            io = io + 1
+            
+        end if
+    end if
+    
+    do i = a, b - s, s
+    
+        ! index of the time interval between the steps i and i + s
+        ti = min(i, i + s)
+    
+        if (call_begin .eq. 1) then
+        
+            call begin_step(ti, psi, n_psi)
+            
+        end if
+    
+        if (diag .eq. 1) then
+            psi = d_phase * psi
+        end if
+    
+        it = 0
+        
+        do while (midpoint_step(1, n_psi, psi, psi_mid, psi_mid_next, native, h_coef, n_terms, h_data, n_data, h_ind, h_ptr, &
+            c, tol, max_iter, n_anderson, work, it, nh, ph, err, n_capped, energy))
+        
+            call apply_H(ti, psi_mid, psi_mid_next, n_psi)
+        
+        end do
+        
+        if (s * (i - a) + 1 .le. n_stat) then
+            n_iter(s * (i - a) + 1) = it
+            err_step(s * (i - a) + 1) = err
+        end if
     
-        call eval_o(a, psi, n_psi)
+        psi = 2 * psi_mid - psi
         
+        if (diag .eq. 1) then
+            psi = d_phase * psi
+        end if
+            
+        if (io .le. n_o) then
+            if (o_steps(io) .eq. i + s) then
+        
+                if (call_eval .eq. 1) then
+                    call eval_o(i + s, psi, io - 1, n_psi)
+                end if
+                if (n_sp + n_dg .gt. 0) then
+                    call eval_averages(n_psi, psi, n_sp, o_data, n_odata, o_ind, o_ptr, n_sp_cols, n_dg, o_diag, n_dg_cols, &
+                        o_row, n_rows, averages, n_out, n_avg, io)
+                end if
+                io = io + 1
+                
+            end if
+        end if
+    
+    end do
+    
+end subroutine solve
+
+! the same as solve, but in single precision (complex*8 states and Hamiltonian);
+! the fixed-point error is accumulated in double precision and its tolerance
+! is bounded from below by the single precision roundoff (~1e-6 * sum(abs(psi_in)));
+! the deviation from the double precision solution grows linearly with the number
+! of the steps: 1.5e-6 after 10^3 steps, 1.6e-5 after 10^4 steps and 1.6e-4 after
+! 10^5 steps (the spin-boson model of test_single, dt = 0.01)
+subroutine solve_c(a, b, dt, begin_step, apply_H, eval_o, psi_in, n_psi, psi, psi_mid, psi_mid_next, o_steps, n_o, &
+    call_begin, call_eval, native, h_coef, n_terms, h_data, n_data, h_ind, h_ptr, &
+    n_iter, err_step, n_stat, n_renorm, max_iter, n_capped)
+
+    implicit none
+    
+    integer, intent(in) :: a, b
+    real*8, intent(in) :: dt
+    
+    complex*8, intent(inout), dimension(n_psi) :: psi_in
+    integer :: n_psi
+    !f2py intent(in,out,overwrite) psi_in
+    !f2py integer intent(hide), depend(psi_in) :: n_psi = len(psi_in)
+    
+    complex*8, intent(inout), dimension(n_psi) :: psi
+    !f2py intent(in,out,overwrite) psi
+    
+    complex*8, intent(inout), dimension(n_psi) :: psi_mid
+    !f2py intent(in,out,overwrite) psi_mid
+    
+    complex*8, intent(inout), dimension(n_psi) :: psi_mid_next
+    !f2py intent(in,out,overwrite) psi_mid_next
+    
+    integer, intent(in), dimension(n_o) :: o_steps
+    integer :: n_o
+    !f2py integer intent(hide), depend(o_steps) :: n_o = len(o_steps)
+    
+    integer, intent(in) :: call_begin, call_eval, native
+    
+    complex*8, intent(in), dimension(n_terms) :: h_coef
+    integer :: n_terms
+    !f2py integer intent(hide), depend(h_coef) :: n_terms = len(h_coef)
+    
+    complex*8, intent(in), dimension(n_data) :: h_data
+    integer :: n_data
+    !f2py integer intent(hide), depend(h_data) :: n_data = len(h_data)
+    
+    integer, intent(in), dimension(n_data) :: h_ind
+    
+    integer, intent(in), dimension(n_psi + 1, n_terms) :: h_ptr
+    
+    integer, intent(inout), dimension(n_stat) :: n_iter
+    !f2py intent(in,out,overwrite) n_iter
+    real*8, intent(inout), dimension(n_stat) :: err_step
+    !f2py intent(in,out,overwrite) err_step
+    integer :: n_stat
+    !f2py integer intent(hide), depend(n_iter) :: n_stat = len(n_iter)
+    
+    real*8 :: tol, err
+    
+    ! n_renorm > 0: every n_renorm steps the state is renormalized
+    !               to the norm of psi_in computed in double precision;
+    !               the changes of the norm made by begin_step (e.g. quantum jumps)
+    !               are kept: the target norm is multiplied by their ratio
+    !               (the fixed-point iteration with the tolerance dt^3 makes the norm
+    !               drift also in double precision)
+    integer, intent(in) :: n_renorm
+    
+    ! max_iter > 0: at most max_iter iterations per step (as in solve); n_capped is the number of
+    !               the steps which have not converged in max_iter iterations
+    integer, intent(in) :: max_iter
+    integer, intent(out) :: n_capped
+    
+    real*8 :: norm_in, norm, norm_begin
+    
+    complex*8, dimension(1) :: work
+    integer :: nh, ph
+    real*8 :: energy
+
+    external begin_step
+    external apply_H
+    external eval_o
+    
+    integer :: i, j, io, it
+    complex*8 :: c
+    logical :: midpoint_step_c
+    
+    psi = psi_in
+    
+    n_capped = 0
+    
+    ! the error of the fixed-point iteration cannot go below
+    ! the single precision roundoff of the state
+    tol = max(dt**3, 10 * epsilon(1e0) * sum(dble(abs(psi))))
+    
+    c = cmplx(0e0, -dt / 2, kind = 4)
+    
+    norm_in = 0d0
+    do j = 1, n_psi
+        norm_in = norm_in + dble(real(psi(j)))**2 + dble(aimag(psi(j)))**2
+    end do
+    
+    io = 1
+    do while (io .le. n_o)
+        if (o_steps(io) .ge. a) exit
+        io = io + 1
+    end do
+    
+    if (call_eval .eq. 1 .and. io .le. n_o) then
+        if (o_steps(io) .eq. a) then
+    
+            call eval_o(a, psi, io - 1, n_psi)
+            io = io + 1
+            
+        end if
     end if
     
     do i = a, b - 1
     
-        call begin_step(i, psi, n_psi)
+        if (call_begin .eq. 1) then
+        
+            norm_begin = 0d0
+            if (n_renorm .gt. 0) then
+                do j = 1, n_psi
+                    norm_begin = norm_begin + dble(real(psi(j)))**2 + dble(aimag(psi(j)))**2
+                end do
+            end if
+        
+            call begin_step(i, psi, n_psi)
+            
+            if (norm_begin .gt. 0d0) then
+                norm = 0d0
+                do j = 1, n_psi
+                    norm = norm + dble(real(psi(j)))**2 + dble(aimag(psi(j)))**2
+                end do
+                norm_in = norm_in * norm / norm_begin
+            end if
+            
+        end if
+    
+        it = 0
+        
+        do while (midpoint_step_c(1, n_psi, psi, psi_mid, psi_mid_next, native, h_coef, n_terms, h_data, n_data, h_ind, h_ptr, &
+            c, tol, max_iter, 0, work, it, nh, ph, err, n_capped, energy))
+        
+            call apply_H(i, psi_mid, psi_mid_next, n_psi)
+        
+        end do
+        
+        if (i - a + 1 .le. n_stat) then
+            n_iter(i - a + 1) = it
+            err_step(i - a + 1) = err
+        end if
+    
+        psi = 2 * psi_mid - psi
+        
+        if (n_renorm .gt. 0 .and. mod(i - a + 1, n_renorm) .eq. 0) then
+            norm = 0d0
+            do j = 1, n_psi
+                norm = norm + dble(real(psi(j)))**2 + dble(aimag(psi(j)))**2
+            end do
+            if (norm .gt. 0d0) then
+                psi = psi * real(sqrt(norm_in / norm), kind = 4)
+            end if
+        end if
+            
+        if (call_eval .eq. 1 .and. io .le. n_o) then
+            if (o_steps(io) .eq. i + 1) then
+        
+                call eval_o(i + 1, psi, io - 1, n_psi)
+                io = io + 1
+                
+            end if
+        end if
+    
+    end do
+    
+end subroutine solve_c
+
+! the same as solve, but propagates the block of n_traj
+! independent states (trajectories) with the same Hamiltonian;
+! psi(l, i) is the component i of the trajectory l
+! (this is the memory layout of the C-ordered numpy array of shape (n_psi, n_traj)
+! passed as its transpose);
+! the fixed-point iteration stops when the error of every trajectory is below the tolerance
+subroutine solve_block(a, b, dt, begin_step, apply_H, eval_o, psi_in, n_traj, n_psi, psi, psi_mid, psi_mid_next, o_steps, n_o, &
+    call_begin, call_eval, native, h_coef, n_terms, h_data, n_data, h_ind, h_ptr, &
+    n_iter, err_step, n_stat, diag, d_phase, n_anderson, max_iter, n_capped)
+
+    implicit none
+    
+    integer, intent(in) :: a, b
+    real*8, intent(in) :: dt
+    
+    complex*16, intent(inout), dimension(n_traj, n_psi) :: psi_in
+    integer :: n_traj, n_psi
+    !f2py intent(in,out,overwrite) psi_in
+    !f2py integer intent(hide), depend(psi_in) :: n_traj = shape(psi_in, 0)
+    !f2py integer intent(hide), depend(psi_in) :: n_psi = shape(psi_in, 1)
+    
+    complex*16, intent(inout), dimension(n_traj, n_psi) :: psi
+    !f2py intent(in,out,overwrite) psi
+    
+    complex*16, intent(inout), dimension(n_traj, n_psi) :: psi_mid
+    !f2py intent(in,out,overwrite) psi_mid
+    
+    complex*16, intent(inout), dimension(n_traj, n_psi) :: psi_mid_next
+    !f2py intent(in,out,overwrite) psi_mid_next
+    
+    integer, intent(in), dimension(n_o) :: o_steps
+    integer :: n_o
+    !f2py integer intent(hide), depend(o_steps) :: n_o = len(o_steps)
+    
+    integer, intent(in) :: call_begin, call_eval, native
+    
+    complex*16, intent(in), dimension(n_terms) :: h_coef
+    integer :: n_terms
+    !f2py integer intent(hide), depend(h_coef) :: n_terms = len(h_coef)
+    
+    complex*16, intent(in), dimension(n_data) :: h_data
+    integer :: n_data
+    !f2py integer intent(hide), depend(h_data) :: n_data = len(h_data)
+    
+    integer, intent(in), dimension(n_data) :: h_ind
+    
+    integer, intent(in), dimension(n_psi + 1, n_terms) :: h_ptr
+    
+    integer, intent(inout), dimension(n_stat) :: n_iter
+    !f2py intent(in,out,overwrite) n_iter
+    real*8, intent(inout), dimension(n_stat) :: err_step
+    !f2py intent(in,out,overwrite) err_step
+    integer :: n_stat
+    !f2py integer intent(hide), depend(n_iter) :: n_stat = len(n_iter)
+    
+    integer, intent(in) :: diag
+    
+    complex*16, intent(in), dimension(n_psi) :: d_phase
+    
+    real*8 :: tol, err, energy
+    
+    integer, intent(in) :: n_anderson, max_iter
+    integer, intent(out) :: n_capped
+    
+    complex*16, allocatable :: work(:)
+    integer :: nh, ph
+
+    external begin_step
+    external apply_H
+    external eval_o
+    
+    integer :: i, j, io, it, ti, s
+    real*8 :: dts
+    complex*16 :: c
+    logical :: midpoint_step
+    
+    tol = abs(dt)**3
+    
+    ! the Anderson mixing treats the block as one vector
+    n_capped = 0
+    allocate(work(min(n_anderson, 1) * (n_traj * n_psi * (3 + 2 * n_anderson) + n_anderson**2)))
+    
+    ! backward propagation for b < a
+    s = 1
+    if (b .lt. a) s = -1
+    dts = s * abs(dt)
+    c = (0d0, -1d0) * dts / 2
+    
+    psi = psi_in
+    
+    io = 1
+    do while (io .le. n_o)
+        if (s * o_steps(io) .ge. s * a) exit
+        io = io + 1
+    end do
+    
+    if (call_eval .eq. 1 .and. io .le. n_o) then
+        if (o_steps(io) .eq. a) then
+    
+            call eval_o(a, psi, io - 1, n_traj, n_psi)
+            io = io + 1
+            
+        end if
+    end if
+    
+    do i = a, b - s, s
+    
+        ! index of the time interval between the steps i and i + s
+        ti = min(i, i + s)
+    
+        if (call_begin .eq. 1) then
+        
+            call begin_step(ti, psi, n_traj, n_psi)
+            
+        end if
+    
+        if (diag .eq. 1) then
+            do j = 1, n_psi
+                psi(:, j) = d_phase(j) * psi(:, j)
+            end do
+        end if
     
-        psi_mid = psi
+        it = 0
         
-        do while(.true.)
+        do while (midpoint_step(n_traj, n_psi, psi, psi_mid, psi_mid_next, native, h_coef, n_terms, h_data, n_data, h_ind, h_ptr, &
+            c, tol, max_iter, n_anderson, work, it, nh, ph, err, n_capped, energy))
         
-            psi_mid_next = 0d0
+            call apply_H(ti, psi_mid, psi_mid_next, n_traj, n_psi)
+        
+        end do
+        
+        if (s * (i - a) + 1 .le. n_stat) then
+            n_iter(s * (i - a) + 1) = it
+            err_step(s * (i - a) + 1) = err
+        end if
+    
+        psi = 2 * psi_mid - psi
+        
+        if (diag .eq. 1) then
+            do j = 1, n_psi
+                psi(:, j) = d_phase(j) * psi(:, j)
+            end do
+        end if
+            
+        if (call_eval .eq. 1 .and. io .le. n_o) then
+            if (o_steps(io) .eq. i + s) then
+        
+                call eval_o(i + s, psi, io - 1, n_traj, n_psi)
+                io = io + 1
+                
+            end if
+        end if
+    
+    end do
+    
+end subroutine solve_block
+
+! imaginary-time propagation d psi / d tau = - H psi from the step a to the step b
+! with the step dt by the implicit midpoint (Crank-Nicolson) rule
+! psi(i + 1) = psi(i) - dt H (psi(i) + psi(i + 1)) / 2,
+! the state is renormalized after each step;
+! energy: the Rayleigh quotient <psi_mid|H|psi_mid> / <psi_mid|psi_mid>
+!         at the midpoint of the last step
+! the propagation stops when the energy changes by less than e_tol in one step
+! (e_tol = 0: propagate up to b);
+! n_done: number of the steps made
+! max_iter: maximal number of the fixed-point iterations per step; the propagation
+!           stops at the first step which has not converged in max_iter iterations
+!           (n_capped = 1 then, otherwise n_capped = 0)
+! the other arguments are the same as in solve
+subroutine solve_imag(a, b, dt, begin_step, apply_H, eval_o, psi_in, n_psi, psi, psi_mid, psi_mid_next, o_steps, n_o, &
+    call_begin, call_eval, native, h_coef, n_terms, h_data, n_data, h_ind, h_ptr, e_tol, max_iter, energy, n_done, n_capped)
+
+    implicit none
+    
+    integer, intent(in) :: a, b
+    real*8, intent(in) :: dt
+    
+    complex*16, intent(inout), dimension(n_psi) :: psi_in
+    integer :: n_psi
+    !f2py intent(in,out,overwrite) psi_in
+    !f2py integer intent(hide), depend(psi_in) :: n_psi = len(psi_in)
+    
+    complex*16, intent(inout), dimension(n_psi) :: psi
+    !f2py intent(in,out,overwrite) psi
+    
+    complex*16, intent(inout), dimension(n_psi) :: psi_mid
+    !f2py intent(in,out,overwrite) psi_mid
+    
+    complex*16, intent(inout), dimension(n_psi) :: psi_mid_next
+    !f2py intent(in,out,overwrite) psi_mid_next
+    
+    integer, intent(in), dimension(n_o) :: o_steps
+    integer :: n_o
+    !f2py integer intent(hide), depend(o_steps) :: n_o = len(o_steps)
+    
+    integer, intent(in) :: call_begin, call_eval, native
+    
+    complex*16, intent(in), dimension(n_terms) :: h_coef
+    integer :: n_terms
+    !f2py integer intent(hide), depend(h_coef) :: n_terms = len(h_coef)
+    
+    complex*16, intent(in), dimension(n_data) :: h_data
+    integer :: n_data
+    !f2py integer intent(hide), depend(h_data) :: n_data = len(h_data)
+    
+    integer, intent(in), dimension(n_data) :: h_ind
+    
+    integer, intent(in), dimension(n_psi + 1, n_terms) :: h_ptr
+    
+    real*8, intent(in) :: e_tol
+    
+    integer, intent(in) :: max_iter
+    
+    real*8, intent(out) :: energy
+    
+    integer, intent(out) :: n_done, n_capped
+    
+    real*8 :: tol, err, energy_prev
+    
+    complex*16, dimension(1) :: work
+    integer :: nh, ph
+
+    external begin_step
+    external apply_H
+    external eval_o
+    
+    integer :: i, io, it
+    complex*16 :: c
+    logical :: midpoint_step
+    
+    tol = dt**3
+    
+    c = -dt / 2
+    
+    psi = psi_in / sqrt(sum(abs(psi_in)**2))
+    
+    energy = 0d0
+    energy_prev = 0d0
+    n_done = 0
+    n_capped = 0
+    
+    io = 1
+    do while (io .le. n_o)
+        if (o_steps(io) .ge. a) exit
+        io = io + 1
+    end do
+    
+    if (call_eval .eq. 1 .and. io .le. n_o) then
+        if (o_steps(io) .eq. a) then
+    
+            call eval_o(a, psi, io - 1, n_psi)
+            io = io + 1
+            
+        end if
+    end if
+    
+    do i = a, b - 1
+    
+        if (call_begin .eq. 1) then
+        
+            call begin_step(i, psi, n_psi)
+            
+        end if
+    
+        it = 0
+        
+        do while (midpoint_step(1, n_psi, psi, psi_mid, psi_mid_next, native, h_coef, n_terms, h_data, n_data, h_ind, h_ptr, &
+            c, tol, max_iter, 0, work, it, nh, ph, err, n_capped, energy))
         
             call apply_H(i, psi_mid, psi_mid_next, n_psi)
-            psi_mid_next = psi - (0d0, 1d0) * dt / 2 * psi_mid_next
         
-            err = sum(abs(psi_mid_next - psi_mid))
+        end do
+        
+        if (n_capped .gt. 0) then
+            exit
+        end if
     
-            psi_mid = psi_mid_next
+        psi = 2 * psi_mid - psi
+        
+        psi = psi / sqrt(sum(abs(psi)**2))
+        
+        n_done = i + 1 - a
+            
+        if (call_eval .eq. 1 .and. io .le. n_o) then
+            if (o_steps(io) .eq. i + 1) then
         
-            if (err < tol) then
-                exit
+                call eval_o(i + 1, psi, io - 1, n_psi)
+                io = io + 1
+                
             end if
+        end if
+        
+        if (i .gt. a .and. abs(energy - energy_prev) < e_tol) then
+            exit
+        end if
+        
+        energy_prev = energy
+    
+    end do
+    
+end subroutine solve_imag
+
+! the same as solve, but without callbacks: the Hamiltonian is always native, and
+! the observables are also given in the CSC format, so that the loop runs without
+! the Python interpreter and releases the GIL (independent propagations can run in threads);
+! the observables are given as the observable bank of solve, and their averages
+! at the step o_steps(io) are stored in the row io of averages
+subroutine solve_native(a, b, dt, psi_in, n_psi, psi, psi_mid, psi_mid_next, o_steps, n_o, &
+    h_coef, n_terms, h_data, n_data, h_ind, h_ptr, n_sp, o_data, n_odata, o_ind, o_ptr, n_sp_cols, n_dg, o_diag, n_dg_cols, &
+    o_row, n_rows, averages, n_out, n_avg, diag, d_phase, max_iter, n_capped)
+
+    implicit none
+    
+    !f2py threadsafe
+    
+    integer, intent(in) :: a, b
+    real*8, intent(in) :: dt
+    
+    complex*16, intent(inout), dimension(n_psi) :: psi_in
+    integer :: n_psi
+    !f2py intent(in,out,overwrite) psi_in
+    !f2py integer intent(hide), depend(psi_in) :: n_psi = len(psi_in)
+    
+    complex*16, intent(inout), dimension(n_psi) :: psi
+    !f2py intent(in,out,overwrite) psi
+    
+    complex*16, intent(inout), dimension(n_psi) :: psi_mid
+    !f2py intent(in,out,overwrite) psi_mid
+    
+    complex*16, intent(inout), dimension(n_psi) :: psi_mid_next
+    !f2py intent(in,out,overwrite) psi_mid_next
+    
+    integer, intent(in), dimension(n_o) :: o_steps
+    integer :: n_o
+    !f2py integer intent(hide), depend(o_steps) :: n_o = len(o_steps)
+    
+    complex*16, intent(in), dimension(n_terms) :: h_coef
+    integer :: n_terms
+    !f2py integer intent(hide), depend(h_coef) :: n_terms = len(h_coef)
+    
+    complex*16, intent(in), dimension(n_data) :: h_data
+    integer :: n_data
+    !f2py integer intent(hide), depend(h_data) :: n_data = len(h_data)
+    
+    integer, intent(in), dimension(n_data) :: h_ind
+    
+    integer, intent(in), dimension(n_psi + 1, n_terms) :: h_ptr
+    
+    integer, intent(in) :: n_sp, n_dg
+    
+    complex*16, intent(in), dimension(n_odata) :: o_data
+    integer :: n_odata
+    !f2py integer intent(hide), depend(o_data) :: n_odata = len(o_data)
+    
+    integer, intent(in), dimension(n_odata) :: o_ind
+    
+    integer, intent(in), dimension(n_psi + 1, n_sp_cols) :: o_ptr
+    integer :: n_sp_cols
+    !f2py integer intent(hide), depend(o_ptr) :: n_sp_cols = shape(o_ptr, 1)
+    
+    real*8, intent(in), dimension(n_psi, n_dg_cols) :: o_diag
+    integer :: n_dg_cols
+    !f2py integer intent(hide), depend(o_diag) :: n_dg_cols = shape(o_diag, 1)
+    
+    integer, intent(in), dimension(n_rows) :: o_row
+    integer :: n_rows
+    !f2py integer intent(hide), depend(o_row) :: n_rows = len(o_row)
+    
+    complex*16, intent(inout), dimension(n_out, n_avg) :: averages
+    !f2py intent(in,out,overwrite) averages
+    integer :: n_out, n_avg
+    !f2py integer intent(hide), depend(averages) :: n_out = shape(averages, 0)
+    !f2py integer intent(hide), depend(averages) :: n_avg = shape(averages, 1)
+    
+    integer, intent(in) :: diag
+    
+    complex*16, intent(in), dimension(n_psi) :: d_phase
+    
+    ! max_iter > 0: at most max_iter iterations per step (as in solve); n_capped is the number of
+    !               the steps stopped by this cap before reaching the tolerance
+    integer, intent(in) :: max_iter
+    integer, intent(out) :: n_capped
+    
+    real*8 :: tol, err, energy, dts
+    
+    complex*16, dimension(1) :: work
+    integer :: nh, ph
+    
+    integer :: i, io, it, s
+    complex*16 :: c
+    logical :: midpoint_step
+    
+    tol = abs(dt)**3
+    
+    n_capped = 0
+    
+    s = 1
+    if (b .lt. a) s = -1
+    dts = s * abs(dt)
+    c = (0d0, -1d0) * dts / 2
+    
+    psi = psi_in
+    
+    io = 1
+    do while (io .le. n_o)
+        if (s * o_steps(io) .ge. s * a) exit
+        io = io + 1
+    end do
+    
+    if (io .le. n_o) then
+        if (o_steps(io) .eq. a) then
+    
+            call eval_averages(n_psi, psi, n_sp, o_data, n_odata, o_ind, o_ptr, n_sp_cols, n_dg, o_diag, n_dg_cols, &
+                o_row, n_rows, averages, n_out, n_avg, io)
+            io = io + 1
+            
+        end if
+    end if
+    
+    do i = a, b - s, s
+    
+        if (diag .eq. 1) then
+            psi = d_phase * psi
+        end if
+    
+        it = 0
         
+        do while (midpoint_step(1, n_psi, psi, psi_mid, psi_mid_next, 1, h_coef, n_terms, h_data, n_data, h_ind, h_ptr, &
+            c, tol, max_iter, 0, work, it, nh, ph, err, n_capped, energy))
+            ! the native Hamiltonian: the step is made in one call
         end do
     
         psi = 2 * psi_mid - psi
+        
+        if (diag .eq. 1) then
+            psi = d_phase * psi
+        end if
             
-        call eval_o(i + 1, psi, n_psi)
+        if (io .le. n_o) then
+            if (o_steps(io) .eq. i + s) then
+        
+                call eval_averages(n_psi, psi, n_sp, o_data, n_odata, o_ind, o_ptr, n_sp_cols, n_dg, o_diag, n_dg_cols, &
+                    o_row, n_rows, averages, n_out, n_avg, io)
+                io = io + 1
+                
+            end if
+        end if
     
     end do
     
-end subroutine solve
+end subroutine solve_native
+
+! averages of the observable bank (see solve) in the state psi,
+! stored in the row io of averages
+subroutine eval_averages(n_psi, psi, n_sp, o_data, n_odata, o_ind, o_ptr, n_sp_cols, n_dg, o_diag, n_dg_cols, &
+    o_row, n_rows, averages, n_out, n_avg, io)
+
+    implicit none
+    
+    integer, intent(in) :: n_psi, n_sp, n_odata, n_sp_cols, n_dg, n_dg_cols, n_rows, n_out, n_avg, io
+    complex*16, intent(in), dimension(n_psi) :: psi
+    complex*16, intent(in), dimension(n_odata) :: o_data
+    integer, intent(in), dimension(n_odata) :: o_ind
+    integer, intent(in), dimension(n_psi + 1, n_sp_cols) :: o_ptr
+    real*8, intent(in), dimension(n_psi, n_dg_cols) :: o_diag
+    integer, intent(in), dimension(n_rows) :: o_row
+    complex*16, intent(inout), dimension(n_out, n_avg) :: averages
+    
+    integer :: j, k, l
+    complex*16 :: av
+    
+    if (io .gt. n_out) return
+    
+    do k = 1, n_sp
+        av = 0d0
+        do j = 1, n_psi
+            do l = o_ptr(j, k) + 1, o_ptr(j + 1, k)
+                av = av + conjg(psi(o_ind(l) + 1)) * o_data(l) * psi(j)
+            end do
+        end do
+        averages(io, o_row(k) + 1) = av
+    end do
+    
+    do k = 1, n_dg
+        averages(io, o_row(n_sp + k) + 1) = sum(o_diag(:, k) * (real(psi)**2 + aimag(psi)**2))
+    end do
+    
+end subroutine eval_averages
+
+! the fixed-point iteration of the midpoint step, shared by the solvers above;
+! the body is in solve/midpoint_step.inc, written with the kind rk of the complex numbers,
+! and is included here with rk = 8 and rk = 4 (midpoint_step_c), so the directory
+! of this file should be on the include path (-I)
+!
+! the step is psi -> 2 psi_mid - psi, where psi_mid = psi + c H psi_mid
+! (c = -i dt / 2, or c = -dt / 2 in the imaginary time); psi is a block of n_traj states
+! as in solve_block (n_traj = 1 for one state); each call makes the iterations up to the next
+! application of H by the caller: it = 0 starts the step, and while the result is .true.
+! the caller puts H psi_mid into psi_mid_next (apply_H) and calls it again;
+! native = 1: H = sum_k h_coef(k) * H_k (see solve) is applied here, so one call makes the step;
+! the iteration stops at err < tol or at it = max_iter (n_capped is then incremented),
+! psi_mid is the result;
+! energy: for a real c, the Rayleigh quotient <psi_mid|H|psi_mid> / <psi_mid|psi_mid>
+!         of the last iterate;
+! n_anderson > 0: Anderson mixing (see anderson_mix in solve/midpoint_step.inc) with the history
+!                 of n_traj * n_psi * (3 + 2 * n_anderson) + n_anderson**2 elements in work and nh, ph
+logical function midpoint_step(n_traj, n_psi, psi, psi_mid, psi_mid_next, native, h_coef, n_terms, h_data, n_data, &
+    h_ind, h_ptr, c, tol, max_iter, n_anderson, work, it, nh, ph, err, n_capped, energy) result(more)
+
+    implicit none
+    
+    integer, parameter :: rk = 8
+    
+    include 'solve/midpoint_step.inc'
+    
+end function midpoint_step
+
+logical function midpoint_step_c(n_traj, n_psi, psi, psi_mid, psi_mid_next, native, h_coef, n_terms, h_data, n_data, &
+    h_ind, h_ptr, c, tol, max_iter, n_anderson, work, it, nh, ph, err, n_capped, energy) result(more)
+
+    implicit none
+    
+    integer, parameter :: rk = 4
+    
+    include 'solve/midpoint_step.inc'
+    
+end function midpoint_step_c
@@ -0,0 +1,28 @@
+import numpy as np
+from lightcones import models
+
+# small spin-boson model shared by the solver tests: the qubit Hs = s_p s_m
+# coupled by V = 0.3 (s_m a_dag[0] + s_p a[0]) to the chain Hb of num_modes bosonic modes
+# with the unit on-site energies and the hopping 0.2 along the first num_bonds bonds
+# (all the num_modes - 1 bonds by default); at most 3 quanta in the chain
+def terms(num_modes = 3, num_bonds = None):
+    if num_bonds is None:
+        num_bonds = num_modes - 1
+    m = models.spin_boson(num_modes, 3)
+    Hs = m.s_p @ m.s_m
+    V = 0.3 * (m.s_m @ m.a_dag[0] + m.s_p @ m.a[0])
+    Hb = sum([m.a_dag[i] @ m.a[i] for i in range(num_modes)]) \
+        + 0.2 * sum([m.a_dag[i + 1] @ m.a[i] + m.a_dag[i] @ m.a[i + 1] for i in range(num_bonds)])
+    return m, Hs, V, Hb
+
+# the model and the Hamiltonian H = Hs + V + Hb (see terms) as a CSC matrix
+def hamiltonian(num_modes = 3, num_bonds = None):
+    m, Hs, V, Hb = terms(num_modes, num_bonds)
+    return m, (Hs + V + Hb).tocsc()
+
+# the state with the empty chain and the qubit in the first basis state,
+# flipped by s_x if flip
+def initial_state(m, flip = True):
+    psi_0 = np.zeros(m.dimension, dtype = complex)
+    psi_0[0] = 1
+    return m.s_x @ psi_0 if flip else psi_0
@@ -0,0 +1,82 @@
+import numpy as np
+from lightcones.linalg import mv
+from lightcones.solvers.schrodinger import solve
+from lightcones.solvers.schrodinger import solve_adaptive
+from .cases import spin_boson_chain
+
+# the drive is switched off after t = 5
+def f(t):
+    return 0.2 * np.cos(t) if t < 5 else 0.0
+
+def test_solve_adaptive():
+    m, H = spin_boson_chain.hamiltonian(4)
+    psi_0 = spin_boson_chain.initial_state(m, flip = False)
+
+    # reference: midpoint rule with a fine step
+    dt = 0.001
+    nt = 20000
+    s_z_av_expected = []
+
+    def apply_h(ti, psi_in, psi_out):
+        mv(H, psi_in, psi_out, cout = 1)
+        mv(m.s_x, psi_in, psi_out, cin = f((ti + 0.5) * dt), cout = 1)
+
+    def eval_o(ti, psi):
+        if ti % 100 == 0:
+            s_z_av_expected.append(np.vdot(psi, m.s_z @ psi).real)
+
+    solve(0, nt, dt, apply_h, psi_0, eval_o = eval_o)
+
+    t_out = np.arange(0, 201) * 0.1
+    s_z_av = np.zeros(len(t_out))
+    n_apply = [0]
+
+    def apply_h_t(t, psi_in, psi_out):
+        n_apply[0] += 1
+        mv(H, psi_in, psi_out, cout = 1)
+        mv(m.s_x, psi_in, psi_out, cin = f(t), cout = 1)
+
+    def eval_o(i, psi):
+        s_z_av[i] = np.vdot(psi, m.s_z @ psi).real
+
+    psi, n_accepted, n_rejected = solve_adaptive(t_out, apply_h_t, psi_0, eval_o = eval_o, tol = 1e-7)
+
+    assert np.allclose(s_z_av, s_z_av_expected, rtol=1e-4, atol=1e-4), \
+        f"s_z average does not match the ethalon"
+
+    # the solver makes large steps when the drive is switched off
+    assert n_accepted < len(t_out), \
+        f"too many steps"
+
+def test_solve_method_adaptive():
+    m, H = spin_boson_chain.hamiltonian(4)
+    psi_0 = spin_boson_chain.initial_state(m, flip = False)
+
+    dt = 0.01
+    nt = 1000
+
+    def apply_h(ti, psi_in, psi_out):
+        mv(H, psi_in, psi_out, cout = 1)
+        mv(m.s_x, psi_in, psi_out, cin = f((ti + 0.5) * dt), cout = 1)
+
+    s_z_av_expected = np.zeros(nt + 1)
+    def eval_o(ti, psi):
+        s_z_av_expected[ti] = np.vdot(psi, m.s_z @ psi).real
+
+    solve(0, nt, dt, apply_h, psi_0, eval_o = eval_o)
+
+    s_z_av = np.zeros(nt + 1)
+    def eval_o(ti, psi):
+        s_z_av[ti] = np.vdot(psi, m.s_z @ psi).real
+
+    stats = solve(0, nt, dt, apply_h, psi_0, eval_o = eval_o, method = 'adaptive', adaptive_tol = 1e-8, stats = True)
+
+    assert np.allclose(s_z_av, s_z_av_expected, rtol=1e-4, atol=1e-4), \
+        f"s_z average does not match the ethalon"
+
+    # the step counts of the error control are reported in the statistics
+    def apply_h_t(t, psi_in, psi_out):
+        apply_h(t / dt - 0.5, psi_in, psi_out)
+    _, n_accepted, n_rejected = solve_adaptive(dt * np.arange(nt + 1), apply_h_t, psi_0, tol = 1e-8, dt0 = dt)
+    assert (stats.n_accepted, stats.n_rejected) == (n_accepted, n_rejected) and 0 < n_accepted < nt, \
+        f"adaptive step counts do not match the ethalon"
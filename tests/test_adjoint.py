@@ -0,0 +1,80 @@
+import numpy as np
+import lightcones.linalg as la
+from lightcones.solvers.schrodinger import solve, gradient, correlator
+from .cases import spin_boson_chain
+
+def test_backward():
+    m, H_0 = spin_boson_chain.hamiltonian(3, 1)
+    psi_0 = spin_boson_chain.initial_state(m)
+    dt = 0.01
+
+    def apply_h(ti, psi_in, psi_out):
+        la.mv(H_0, psi_in, psi_out, cout = 1)
+        la.mv(m.s_x, psi_in, psi_out, cin = 0.5 * np.cos(0.1 * ti), cout = 1)
+
+    psi = np.zeros(m.dimension, dtype = complex)
+    solve(3, 500, dt, apply_h, psi_0, psi = psi)
+
+    steps = []
+    def eval_o(ti, psi):
+        steps.append(ti)
+
+    psi_back = np.zeros(m.dimension, dtype = complex)
+    solve(500, 3, dt, apply_h, psi, psi = psi_back, eval_o = eval_o, schedule = 100)
+
+    assert steps == [500, 400, 300, 200, 100], \
+        f"wrong schedule of the backward propagation"
+    assert np.allclose(psi_back, psi_0, rtol=1e-5, atol=1e-5), \
+        f"backward propagation does not return to the initial state"
+
+def test_gradient():
+    m, H_0 = spin_boson_chain.hamiltonian(3, 1)
+    psi_0 = spin_boson_chain.initial_state(m, flip = False)
+    dt = 0.01
+    nt = 300
+
+    rng = np.random.default_rng(1)
+    u = 0.3 * rng.normal(size = nt)
+
+    def propagator(u):
+        def apply_h(ti, psi_in, psi_out):
+            la.mv(H_0, psi_in, psi_out, cout = 1)
+            la.mv(m.s_x, psi_in, psi_out, cin = u[ti], cout = 1)
+        return apply_h
+
+    def observable(u):
+        psi = np.zeros(m.dimension, dtype = complex)
+        solve(0, nt, dt, propagator(u), psi_0, psi = psi)
+        return np.vdot(psi, m.s_z @ psi).real
+
+    j, g = gradient(0, nt, dt, propagator(u), psi_0, m.s_z, [m.s_x], n_checkpoints = 7)
+
+    assert abs(j - observable(u)) < 1e-12, \
+        f"observable does not match the forward propagation"
+
+    eps = 1e-5
+    for ti in [0, 50, 150, nt - 1]:
+        u_p = u.copy()
+        u_p[ti] += eps
+        u_m = u.copy()
+        u_m[ti] -= eps
+        g_expected = (observable(u_p) - observable(u_m)) / (2 * eps)
+        assert abs(g[ti, 0] - g_expected) < 1e-4 * abs(g_expected) + 1e-9, \
+            f"gradient does not match the finite difference"
+
+def test_correlator():
+    m, H_0 = spin_boson_chain.hamiltonian(3, 1)
+    psi_0 = spin_boson_chain.initial_state(m, flip = False)
+    dt = 0.01
+    nt = 500
+
+    c = correlator(0, nt, dt, H_0, m.s_x @ psi_0, m.s_x, m.s_x)
+
+    e, v = np.linalg.eigh(H_0.toarray())
+    def u(t):
+        return v @ np.diag(np.exp(-1j * e * t)) @ v.conj().T
+    phi = m.s_x @ psi_0
+    c_expected = np.array([np.vdot(u(t) @ phi, m.s_x @ (u(t) @ (m.s_x @ phi))) for t in dt * np.arange(nt + 1)])
+
+    assert np.allclose(c, c_expected, rtol=1e-4, atol=1e-4), \
+        f"correlator does not match the ethalon"
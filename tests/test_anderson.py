@@ -0,0 +1,46 @@
+import numpy as np
+import pytest
+from lightcones import models
+from lightcones.solvers.schrodinger import solve
+from .cases import spin_boson_chain
+
+def test_anderson():
+    m = models.spin_boson(4, 3)
+    H = 40 * (5 * m.s_p @ m.s_m + 0.3 * (m.s_m @ m.a_dag[0] + m.s_p @ m.a[0]) \
+        + sum([(4 + 0.5 * i) * m.a_dag[i] @ m.a[i] for i in range(4)]) \
+        + 0.5 * sum([m.a_dag[i + 1] @ m.a[i] + m.a_dag[i] @ m.a[i + 1] for i in range(3)]))
+    H = H.tocsc()
+
+    psi_0 = spin_boson_chain.initial_state(m)
+
+    dt = 0.01
+    nt = 200
+
+    # dt * ||H|| ~ 9: the plain fixed-point iteration diverges
+    assert dt * np.abs(np.linalg.eigvalsh(H.toarray())).max() > 5
+
+    # the exact solution of the midpoint equations
+    h = H.toarray()
+    u = np.linalg.solve(np.eye(m.dimension) + 0.5j * dt * h, np.eye(m.dimension) - 0.5j * dt * h)
+    psi_expected = np.linalg.matrix_power(u, nt) @ psi_0
+
+    psi = np.zeros(m.dimension, dtype = complex)
+    stats = solve(0, nt, dt, H, psi_0, psi = psi, anderson = 5, max_iter = 50, stats = True)
+
+    assert stats.n_capped == 0 and stats.n_iter.max() <= 10, \
+        f"Anderson mixing does not converge in a bounded number of iterations"
+    assert np.allclose(psi, psi_expected, rtol=1e-4, atol=1e-4), \
+        f"psi does not match the ethalon"
+
+    # ensemble mode
+    psi_block = np.zeros((m.dimension, 2), dtype = complex)
+    solve(0, nt, dt, H, np.column_stack([psi_0, m.s_z @ psi_0]), psi = psi_block, anderson = 5)
+    assert np.allclose(psi_block[:, 0], psi_expected, rtol=1e-4, atol=1e-4), \
+        f"ensemble mode does not match the ethalon"
+
+    # the plain iteration is stopped by the cap
+    psi = np.zeros(m.dimension, dtype = complex)
+    with pytest.warns(RuntimeWarning):
+        stats = solve(0, 10, dt, H, psi_0, psi = psi, max_iter = 20, stats = True)
+    assert stats.n_capped == 10 and stats.n_iter.max() == 20, \
+        f"wrong diagnostics of the capped steps"
@@ -0,0 +1,96 @@
+import json
+import platform
+import pytest
+import numpy as np
+import scipy.sparse
+import scipy.linalg
+from lightcones import models
+from lightcones.solvers import propagate, calibrate, load_calibration
+from lightcones.solvers.auto import default_calibration
+
+def test_auto(tmp_path):
+    # small space: the exact dense propagator
+    m = models.top(20)
+    H = (m.j_z + 0.5 * m.j_x @ m.j_x / m.j).tocsc()
+    psi_0 = m.state_with(20)
+
+    e, v = np.linalg.eigh(H.toarray())
+    dt = 0.1
+    nt = 200
+
+    s_z = np.zeros(nt + 1)
+    def eval_o(ti, psi):
+        s_z[ti] = np.vdot(psi, m.j_z @ psi).real
+
+    psi = np.zeros(m.dimension, dtype = complex)
+    backend = propagate(0, nt, dt, H, psi_0, eval_o = eval_o, psi = psi)
+
+    t = dt * np.arange(nt + 1)
+    psi_expected = v @ (np.exp(-1j * np.outer(e, t)) * (v.conj().T @ psi_0)[:, None])
+    s_z_expected = np.einsum('it,it->t', psi_expected.conj(), m.j_z @ psi_expected).real
+
+    assert backend == 'dense', \
+        f"dense backend is expected for a small space"
+    assert np.allclose(psi, psi_expected[:, -1], rtol=1e-10, atol=1e-10), \
+        f"psi does not match the ethalon"
+
+    # csc_array is a native Hamiltonian as well
+    psi = np.zeros(m.dimension, dtype = complex)
+    assert propagate(0, nt, dt, scipy.sparse.csc_array(H), psi_0, psi = psi) == 'dense', \
+        f"dense backend is expected for the csc_array Hamiltonian"
+    assert np.allclose(psi, psi_expected[:, -1], rtol=1e-10, atol=1e-10), \
+        f"psi for the csc_array Hamiltonian does not match the ethalon"
+    assert np.allclose(s_z, s_z_expected, rtol=1e-10, atol=1e-10), \
+        f"j_z average does not match the ethalon"
+
+    # the same space with a tiny step: the midpoint rule is accurate enough
+    assert propagate(0, 10, 1e-4, H, psi_0) == 'midpoint', \
+        f"midpoint backend is expected for a small step"
+
+    # large space: the sparse Krylov propagator
+    n = 2000
+    H = scipy.sparse.diags([np.ones(n - 1), np.linspace(-1, 1, n), np.ones(n - 1)], [-1, 0, 1], format = 'csc', dtype = complex)
+    psi_0 = np.zeros(n, dtype = complex)
+    psi_0[n // 2] = 1
+    psi = np.zeros(n, dtype = complex)
+    backend = propagate(0, 20, 0.5, H, psi_0, psi = psi)
+    psi_expected = scipy.sparse.linalg.expm_multiply(-1j * 10 * H, psi_0)
+
+    assert backend == 'krylov', \
+        f"Krylov backend is expected for a large space"
+    assert np.allclose(psi, psi_expected, rtol=1e-6, atol=1e-6), \
+        f"psi does not match the ethalon"
+
+    # calibration file
+    path = str(tmp_path / 'calibration.json')
+    calibration = calibrate(path, dims = (16, 32), n_steps = 10)
+    assert load_calibration(path)['dense_max_dim'] == calibration['dense_max_dim'], \
+        f"calibration is not stored"
+
+    # the calibration of another machine is not applied
+    with open(path) as f:
+        stored = json.load(f)
+    stored['machine'] = platform.node() + '-other'
+    stored['dense_max_dim'] = calibration['dense_max_dim'] + 1
+    with open(path, 'w') as f:
+        json.dump(stored, f)
+    with pytest.warns(RuntimeWarning):
+        assert load_calibration(path) == default_calibration, \
+            f"calibration of another machine is applied"
+
+def test_auto_non_hermitean():
+    # damped chain: the eigendecomposition of eigh and the Lanczos propagator would be wrong
+    n = 10
+    H = scipy.sparse.diags([np.ones(n - 1), -0.5j * np.ones(n), np.ones(n - 1)], [-1, 0, 1], format = 'csc', dtype = complex)
+    psi_0 = np.zeros(n, dtype = complex)
+    psi_0[0] = 1
+    dt = 0.1
+    nt = 50
+    psi_expected = scipy.linalg.expm(-1j * dt * nt * H.toarray()) @ psi_0
+
+    psi = np.zeros(n, dtype = complex)
+    backend = propagate(0, nt, dt, H, psi_0, psi = psi)
+    assert backend == 'dense', \
+        f"dense backend is expected for a small space"
+    assert np.allclose(psi, psi_expected, rtol=1e-10, atol=1e-10), \
+        f"psi does not match the ethalon"
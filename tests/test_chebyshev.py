@@ -0,0 +1,53 @@
+import numpy as np
+import pytest
+from scipy.special import jv
+from lightcones.solvers.schrodinger import solve
+from lightcones.solvers.schrodinger import solve_chebyshev
+from lightcones.solvers.schrodinger.chebyshev import bessel_table
+from .cases import spin_boson_chain
+
+def test_bessel_table():
+    x = np.linspace(1e-4, 60, 1000)
+    j = bessel_table(80, x)
+    j_expected = jv(np.arange(80)[None, :], x[:, None])
+    assert np.allclose(j, j_expected, rtol=1e-10, atol=1e-12), \
+        f"Bessel functions do not match the ethalon"
+
+def test_solve_chebyshev():
+    m, H = spin_boson_chain.hamiltonian(4)
+    psi_0 = spin_boson_chain.initial_state(m)
+
+    dt = 0.01
+    nt = 2000
+
+    s_z_av = np.zeros(nt + 1)
+    def eval_o(ti, psi):
+        s_z_av[ti] = np.vdot(psi, m.s_z @ psi).real
+
+    psi = np.zeros(m.dimension, dtype = complex)
+    solve(0, nt, dt, H, psi_0, eval_o = eval_o, psi = psi, method = 'chebyshev')
+
+    out = np.zeros((m.dimension, nt + 1), dtype = complex)
+    solve_chebyshev(0, nt, dt, H, psi_0, out = out, max_vectors = 32)
+
+    e, v = np.linalg.eigh(H.toarray())
+    t = dt * np.arange(nt + 1)
+    out_expected = v @ (np.exp(-1j * np.outer(e, t)) * (v.conj().T @ psi_0)[:, None])
+    s_z_av_expected = np.einsum('it,it->t', out_expected.conj(), m.s_z @ out_expected).real
+
+    assert np.allclose(out, out_expected, rtol=1e-10, atol=1e-10), \
+        f"states do not match the ethalon"
+    assert np.allclose(psi, out_expected[:, -1], rtol=1e-10, atol=1e-10), \
+        f"final state does not match the ethalon"
+    assert np.allclose(s_z_av, s_z_av_expected, rtol=1e-10, atol=1e-10), \
+        f"s_z average does not match the ethalon"
+
+def test_chebyshev_max_vectors():
+    m, H = spin_boson_chain.hamiltonian(3, 1)
+    psi_0 = spin_boson_chain.initial_state(m)
+
+    # a single step needs more Chebyshev vectors than max_vectors:
+    # the truncated expansion would be wrong, so it is rejected
+    dt = 20 / abs(H).sum(axis = 0).max()
+    with pytest.raises(ValueError):
+        solve_chebyshev(0, 10, dt, H, psi_0, max_vectors = 32)
@@ -0,0 +1,94 @@
+import numpy as np
+import pytest
+from lightcones import models
+from lightcones.solvers.schrodinger import solve, solve_checkpointed, resume
+from .cases import spin_boson_chain
+
+class Killed(Exception):
+    pass
+
+@pytest.mark.parametrize("method", ['midpoint', 'krylov'])
+def test_checkpoint_resume(tmp_path, method):
+    m, H = spin_boson_chain.hamiltonian(3, 1)
+    psi_0 = spin_boson_chain.initial_state(m)
+
+    dt = 0.01
+    nt = 1000
+    path = str(tmp_path / 'state.npz')
+
+    # uninterrupted run
+    s_z_expected = np.zeros(nt // 10 + 1)
+    def eval_o(ti, psi, k):
+        s_z_expected[k] = np.vdot(psi, m.s_z @ psi).real
+
+    psi_expected = np.zeros(m.dimension, dtype = complex)
+    solve(0, nt, dt, H, psi_0, eval_o = eval_o, psi = psi_expected, schedule = 10, method = method)
+
+    # the job is killed at the step 550, the last checkpoint is at the step 400
+    s_z_av = np.zeros(nt // 10 + 1)
+    def eval_o(ti, psi, k):
+        if ti == 550:
+            raise Killed()
+        s_z_av[k] = np.vdot(psi, m.s_z @ psi).real
+
+    with pytest.raises(Killed):
+        solve_checkpointed(0, nt, dt, H, psi_0, path, every = 200, accumulators = {'s_z_av': s_z_av},
+                           eval_o = eval_o, schedule = 10, method = method)
+
+    # resume in a fresh process: the accumulator is restored from the checkpoint
+    s_z_av = np.zeros(nt // 10 + 1)
+    def eval_o(ti, psi, k):
+        s_z_av[k] = np.vdot(psi, m.s_z @ psi).real
+
+    psi = resume(path, H, eval_o = eval_o, accumulators = {'s_z_av': s_z_av})
+
+    assert np.array_equal(psi, psi_expected), \
+        f"resumed state is not identical to the uninterrupted one"
+    assert np.array_equal(s_z_av, s_z_expected), \
+        f"resumed s_z average is not identical to the uninterrupted one"
+
+def test_checkpoint_backward(tmp_path):
+    m, H = spin_boson_chain.hamiltonian(3, 0)
+    psi_0 = spin_boson_chain.initial_state(m)
+
+    dt = 0.01
+    nt = 300
+    # path may be a pathlib.Path as well
+    path = tmp_path / 'state.npz'
+
+    steps_expected = []
+    def eval_o(ti, psi, k):
+        steps_expected.append((ti, k))
+
+    psi_expected = np.zeros(m.dimension, dtype = complex)
+    solve(nt, 0, dt, H, psi_0, eval_o = eval_o, psi = psi_expected, schedule = 25)
+
+    steps = []
+    def eval_o(ti, psi, k):
+        steps.append((ti, k))
+
+    psi = solve_checkpointed(nt, 0, dt, H, psi_0, path, every = 70, eval_o = eval_o, schedule = 25)
+
+    assert not np.array_equal(psi, psi_0), \
+        f"backward propagation is not made"
+    assert np.array_equal(psi, psi_expected), \
+        f"checkpointed backward state is not identical to the uninterrupted one"
+    assert steps == steps_expected, \
+        f"observables are evaluated at wrong steps"
+
+def test_checkpoint_options(tmp_path):
+    m = models.spin_boson(2, 2)
+    H = (m.s_p @ m.s_m + m.a_dag[0] @ m.a[0]).tocsc()
+    psi_0 = spin_boson_chain.initial_state(m, flip = False)
+    path = str(tmp_path / 'state.npz')
+
+    # the options which the checkpoint cannot restore are rejected
+    for options in [{'h_diag': np.ones(m.dimension)}, {'precision': 'single'}, {'stats': True}]:
+        with pytest.raises(ValueError):
+            solve_checkpointed(0, 10, 0.01, H, psi_0, path, **options)
+
+    psi_expected = np.zeros(m.dimension, dtype = complex)
+    solve(0, 10, 0.01, H, psi_0, psi = psi_expected, anderson = 3, max_iter = 20)
+    psi = solve_checkpointed(0, 10, 0.01, H, psi_0, path, every = 3, anderson = 3, max_iter = 20)
+    assert np.array_equal(psi, psi_expected), \
+        f"checkpointed state is not identical to the uninterrupted one"
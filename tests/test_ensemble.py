@@ -0,0 +1,100 @@
+import numpy as np
+import pytest
+import lightcones.linalg as la
+from lightcones.linalg import mv
+from lightcones import models
+from lightcones.solvers.schrodinger import solve
+from .cases import spin_boson_chain
+
+def test_mv_block():
+    m = models.spin_boson(4, 3)
+    H = (m.s_x + m.s_p @ m.a[0] + m.a_dag[1] @ m.a[2]).tocsc()
+    rng = np.random.default_rng(1)
+    vin = rng.normal(size = (m.dimension, 3)) + 1j * rng.normal(size = (m.dimension, 3))
+    vout = rng.normal(size = (m.dimension, 3)) + 0j
+    vout_expected = 0.5j * H @ vin + 2 * vout
+    mv(H, vin, vout, cin = 0.5j, cout = 2)
+    assert np.allclose(vout, vout_expected, rtol=1e-12, atol=1e-12), \
+        f"vout does not match the ethalon"
+
+def test_solve_ensemble():
+    m, H = spin_boson_chain.hamiltonian(4)
+
+    dt = 0.01
+    nt = 300
+    n_traj = 3
+
+    psi_0 = spin_boson_chain.initial_state(m, flip = False)
+
+    # each trajectory is kicked by s_x at its own time step
+    kick_at = [50, 100, 150]
+
+    def f(ti):
+        return 0.1 * np.cos((ti + 0.5) * dt)
+
+    def apply_h(ti, psi_in, psi_out):
+        mv(H, psi_in, psi_out, cout = 1)
+        mv(m.s_x, psi_in, psi_out, cin = f(ti), cout = 1)
+
+    # serial propagation
+    s_z_av_expected = np.zeros((nt + 1, n_traj))
+    for k in range(n_traj):
+        def begin_step(ti, psi):
+            if ti == kick_at[k]:
+                psi[:] = m.s_x @ psi
+
+        def eval_o(ti, psi):
+            s_z_av_expected[ti, k] = np.vdot(psi, m.s_z @ psi).real
+
+        solve(0, nt, dt, apply_h, psi_0, begin_step = begin_step, eval_o = eval_o)
+
+    # block propagation
+    psi_0_block = np.tile(psi_0[:, None], (1, n_traj))
+
+    def begin_step(ti, psi):
+        for k in range(n_traj):
+            if ti == kick_at[k]:
+                psi[:, k] = m.s_x @ psi[:, k]
+
+    s_z_av = np.zeros((nt + 1, n_traj))
+    def eval_o(ti, psi):
+        s_z_av[ti, :] = np.einsum('ik,ik->k', psi.conj(), m.s_z @ psi).real
+
+    psi = np.zeros((m.dimension, n_traj), dtype = complex)
+    solve(0, nt, dt, apply_h, psi_0_block, begin_step = begin_step, eval_o = eval_o, psi = psi)
+
+    assert np.allclose(s_z_av, s_z_av_expected, rtol=1e-8, atol=1e-8), \
+        f"s_z average for the ensemble does not match the serial one"
+
+    # block propagation with the native Hamiltonian
+    psi_native = np.zeros((m.dimension, n_traj), dtype = complex)
+    solve(0, nt, dt, H, psi_0_block, psi = psi_native)
+
+    psi_expected = np.zeros(m.dimension, dtype = complex)
+    solve(0, nt, dt, H, psi_0, psi = psi_expected)
+
+    for k in range(n_traj):
+        assert np.allclose(psi_native[:, k], psi_expected, rtol=1e-10, atol=1e-10), \
+            f"psi for the native ensemble does not match the serial one"
+
+def test_mv_vout_checks():
+    m = models.spin_boson(2, 2)
+    A = m.s_x.tocsc()
+    vb = np.ones((m.dimension, 3), dtype = complex)
+    # the Fortran-ordered and the real outputs would be silently converted copies
+    for h in [A, A.tocsr(), la.multiterm([(1, A)])]:
+        with pytest.raises(ValueError):
+            la.mv(h, vb, np.zeros((3, m.dimension), dtype = complex).T)
+        with pytest.raises(ValueError):
+            la.mv(h, vb.real, np.zeros(vb.shape))
+    # the input is only read, so it is converted to the dtype of the output
+    v = np.arange(m.dimension, dtype = float)
+    for h in [A, A.tocsr(), la.multiterm([(1, A)])]:
+        w = np.zeros(m.dimension, dtype = complex)
+        la.mv(h, v, w)
+        assert np.allclose(w, A @ v, rtol=1e-12, atol=1e-12), \
+            f"vout for the real vin does not match the ethalon"
+    w = np.zeros(m.dimension, dtype = np.complex64)
+    la.mv(la.single(A), v, w)
+    assert np.allclose(w, A @ v, rtol=1e-6, atol=1e-6), \
+        f"complex64 vout for the real vin does not match the ethalon"
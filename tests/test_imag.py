@@ -0,0 +1,71 @@
+import numpy as np
+import pytest
+from lightcones.linalg import mv
+from lightcones import fock
+from lightcones.models import fermions_with_spin
+from lightcones.solvers.schrodinger import solve_imag
+from .cases import spin_boson_chain
+
+def test_solve_imag():
+    m, H = spin_boson_chain.hamiltonian(4)
+    H = (H - 0.5 * m.s_z).tocsc()
+
+    e, v = np.linalg.eigh(H.toarray())
+
+    psi_0 = np.ones(m.dimension, dtype = complex)
+
+    # native Hamiltonian
+    psi = np.zeros(m.dimension, dtype = complex)
+    energy, n_steps, psi_out = solve_imag(0, 10000, 0.1, H, psi_0, psi = psi, e_tol = 1e-12)
+
+    assert n_steps < 10000, \
+        f"energy has not converged"
+    assert abs(energy - e[0]) < 1e-8, \
+        f"energy does not match the ethalon"
+    assert psi_out is psi, \
+        f"solve_imag does not return the state"
+    assert abs(np.linalg.norm(psi) - 1) < 1e-12, \
+        f"state is not normalized"
+    assert abs(abs(np.vdot(v[:, 0], psi)) - 1) < 1e-6, \
+        f"state does not match the ground state"
+
+    # callback
+    energies = []
+    def apply_h(ti, psi_in, psi_out):
+        mv(H, psi_in, psi_out, cout = 1)
+
+    def eval_o(ti, psi):
+        energies.append(np.vdot(psi, H @ psi).real)
+
+    psi_cb = np.zeros(m.dimension, dtype = complex)
+    energy_cb, n_steps_cb, _ = solve_imag(0, 10000, 0.1, apply_h, psi_0, eval_o = eval_o, psi = psi_cb, e_tol = 1e-12)
+
+    assert n_steps_cb == n_steps and np.allclose(psi_cb, psi, rtol=1e-12, atol=1e-12), \
+        f"callback does not match the native Hamiltonian"
+    assert len(energies) == n_steps + 1 and np.all(np.diff(energies) <= 1e-12), \
+        f"energy does not decrease monotonically"
+
+    # the fixed-point iteration diverges for dt * ||H|| > 2
+    with pytest.raises(RuntimeError):
+        solve_imag(0, 10, 1.0, H, psi_0, max_iter = 50)
+
+def test_solve_imag_operators():
+    # the matrix-free operators are accepted as in solve
+    f = fock.space(statistics = 'Bose', num_modes = 3, max_total_occupation = 3)
+    quadratic = [(1.0, p, p) for p in range(3)] + [(0.4, p, p + 1) for p in range(2)] + [(0.4, p + 1, p) for p in range(2)]
+    h = f.matrix_free(quadratic = quadratic, lowering = [(0.3, 0)], raising = [(0.3, 0)])
+
+    f_lazy = fermions_with_spin(2, lazy = True)
+    k = f_lazy.n[0][0] @ f_lazy.n[1][0] + 0.5 * (f_lazy.a_dag[0][0] @ f_lazy.a[0][1] + f_lazy.a_dag[0][1] @ f_lazy.a[0][0]) \
+        + 0.5 * (f_lazy.a_dag[1][0] @ f_lazy.a[1][1] + f_lazy.a_dag[1][1] @ f_lazy.a[1][0])
+
+    for op in [h, k]:
+        H = op.tocsc()
+        psi_0 = np.ones(H.shape[0], dtype = complex)
+        energy_expected, n_expected, psi_expected = solve_imag(0, 200, 0.1, H, psi_0, e_tol = 0)
+        energy, n_steps, psi = solve_imag(0, 200, 0.1, op, psi_0, e_tol = 0)
+
+        assert n_steps == n_expected and abs(energy - energy_expected) < 1e-10, \
+            f"energy for the {type(op).__name__} Hamiltonian does not match the ethalon"
+        assert np.allclose(psi, psi_expected, rtol=1e-10, atol=1e-10), \
+            f"state for the {type(op).__name__} Hamiltonian does not match the ethalon"
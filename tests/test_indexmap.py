@@ -0,0 +1,47 @@
+import numpy as np
+import lightcones.linalg as la
+from lightcones import fock
+from lightcones.solvers.schrodinger import solve
+
+def test_indexmap():
+    for statistics, n_max in [('Bose', 3), ('Fermi', 2)]:
+        f = fock.space(statistics = statistics, num_modes = 4, max_total_occupation = n_max)
+        a, a_dag = f.annihilate, f.create
+
+        rng = np.random.default_rng(0)
+        t = rng.normal(size = (4, 4))
+        t = t + t.T
+        quadratic = [(t[q, p], q, p) for q in range(4) for p in range(4)]
+        h = f.matrix_free(quadratic = quadratic, lowering = [(0.3, 1)], raising = [(0.3, 1)])
+        H = (sum([c * a_dag[q] @ a[p] for c, q, p in quadratic]) + 0.3 * (a[1] + a_dag[1])).tocsc()
+
+        assert abs(h.tocsc() - H).max() < 1e-12, \
+            f"indexmap matrix does not match the ethalon"
+
+        # the omitted kinds of the terms are empty, also on the repeated calls
+        for _ in range(2):
+            h_q = f.matrix_free(quadratic = quadratic)
+            assert abs(h_q.tocsc() - (H - 0.3 * (a[1] + a_dag[1]))).max() < 1e-12, \
+                f"indexmap matrix of the quadratic terms does not match the ethalon"
+
+        v = rng.normal(size = f.dimension) + 1j * rng.normal(size = f.dimension)
+        w_0 = rng.normal(size = f.dimension) + 1j * rng.normal(size = f.dimension)
+        w = w_0.copy()
+        la.mv(h, v, w, cin = 2j, cout = -1)
+        assert np.allclose(w, 2j * H @ v - w_0, rtol=1e-12, atol=1e-12), \
+            f"indexmap mv does not match the ethalon"
+
+        vb = np.column_stack([v, w_0])
+        wb = np.zeros(vb.shape, dtype = complex)
+        la.mv(h, vb, wb)
+        assert np.allclose(wb, H @ vb, rtol=1e-12, atol=1e-12), \
+            f"indexmap block mv does not match the ethalon"
+
+        psi_0 = np.zeros(f.dimension, dtype = complex)
+        psi_0[0] = 1
+        psi_expected = np.zeros(f.dimension, dtype = complex)
+        solve(0, 200, 0.01, H, psi_0, psi = psi_expected)
+        psi = np.zeros(f.dimension, dtype = complex)
+        solve(0, 200, 0.01, h, psi_0, psi = psi)
+        assert np.allclose(psi, psi_expected, rtol=1e-10, atol=1e-10), \
+            f"psi does not match the ethalon"
@@ -0,0 +1,46 @@
+import numpy as np
+from lightcones import models
+from lightcones.solvers.schrodinger import solve
+from .cases import spin_boson_chain
+
+def test_interaction_picture():
+    m = models.spin_boson(4, 3)
+    w_q = 20
+    e_s = [20, 19.5, 19, 18.5]
+    D = (w_q * m.s_p @ m.s_m + sum([e_s[i] * m.a_dag[i] @ m.a[i] for i in range(4)])).tocsc()
+    V = (0.3 * (m.s_m @ m.a_dag[0] + m.s_p @ m.a[0]) \
+        + 0.2 * sum([m.a_dag[i + 1] @ m.a[i] + m.a_dag[i] @ m.a[i + 1] for i in range(3)])).tocsc()
+    H = (D + V).tocsc()
+
+    psi_0 = spin_boson_chain.initial_state(m)
+
+    t_max = 10
+    dt = 0.05
+    nt = int(round(t_max / dt))
+
+    e, v = np.linalg.eigh(H.toarray())
+    t = dt * np.arange(nt + 1)
+    psi_expected = v @ (np.exp(-1j * np.outer(e, t)) * (v.conj().T @ psi_0)[:, None])
+    s_z_expected = np.einsum('it,it->t', psi_expected.conj(), m.s_z @ psi_expected).real
+
+    s_z = np.zeros(nt + 1)
+    def eval_o(ti, psi):
+        s_z[ti] = np.vdot(psi, m.s_z @ psi).real
+
+    # the step is far too large for the midpoint rule with the full Hamiltonian (dt * w_q = 1),
+    # but the diagonal part is integrated analytically
+    psi = np.zeros(m.dimension, dtype = complex)
+    solve(0, nt, dt, V, psi_0, eval_o = eval_o, psi = psi, h_diag = D.diagonal().real)
+
+    assert np.allclose(psi, psi_expected[:, -1], rtol=1e-4, atol=1e-4), \
+        f"psi does not match the ethalon"
+    assert np.allclose(s_z, s_z_expected, rtol=1e-4, atol=1e-4), \
+        f"s_z average does not match the ethalon"
+
+    # ensemble mode
+    psi_0_block = np.column_stack([psi_0, m.s_z @ psi_0])
+    psi_block = np.zeros(psi_0_block.shape, dtype = complex)
+    solve(0, nt, dt, V, psi_0_block, psi = psi_block, h_diag = D.diagonal().real)
+
+    assert np.allclose(psi_block[:, 0], psi, rtol=1e-12, atol=1e-12), \
+        f"ensemble mode does not match the single trajectory"
@@ -0,0 +1,74 @@
+import numpy as np
+import lightcones.linalg as la
+from lightcones import fock
+from lightcones.models import fermions_with_spin
+from lightcones.solvers.schrodinger import solve
+
+def test_kron_operator():
+    f = fermions_with_spin(3)
+    f_lazy = fermions_with_spin(3, lazy = True)
+
+    # Hubbard-like site: hopping between the modes, interaction and spin flip
+    def hamiltonian(f):
+        H = 0.5 * f.n[0][0] @ f.n[1][0] - 0.3 * (f.n[0][1] + f.n[1][1])
+        for s in range(2):
+            H = H + f.a_dag[s][0] @ f.a[s][1] + f.a_dag[s][1] @ f.a[s][0]
+        return H + 0.2 * (f.a_dag[0][2] @ f.a[1][2] + f.a_dag[1][2] @ f.a[0][2])
+
+    H = hamiltonian(f).tocsc()
+    h = hamiltonian(f_lazy)
+    assert isinstance(h, la.kron_operator), \
+        f"lazy operators do not stay lazy"
+    assert abs(h.tocsc() - H).max() < 1e-12, \
+        f"kron_operator matrix does not match the ethalon"
+
+    rng = np.random.default_rng(0)
+    v = rng.normal(size = f.dimension) + 1j * rng.normal(size = f.dimension)
+    w_0 = rng.normal(size = f.dimension) + 1j * rng.normal(size = f.dimension)
+    w = w_0.copy()
+    la.mv(h, v, w, cin = 2j, cout = -1)
+    assert np.allclose(w, 2j * H @ v - w_0, rtol=1e-12, atol=1e-12), \
+        f"kron_operator mv does not match the ethalon"
+
+    vb = np.column_stack([v, w_0])
+    assert np.allclose(h @ vb, H @ vb, rtol=1e-12, atol=1e-12), \
+        f"kron_operator block product does not match the ethalon"
+
+    psi_0 = f.a_dag[0][0] @ f.vac()
+    psi_expected = np.zeros(f.dimension, dtype = complex)
+    solve(0, 200, 0.01, H, psi_0, psi = psi_expected)
+    psi = np.zeros(f.dimension, dtype = complex)
+    solve(0, 200, 0.01, h, psi_0, psi = psi)
+    assert np.allclose(psi, psi_expected, rtol=1e-10, atol=1e-10), \
+        f"psi does not match the ethalon"
+
+def test_space_kron_lazy():
+    f1 = fock.space(statistics = 'Fermi', num_modes = 2, max_total_occupation = 2)
+    f2 = fock.space(statistics = 'Fermi', num_modes = 3, max_total_occupation = 2)
+    s = fock.space_kron(f1, f2)
+    s_lazy = fock.space_kron(f1, f2, lazy = True)
+    for k in range(s.modes):
+        assert abs(s_lazy.annihilate[k].tocsc() - s.annihilate[k]).max() < 1e-12, \
+            f"lazy annihilation operator does not match"
+        assert abs(s_lazy.create[k].tocsc() - s.create[k]).max() < 1e-12, \
+            f"lazy creation operator does not match"
+
+    # Hamiltonian mixing the creation and annihilation operators with eye and the Pauli matrices
+    def hamiltonian(s):
+        return s.create[0] @ s.annihilate[2] + s.create[2] @ s.annihilate[0] + 0.5 * s.eye \
+            + 0.3 * s.sigma_z(0) - 0.2 * s.sigma_x(3) + s.sigma_y(1) @ s.sigma_y(4) + s.zero_op
+    H = hamiltonian(s).tocsc()
+    h = hamiltonian(s_lazy)
+    assert isinstance(h, la.kron_operator), \
+        f"lazy operators do not stay lazy"
+    assert abs(h.tocsc() - H).max() < 1e-12, \
+        f"lazy Hamiltonian does not match the ethalon"
+
+    psi_0 = np.zeros(s.dimension, dtype = complex)
+    psi_0[0] = 1
+    psi_expected = np.zeros(s.dimension, dtype = complex)
+    solve(0, 200, 0.01, H, psi_0, psi = psi_expected)
+    psi = np.zeros(s.dimension, dtype = complex)
+    solve(0, 200, 0.01, h, psi_0, psi = psi)
+    assert np.allclose(psi, psi_expected, rtol=1e-10, atol=1e-10), \
+        f"psi does not match the ethalon"
@@ -0,0 +1,89 @@
+import numpy as np
+from scipy.linalg import expm
+from lightcones.linalg import mv
+from lightcones.solvers.schrodinger import solve
+from lightcones.solvers.schrodinger import expm_krylov
+from .cases import spin_boson_chain
+
+def test_expm_krylov():
+    m, H = spin_boson_chain.hamiltonian(4)
+    psi_0 = spin_boson_chain.initial_state(m)
+
+    def apply(psi_in, psi_out):
+        mv(H, psi_in, psi_out, cout = 1)
+
+    tau = 0.7
+    psi = np.zeros(m.dimension, dtype = complex)
+    err, dim = expm_krylov(apply, psi_0, psi, tau, tol = 1e-12, max_dim = 40)
+
+    psi_expected = expm(-1j * tau * H.toarray()) @ psi_0
+
+    assert err < 1e-12, \
+        f"Krylov error estimate is too large"
+    assert np.allclose(psi, psi_expected, rtol=1e-10, atol=1e-10), \
+        f"psi does not match the ethalon"
+
+def test_solve_krylov():
+    m, H = spin_boson_chain.hamiltonian(4)
+    psi_0 = spin_boson_chain.initial_state(m)
+
+    # large step for time-independent Hamiltonian
+    dt = 0.5
+    nt = 20
+
+    def apply_h(ti, psi_in, psi_out):
+        mv(H, psi_in, psi_out, cout = 1)
+
+    s_z_av = []
+    def eval_o(ti, psi):
+        s_z_av.append(np.vdot(psi, m.s_z @ psi).real)
+
+    psi = np.zeros(m.dimension, dtype = complex)
+    solve(0, nt, dt, apply_h, psi_0, eval_o = eval_o, psi = psi, method = 'krylov')
+
+    U = expm(-1j * dt * H.toarray())
+    s_z_av_expected = []
+    psi_expected = psi_0
+    for ti in range(nt + 1):
+        s_z_av_expected.append(np.vdot(psi_expected, m.s_z @ psi_expected).real)
+        psi_expected = U @ psi_expected
+
+    assert np.allclose(s_z_av, s_z_av_expected, rtol=1e-8, atol=1e-8), \
+        f"s_z average does not match the ethalon"
+
+def test_solve_krylov_driven():
+    m, H = spin_boson_chain.hamiltonian(4)
+    psi_0 = spin_boson_chain.initial_state(m, flip = False)
+
+    def Ht(ti, dt):
+        return H + 0.1 * np.cos((ti + 0.5) * dt) * m.s_x
+
+    # reference: midpoint rule with a fine step
+    dt = 0.001
+    nt = 5000
+    s_z_av_expected = []
+
+    def apply_h(ti, psi_in, psi_out):
+        mv(Ht(ti, dt), psi_in, psi_out, cout = 1)
+
+    def eval_o(ti, psi):
+        if ti % 50 == 0:
+            s_z_av_expected.append(np.vdot(psi, m.s_z @ psi).real)
+
+    solve(0, nt, dt, apply_h, psi_0, eval_o = eval_o)
+
+    # Krylov propagator with a 50 times larger step
+    dt = 0.05
+    nt = 100
+    s_z_av = []
+
+    def apply_h(ti, psi_in, psi_out):
+        mv(Ht(ti, dt), psi_in, psi_out, cout = 1)
+
+    def eval_o(ti, psi):
+        s_z_av.append(np.vdot(psi, m.s_z @ psi).real)
+
+    solve(0, nt, dt, apply_h, psi_0, eval_o = eval_o, method = 'krylov')
+
+    assert np.allclose(s_z_av, s_z_av_expected, rtol=1e-4, atol=1e-4), \
+        f"s_z average does not match the ethalon"
@@ -0,0 +1,46 @@
+import numpy as np
+from lightcones.linalg import mv
+from lightcones.solvers.schrodinger import solve
+from .cases import spin_boson_chain
+
+def f(t):
+    return 0.5 * np.cos(1.3 * t)
+
+def propagate_cfm4(m, H, psi_0, f, dt, t_max):
+    nt = int(round(t_max / dt))
+
+    def apply_h(ti, s, psi_in, psi_out):
+        mv(H, psi_in, psi_out, cout = 1)
+        mv(m.s_x, psi_in, psi_out, cin = f((ti + s) * dt), cout = 1)
+
+    psi = np.zeros(m.dimension, dtype = complex)
+    solve(0, nt, dt, apply_h, psi_0, psi = psi, method = 'cfm4')
+    return psi
+
+def test_cfm4_order():
+    m, H = spin_boson_chain.hamiltonian(3, 1)
+    psi_0 = spin_boson_chain.initial_state(m, flip = False)
+    t_max = 10
+
+    # reference: midpoint rule with a fine step
+    dt = 0.0005
+    nt = int(round(t_max / dt))
+
+    def apply_h(ti, psi_in, psi_out):
+        mv(H, psi_in, psi_out, cout = 1)
+        mv(m.s_x, psi_in, psi_out, cin = f((ti + 0.5) * dt), cout = 1)
+
+    psi_expected = np.zeros(m.dimension, dtype = complex)
+    solve(0, nt, dt, apply_h, psi_0, psi = psi_expected)
+
+    psi_coarse = propagate_cfm4(m, H, psi_0, f, 0.2, t_max)
+    psi_fine = propagate_cfm4(m, H, psi_0, f, 0.1, t_max)
+    psi_finest = propagate_cfm4(m, H, psi_0, f, 0.05, t_max)
+
+    # fourth order: halving the step reduces the error 16 times
+    ratio = np.linalg.norm(psi_coarse - psi_fine) / np.linalg.norm(psi_fine - psi_finest)
+    assert 12 < ratio < 20, \
+        f"CFM4 is not of the fourth order"
+
+    assert np.allclose(psi_coarse, psi_expected, rtol=1e-5, atol=1e-5), \
+        f"psi does not match the ethalon"
@@ -0,0 +1,77 @@
+import numpy as np
+import lightcones.linalg as la
+from lightcones import models
+from lightcones.solvers.schrodinger import solve
+from .cases import spin_boson_chain
+
+def test_multiterm():
+    m = models.spin_boson(4, 3)
+    H_s = (m.s_p @ m.s_m).tocsc()
+    H_int = 0.3 * (m.s_m @ m.a_dag[0] + m.s_p @ m.a[0]).tocsc()
+    H_w = sum([m.a_dag[i] @ m.a[i] for i in range(4)]).tocsc()
+    h = la.multiterm([(1, H_s), (0.0, m.s_x), (1, H_int), (1, H_w)])
+
+    rng = np.random.default_rng(0)
+    v = rng.normal(size = m.dimension) + 1j * rng.normal(size = m.dimension)
+    w_0 = rng.normal(size = m.dimension) + 1j * rng.normal(size = m.dimension)
+
+    h.coef[1] = 0.7
+    H = H_s + 0.7 * m.s_x + H_int + H_w
+    w = w_0.copy()
+    la.mv(h, v, w, cin = 2j, cout = -1)
+    assert np.allclose(w, 2j * H @ v - w_0, rtol=1e-12, atol=1e-12), \
+        f"multiterm mv does not match the ethalon"
+
+    vb = np.column_stack([v, w_0])
+    wb = np.zeros(vb.shape, dtype = complex)
+    la.mv(h, vb, wb)
+    assert np.allclose(wb, H @ vb, rtol=1e-12, atol=1e-12), \
+        f"multiterm block mv does not match the ethalon"
+
+    # driven term updated in place by begin_step
+    dt = 0.01
+    nt = 300
+    def drive(ti):
+        return 0.5 * np.cos(0.1 * ti)
+
+    def begin_step(ti, psi):
+        h.coef[1] = drive(ti)
+
+    def apply_h(ti, psi_in, psi_out):
+        for c, o in [(1, H_s), (drive(ti), m.s_x), (1, H_int), (1, H_w)]:
+            la.mv(o, psi_in, psi_out, cin = c, cout = 1)
+
+    psi_0 = spin_boson_chain.initial_state(m, flip = False)
+
+    for method in ['midpoint', 'krylov']:
+        psi_expected = np.zeros(m.dimension, dtype = complex)
+        solve(0, nt, dt, apply_h, psi_0, psi = psi_expected, method = method)
+        psi = np.zeros(m.dimension, dtype = complex)
+        solve(0, nt, dt, h, psi_0, begin_step = begin_step, psi = psi, method = method)
+        assert np.allclose(psi, psi_expected, rtol=1e-10, atol=1e-10), \
+            f"psi does not match the ethalon"
+
+def test_multiterm_single():
+    m, H_0 = spin_boson_chain.hamiltonian(3, 0)
+    h = la.multiterm([(1, H_0), (0.0, m.s_x)])
+    dt = 0.01
+    nt = 300
+    def drive(ti):
+        return 0.5 * np.cos(0.1 * ti)
+
+    def begin_step(ti, psi):
+        h.coef[1] = drive(ti)
+
+    H_0_s = la.single(H_0)
+    s_x_s = la.single(m.s_x)
+    def apply_h(ti, psi_in, psi_out):
+        la.mv(H_0_s, psi_in, psi_out, cout = 1)
+        la.mv(s_x_s, psi_in, psi_out, cin = drive(ti), cout = 1)
+
+    psi_0 = spin_boson_chain.initial_state(m, flip = False)
+    psi_expected = np.zeros(m.dimension, dtype = np.complex64)
+    solve(0, nt, dt, apply_h, psi_0, psi = psi_expected, precision = 'single')
+    psi = np.zeros(m.dimension, dtype = np.complex64)
+    solve(0, nt, dt, h, psi_0, begin_step = begin_step, psi = psi, precision = 'single')
+    assert np.allclose(psi, psi_expected, rtol=1e-4, atol=1e-4), \
+        f"psi does not match the ethalon"
@@ -0,0 +1,57 @@
+import numpy as np
+import scipy.sparse
+import lightcones.linalg as la
+from lightcones import models
+
+def test_mv_csr():
+    m = models.spin_boson(4, 3)
+    A = (m.s_x + 0.5j * m.a_dag[0] @ m.a[1] + 0.3 * m.a_dag[2] @ m.s_m).tocsc()
+    A_csr = A.tocsr()
+    # s_p is not Hermitean, so the transposed product would not match
+    B = m.s_p.tocsc()
+    B_csr = scipy.sparse.csr_array(B)
+
+    rng = np.random.default_rng(0)
+    v = rng.normal(size = m.dimension) + 1j * rng.normal(size = m.dimension)
+    w_0 = rng.normal(size = m.dimension) + 1j * rng.normal(size = m.dimension)
+
+    num_threads = la.num_threads
+    try:
+        for n_threads in [1, 3, 8]:
+            la.set_num_threads(n_threads)
+            for cin, cout in [(1, 0), (2, 1), (0.5j, -1)]:
+                w = w_0.copy()
+                la.mv(A_csr, v, w, cin = cin, cout = cout)
+                w_csc = w_0.copy()
+                la.mv(A, v, w_csc, cin = cin, cout = cout)
+                assert np.allclose(w, cin * A @ v + cout * w_0, rtol=1e-12, atol=1e-12), \
+                    f"CSR mv does not match the ethalon"
+                assert np.allclose(w, w_csc, rtol=1e-12, atol=1e-12), \
+                    f"CSR mv does not match the CSC mv"
+                w = w_0.copy()
+                la.mv(B_csr, v, w, cin = cin, cout = cout)
+                assert np.allclose(w, cin * B @ v + cout * w_0, rtol=1e-12, atol=1e-12), \
+                    f"mv with csr_array does not match the ethalon"
+    finally:
+        la.set_num_threads(num_threads)
+
+    vb = np.column_stack([v, 1j * v, w_0])
+    wb = np.ones(vb.shape, dtype = complex)
+    la.mv(A_csr, vb, wb, cin = 2, cout = 1)
+    assert np.allclose(wb, 2 * A @ vb + 1, rtol=1e-12, atol=1e-12), \
+        f"CSR block mv does not match the ethalon"
+    wb = np.ones(vb.shape, dtype = complex)
+    la.mv(B_csr, vb, wb, cin = 2, cout = 1)
+    assert np.allclose(wb, 2 * B @ vb + 1, rtol=1e-12, atol=1e-12), \
+        f"CSR block mv with csr_array does not match the ethalon"
+
+def test_default_num_threads(monkeypatch):
+    for value, expected in [('4', 4), ('4,2', 4), (' 3 ,1', 3), ('', None), ('x', None), ('0', None)]:
+        monkeypatch.setenv('OMP_NUM_THREADS', value)
+        n = la.default_num_threads()
+        if expected is None:
+            assert n >= 1, \
+                f"invalid OMP_NUM_THREADS does not fall back to the number of the processors"
+        else:
+            assert n == expected, \
+                f"number of the threads does not match OMP_NUM_THREADS"
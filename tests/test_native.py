@@ -0,0 +1,58 @@
+import numpy as np
+import pytest
+from concurrent.futures import ThreadPoolExecutor
+from lightcones import models
+from lightcones.solvers.schrodinger import solve, solve_native, propagator
+from .cases import spin_boson_chain
+
+def test_native():
+    m, H = spin_boson_chain.hamiltonian(4)
+    observables = [m.s_z, m.s_x, (m.a_dag[0] @ m.a[0]).tocsc()]
+
+    dt = 0.01
+    nt = 400
+
+    rng = np.random.default_rng(0)
+    psi_0s = []
+    for _ in range(6):
+        psi_0 = rng.normal(size = m.dimension) + 1j * rng.normal(size = m.dimension)
+        psi_0s.append(psi_0 / np.linalg.norm(psi_0))
+
+    def reference(psi_0):
+        avg = []
+        def eval_o(ti, psi):
+            avg.append([np.vdot(psi, o @ psi) for o in observables])
+        solve(0, nt, dt, H, psi_0.copy(), eval_o = eval_o, schedule = 50)
+        return np.array(avg).T
+
+    def trajectory(psi_0):
+        return solve_native(0, nt, dt, H, psi_0.copy(), observables, schedule = 50)
+
+    with ThreadPoolExecutor(max_workers = 3) as pool:
+        results = list(pool.map(trajectory, psi_0s))
+
+    for psi_0, avg in zip(psi_0s, results):
+        assert avg.shape == (len(observables), nt // 50 + 1), \
+            f"wrong shape of the averages"
+        assert np.allclose(avg, reference(psi_0), rtol=1e-12, atol=1e-12), \
+            f"averages do not match the callback solver"
+
+def test_native_max_iter():
+    m = models.spin_boson(2, 2)
+    H = (10 * m.s_x).tocsc()
+    psi_0 = spin_boson_chain.initial_state(m, flip = False)
+
+    # dt * ||H|| = 10: the fixed-point iteration diverges and would never stop without the cap
+    with pytest.warns(RuntimeWarning):
+        avg = solve_native(0, 5, 1.0, H, psi_0, [m.s_z], max_iter = 50)
+    assert avg.shape == (1, 6), \
+        f"wrong shape of the averages"
+
+    with pytest.raises(ValueError):
+        solve_native(0, 5, 1.0, H, psi_0, [m.s_z], max_iter = 0)
+
+    # the same cap stops the native segments of propagator
+    with pytest.warns(RuntimeWarning):
+        steps = [ti for ti, _ in propagator(0, 5, 1.0, H, psi_0, schedule = 5, max_iter = 50)]
+    assert steps == [0, 5], \
+        f"propagator yields wrong steps"
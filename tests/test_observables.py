@@ -0,0 +1,56 @@
+import numpy as np
+import scipy.sparse
+from lightcones.solvers.schrodinger import solve, solve_native
+from .cases import spin_boson_chain
+
+def test_observables():
+    m, H = spin_boson_chain.hamiltonian(4)
+
+    psi_0 = spin_boson_chain.initial_state(m)
+
+    # sparse and diagonal observables in an arbitrary order
+    n_0 = (m.a_dag[0] @ m.a[0]).diagonal().real
+    observables = [m.s_x, n_0, m.s_z, (m.a_dag[1] @ m.a[0]).tocsc()]
+
+    dt = 0.01
+    nt = 300
+    schedule = 25
+
+    expected = []
+    def eval_o(ti, psi):
+        expected.append([np.vdot(psi, m.s_x @ psi), np.vdot(psi, n_0 * psi),
+                         np.vdot(psi, m.s_z @ psi), np.vdot(psi, m.a_dag[1] @ (m.a[0] @ psi))])
+    expected_psi = np.zeros(m.dimension, dtype = complex)
+    solve(0, nt, dt, H, psi_0, eval_o = eval_o, psi = expected_psi, schedule = schedule)
+    expected = np.array(expected).T
+
+    averages = np.zeros((len(observables), nt // schedule + 1), dtype = complex)
+    psi = np.zeros(m.dimension, dtype = complex)
+    solve(0, nt, dt, H, psi_0, psi = psi, schedule = schedule, observables = observables, averages = averages)
+
+    assert np.allclose(averages, expected, rtol=1e-12, atol=1e-12), \
+        f"averages do not match the ethalon"
+    assert np.allclose(psi, expected_psi, rtol=1e-12, atol=1e-12), \
+        f"psi does not match the ethalon"
+
+    # together with eval_o and a callback Hamiltonian
+    steps = []
+    def eval_o(ti, psi):
+        steps.append(ti)
+    def apply_h(ti, psi_in, psi_out):
+        psi_out += H @ psi_in
+    averages[:] = 0
+    solve(0, nt, dt, apply_h, psi_0, eval_o = eval_o, schedule = schedule, observables = observables, averages = averages)
+
+    assert steps == list(range(0, nt + 1, schedule)), \
+        f"wrong schedule of eval_o"
+    assert np.allclose(averages, expected, rtol=1e-10, atol=1e-10), \
+        f"averages do not match the ethalon"
+
+    assert np.allclose(solve_native(0, nt, dt, H, psi_0, observables, schedule = schedule), expected, rtol=1e-12, atol=1e-12), \
+        f"averages of solve_native do not match the ethalon"
+
+    # csc_array observables are sparse observables as well
+    observables_array = [scipy.sparse.csc_array(o) if scipy.sparse.issparse(o) else o for o in observables]
+    assert np.allclose(solve_native(0, nt, dt, H, psi_0, observables_array, schedule = schedule), expected, rtol=1e-12, atol=1e-12), \
+        f"averages of the csc_array observables do not match the ethalon"
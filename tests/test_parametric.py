@@ -0,0 +1,42 @@
+import numpy as np
+import lightcones.linalg as la
+from lightcones.solvers.schrodinger import solve
+from .cases import spin_boson_chain
+
+def test_parametric():
+    m, H_0 = spin_boson_chain.hamiltonian(3, 1)
+
+    dt = 0.01
+    nt = 1000
+
+    def f(ti):
+        return 0.5 * np.cos(1.3 * (ti + 0.5) * dt)
+
+    H = la.parametric([(1, H_0), (f, m.s_x), (0.1j, m.a_dag[2] @ m.a[1] - m.a_dag[1] @ m.a[2])])
+
+    H_expected = H_0 + f(7) * m.s_x + 0.1j * (m.a_dag[2] @ m.a[1] - m.a_dag[1] @ m.a[2])
+    assert abs(H.update(7) - H_expected).max() < 1e-14, \
+        f"parametric matrix does not match the ethalon"
+    assert abs(H.set([2, 0, 0]) - 2 * H_0).max() < 1e-14, \
+        f"parametric matrix does not match the ethalon"
+
+    psi_0 = spin_boson_chain.initial_state(m, flip = False)
+
+    # reference: callback applying the terms one by one
+    def apply_h(ti, psi_in, psi_out):
+        la.mv(H_0, psi_in, psi_out, cout = 1)
+        la.mv(m.s_x, psi_in, psi_out, cin = f(ti), cout = 1)
+        la.mv(m.a_dag[2] @ m.a[1] - m.a_dag[1] @ m.a[2], psi_in, psi_out, cin = 0.1j, cout = 1)
+
+    psi_expected = np.zeros(m.dimension, dtype = complex)
+    solve(0, nt, dt, apply_h, psi_0, psi = psi_expected)
+
+    # the native Hamiltonian updated in place by begin_step
+    def begin_step(ti, psi):
+        H.update(ti)
+
+    psi = np.zeros(m.dimension, dtype = complex)
+    solve(0, nt, dt, H.m, psi_0, begin_step = begin_step, psi = psi)
+
+    assert np.allclose(psi, psi_expected, rtol=1e-12, atol=1e-12), \
+        f"psi does not match the ethalon"
@@ -0,0 +1,108 @@
+import functools
+import numpy as np
+from lightcones.solvers.schrodinger import solve
+from .cases import spin_boson_chain
+
+def test_schedule():
+    m, H = spin_boson_chain.hamiltonian(3, 1)
+    psi_0 = spin_boson_chain.initial_state(m)
+    dt = 0.01
+    nt = 1000
+
+    s_z_all = np.zeros(nt + 1)
+    def eval_o(ti, psi):
+        s_z_all[ti] = np.vdot(psi, m.s_z @ psi).real
+
+    solve(0, nt, dt, H, psi_0, eval_o = eval_o)
+
+    for method in ['midpoint', 'krylov', 'chebyshev', 'adaptive']:
+        # stride: the callback receives the index of the schedule entry
+        steps = []
+        s_z = np.zeros(nt // 100 + 1)
+        def eval_o(ti, psi, k):
+            steps.append(ti)
+            s_z[k] = np.vdot(psi, m.s_z @ psi).real
+
+        solve(0, nt, dt, H, psi_0, eval_o = eval_o, schedule = 100, method = method)
+
+        assert steps == list(range(0, nt + 1, 100)), \
+            f"observables are evaluated at wrong steps ({method})"
+        assert np.allclose(s_z, s_z_all[:: 100], rtol=1e-4, atol=1e-4), \
+            f"s_z average does not match the ethalon ({method})"
+
+        # explicit list, eval_a = 0 drops the initial step, legacy two-argument callback
+        steps = []
+        def eval_o(ti, psi):
+            steps.append(ti)
+
+        solve(0, nt, dt, H, psi_0, eval_o = eval_o, schedule = [0, 7, 500, nt], eval_a = 0, method = method)
+
+        assert steps == [7, 500, nt], \
+            f"observables are evaluated at wrong steps ({method})"
+
+def test_schedule_ensemble():
+    m, H = spin_boson_chain.hamiltonian(3, 1)
+    psi_0 = spin_boson_chain.initial_state(m)
+    dt = 0.01
+    nt = 200
+
+    psi_0 = np.column_stack([psi_0, m.s_z @ psi_0])
+
+    s_z_all = np.zeros((nt + 1, 2))
+    def eval_o(ti, psi):
+        s_z_all[ti] = np.einsum('it,it->t', psi.conj(), m.s_z @ psi).real
+
+    solve(0, nt, dt, H, psi_0, eval_o = eval_o)
+
+    s_z = np.zeros((3, 2))
+    def eval_o(ti, psi, k):
+        s_z[k] = np.einsum('it,it->t', psi.conj(), m.s_z @ psi).real
+
+    solve(0, nt, dt, H, psi_0, eval_o = eval_o, schedule = [10, 20, nt])
+
+    assert np.allclose(s_z, s_z_all[[10, 20, nt]], rtol=1e-12, atol=1e-12), \
+        f"s_z average does not match the ethalon"
+
+def test_schedule_callback_kinds():
+    m, H = spin_boson_chain.hamiltonian(3, 1)
+    psi_0 = spin_boson_chain.initial_state(m)
+    dt = 0.01
+    nt = 100
+
+    s_z_all = np.zeros(nt + 1)
+    def eval_o(ti, psi):
+        s_z_all[ti] = np.vdot(psi, m.s_z @ psi).real
+
+    solve(0, nt, dt, H, psi_0, eval_o = eval_o)
+
+    class Recorder:
+        def __init__(self):
+            self.s_z = np.zeros(nt + 1)
+        def __call__(self, ti, psi):
+            self.s_z[ti] = np.vdot(psi, m.s_z @ psi).real
+
+    def record(s_z, ti, psi):
+        s_z[ti] = np.vdot(psi, m.s_z @ psi).real
+
+    s_z_default = np.zeros(nt + 1)
+    def record_default(ti, psi, s_z = s_z_default):
+        s_z[ti] = np.vdot(psi, m.s_z @ psi).real
+
+    s_z_args = np.zeros(nt + 1)
+    def record_args(ti, psi, *args):
+        assert len(args) == 0, \
+            f"the index of the schedule entry is passed to the callback with *args"
+        s_z_args[ti] = np.vdot(psi, m.s_z @ psi).real
+
+    # the callbacks without the explicit third positional parameter are called as eval_o(ti, psi)
+    for method in ['midpoint', 'krylov']:
+        recorder = Recorder()
+        s_z_partial = np.zeros(nt + 1)
+        s_z_default[:] = 0
+        s_z_args[:] = 0
+        for callback in [recorder, functools.partial(record, s_z_partial), record_default, record_args]:
+            solve(0, nt, dt, H, psi_0, eval_o = callback, method = method)
+
+        for s_z in [recorder.s_z, s_z_partial, s_z_default, s_z_args]:
+            assert np.allclose(s_z, s_z_all, rtol=1e-4, atol=1e-4), \
+                f"s_z average does not match the ethalon ({method})"
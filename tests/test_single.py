@@ -0,0 +1,108 @@
+import numpy as np
+import pytest
+import lightcones.linalg as la
+from lightcones import models
+from lightcones.solvers.schrodinger import solve
+from .cases import spin_boson_chain
+
+def test_mv_single():
+    m = models.spin_boson(3, 3)
+    A = (m.s_x + 0.5j * m.a_dag[0] @ m.a[1]).tocsc()
+    A_s = la.single(A)
+    assert A_s.dtype == np.complex64 and A_s.indices.dtype == np.int32, \
+        f"wrong dtype of the single precision matrix"
+
+    rng = np.random.default_rng(0)
+    v = (rng.normal(size = m.dimension) + 1j * rng.normal(size = m.dimension)).astype(np.complex64)
+    w = np.ones(m.dimension, dtype = np.complex64)
+    la.mv(A_s, v, w, cin = 2, cout = 1)
+    assert w.dtype == np.complex64 and np.allclose(w, 2 * A @ v + 1, rtol=1e-5, atol=1e-5), \
+        f"single precision mv does not match the ethalon"
+
+    vb = np.column_stack([v, 1j * v])
+    wb = np.zeros(vb.shape, dtype = np.complex64)
+    la.mv(A_s, vb, wb)
+    assert np.allclose(wb, A @ vb, rtol=1e-5, atol=1e-5), \
+        f"single precision block mv does not match the ethalon"
+
+def test_solve_single():
+    m, H = spin_boson_chain.hamiltonian(3, 1)
+    psi_0 = spin_boson_chain.initial_state(m)
+
+    dt = 0.01
+    nt = 2000
+
+    s_z_expected = np.zeros(nt + 1)
+    def eval_o(ti, psi):
+        s_z_expected[ti] = np.vdot(psi, m.s_z @ psi).real
+
+    psi_expected = np.zeros(m.dimension, dtype = complex)
+    solve(0, nt, dt, H, psi_0, eval_o = eval_o, psi = psi_expected)
+
+    H_s = la.single(H)
+    s_z_m = la.single(m.s_z)
+    s_z = np.zeros(nt + 1)
+    def eval_o(ti, psi):
+        s_z[ti] = np.vdot(psi, s_z_m @ psi).real
+
+    # native single precision Hamiltonian
+    psi = np.zeros(m.dimension, dtype = np.complex64)
+    solve(0, nt, dt, H_s, psi_0, eval_o = eval_o, psi = psi, precision = 'single')
+    assert np.allclose(psi, psi_expected, rtol=1e-4, atol=1e-4), \
+        f"single precision state does not match the ethalon"
+    assert np.allclose(s_z, s_z_expected, rtol=1e-4, atol=1e-4), \
+        f"single precision s_z average does not match the ethalon"
+    assert abs(np.linalg.norm(psi.astype(complex)) - 1) < 1e-6, \
+        f"state is not renormalized"
+
+    # callback with the single precision mv
+    def apply_h(ti, psi_in, psi_out):
+        la.mv(H_s, psi_in, psi_out, cout = 1)
+
+    psi_cb = np.zeros(m.dimension, dtype = np.complex64)
+    solve(0, nt, dt, apply_h, psi_0, psi = psi_cb, precision = 'single')
+    assert np.allclose(psi_cb, psi, rtol=1e-5, atol=1e-5), \
+        f"single precision callback does not match the native Hamiltonian"
+
+def test_single_renorm():
+    m, H = spin_boson_chain.hamiltonian(3, 1)
+    psi_0 = spin_boson_chain.initial_state(m)
+    H_s = la.single(H)
+
+    # accuracy envelope documented in solve
+    psi_expected = np.zeros(m.dimension, dtype = complex)
+    solve(0, 10000, 0.01, H, psi_0, psi = psi_expected)
+    psi = np.zeros(m.dimension, dtype = np.complex64)
+    solve(0, 10000, 0.01, H_s, psi_0, psi = psi, precision = 'single')
+    assert np.abs(psi - psi_expected).max() < 3e-5, \
+        f"single precision state does not match the ethalon"
+
+    # the norm changes made by begin_step are not undone by the renormalization
+    def begin_step(ti, psi):
+        if ti % 150 == 0:
+            psi *= 0.8
+
+    psi_expected = np.zeros(m.dimension, dtype = complex)
+    solve(0, 1000, 0.01, H, psi_0, begin_step = begin_step, psi = psi_expected)
+    psi = np.zeros(m.dimension, dtype = np.complex64)
+    solve(0, 1000, 0.01, H_s, psi_0, begin_step = begin_step, psi = psi, precision = 'single', renorm_every = 10)
+    assert abs(np.linalg.norm(psi_expected) - 0.8**7) < 1e-5, \
+        f"norm of the ethalon is not changed by begin_step"
+    assert np.allclose(psi, psi_expected, rtol=1e-5, atol=1e-5), \
+        f"single precision state does not match the ethalon"
+
+def test_single_max_iter():
+    m, H = spin_boson_chain.hamiltonian(3, 1)
+    psi_0 = spin_boson_chain.initial_state(m)
+    H_s = la.single(100 * H)
+
+    # dt * ||H|| ~ 5: the plain iteration diverges and is stopped by the cap
+    # (a few steps only, so that the diverging iterates stay in the single precision range)
+    psi = np.zeros(m.dimension, dtype = np.complex64)
+    with pytest.warns(RuntimeWarning):
+        stats = solve(0, 3, 0.01, H_s, psi_0, psi = psi, precision = 'single', max_iter = 10, stats = True)
+    assert stats.n_capped == 3 and stats.n_iter.max() == 10, \
+        f"wrong diagnostics of the capped steps"
+
+    with pytest.raises(ValueError):
+        solve(0, 3, 0.01, H_s, psi_0, psi = psi, precision = 'single', anderson = 3)
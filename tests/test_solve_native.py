@@ -0,0 +1,78 @@
+import numpy as np
+import scipy.sparse
+from lightcones.linalg import mv
+from lightcones.solvers.schrodinger import solve
+from .cases import spin_boson_chain
+
+def test_solve_native():
+    m, Hs, V, Hb = spin_boson_chain.terms(4)
+    psi_0 = spin_boson_chain.initial_state(m)
+    H = (Hs + V + Hb).tocsc()
+    dt = 0.01
+    nt = 500
+
+    def apply_h(ti, psi_in, psi_out):
+        mv(H, psi_in, psi_out, cout = 1)
+
+    psi_expected = np.zeros(m.dimension, dtype = complex)
+    solve(0, nt, dt, apply_h, psi_0, psi = psi_expected)
+
+    psi = np.zeros(m.dimension, dtype = complex)
+    solve(0, nt, dt, H, psi_0, psi = psi)
+
+    assert np.allclose(psi, psi_expected, rtol=1e-12, atol=1e-12), \
+        f"psi for the native Hamiltonian does not match the callback one"
+
+    psi_terms = np.zeros(m.dimension, dtype = complex)
+    solve(0, nt, dt, [(1, Hs), (0.5, 2 * V), (1.0 + 0j, Hb)], psi_0, psi = psi_terms)
+
+    assert np.allclose(psi_terms, psi_expected, rtol=1e-10, atol=1e-10), \
+        f"psi for the list of terms does not match the callback one"
+
+    # csc_array is accepted as a native Hamiltonian as well
+    for method in ['midpoint', 'krylov']:
+        psi_matrix = np.zeros(m.dimension, dtype = complex)
+        solve(0, nt, dt, H, psi_0, psi = psi_matrix, method = method)
+        psi_array = np.zeros(m.dimension, dtype = complex)
+        solve(0, nt, dt, scipy.sparse.csc_array(H), psi_0, psi = psi_array, method = method)
+        assert np.allclose(psi_array, psi_matrix, rtol=1e-12, atol=1e-12), \
+            f"psi for the csc_array Hamiltonian does not match the csc_matrix one"
+
+def test_solve_native_begin_step():
+    m, Hs, V, Hb = spin_boson_chain.terms(4)
+    psi_0 = spin_boson_chain.initial_state(m)
+    dt = 0.01
+    nt = 500
+
+    def f(ti):
+        return 0.1 * np.cos((ti + 0.5) * dt)
+
+    def apply_h(ti, psi_in, psi_out):
+        mv(Hs + V + Hb + f(ti) * m.s_x, psi_in, psi_out, cout = 1)
+
+    s_z_av_expected = []
+    def eval_o(ti, psi):
+        s_z_av_expected.append(np.vdot(psi, m.s_z @ psi).real)
+
+    solve(0, nt, dt, apply_h, psi_0, eval_o = eval_o)
+
+    # the drive is updated in place in the data of the native Hamiltonian:
+    # the sparsity pattern of H0 + s_x is fixed
+    H0 = (Hs + V + Hb).tocsc()
+    H = (H0 + m.s_x).tocsc()
+    rows = H.indices
+    cols = np.repeat(np.arange(m.dimension), np.diff(H.indptr))
+    H0_data = np.asarray(H0[rows, cols]).flatten()
+    s_x_data = np.asarray(m.s_x[rows, cols]).flatten()
+
+    def begin_step(ti, psi):
+        H.data[:] = H0_data + f(ti) * s_x_data
+
+    s_z_av = []
+    def eval_o(ti, psi):
+        s_z_av.append(np.vdot(psi, m.s_z @ psi).real)
+
+    solve(0, nt, dt, H, psi_0, begin_step = begin_step, eval_o = eval_o)
+
+    assert np.allclose(s_z_av, s_z_av_expected, rtol=1e-10, atol=1e-10), \
+        f"s_z average does not match the ethalon"
@@ -0,0 +1,35 @@
+import numpy as np
+from lightcones import models
+from lightcones.solvers.schrodinger import solve
+from .cases import spin_boson_chain
+
+def test_split():
+    m = models.spin_boson(4, 3)
+    D = (2 * m.s_p @ m.s_m + sum([(2 - 0.1 * i) * m.a_dag[i] @ m.a[i] for i in range(4)])).tocsc()
+    V = (0.3 * (m.s_m @ m.a_dag[0] + m.s_p @ m.a[0]) \
+        + 0.2 * sum([m.a_dag[i + 1] @ m.a[i] + m.a_dag[i] @ m.a[i + 1] for i in range(3)])).tocsc()
+    H = (D + V).tocsc()
+
+    psi_0 = spin_boson_chain.initial_state(m)
+
+    t_max = 10
+    e, v = np.linalg.eigh(H.toarray())
+    psi_expected = v @ (np.exp(-1j * e * t_max) * (v.conj().T @ psi_0))
+
+    for order, taylor_order in [(2, 4), (4, 6)]:
+        err = []
+        for dt in [0.2, 0.1]:
+            nt = int(round(t_max / dt))
+            psi = np.zeros(m.dimension, dtype = complex)
+            stats = solve(0, nt, dt, V, psi_0, psi = psi, h_diag = D.diagonal().real, method = 'split',
+                          split_order = order, taylor_order = taylor_order, stats = True)
+            err.append(np.linalg.norm(psi - psi_expected))
+
+            # fixed number of the hopping applications per step
+            assert stats.n_apply == nt * taylor_order * (1 if order == 2 else 3), \
+                f"wrong number of the Hamiltonian applications"
+
+        assert 0.8 * 2**order < err[0] / err[1] < 1.2 * 2**order, \
+            f"split-operator method is not of the order {order}"
+        assert err[1] < 1e-4, \
+            f"psi does not match the ethalon"
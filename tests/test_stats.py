@@ -0,0 +1,49 @@
+import numpy as np
+from lightcones.linalg import mv
+from lightcones.solvers.schrodinger import solve, solve_stats
+from .cases import spin_boson_chain
+
+def test_stats():
+    m, H = spin_boson_chain.hamiltonian(3, 1)
+    psi_0 = spin_boson_chain.initial_state(m)
+
+    dt = 0.01
+    nt = 500
+
+    n_calls = [0, 0]
+    def apply_h(ti, psi_in, psi_out):
+        n_calls[0] += 1
+        mv(H, psi_in, psi_out, cout = 1)
+
+    def eval_o(ti, psi, k):
+        n_calls[1] += 1
+
+    stats = solve_stats()
+    result = solve(0, nt, dt, apply_h, psi_0, eval_o = eval_o, schedule = 10, stats = stats)
+
+    assert result is stats, \
+        f"solve does not return the statistics object"
+    assert stats.n_iter.size == nt and stats.n_iter.min() >= 1, \
+        f"wrong per-step iteration counts"
+    assert stats.n_apply == n_calls[0] == stats.n_iter.sum(), \
+        f"number of the Hamiltonian applications does not match"
+    assert stats.n_eval_o == n_calls[1] == nt // 10 + 1, \
+        f"number of the eval_o calls does not match"
+    assert 0 < stats.err_max < dt**3 and stats.err_mean <= stats.err_max, \
+        f"final errors of the fixed-point iteration are out of the tolerance"
+    assert stats.time_total >= stats.time_apply_h + stats.time_eval_o > 0, \
+        f"wrong wall time split"
+    assert np.array_equal(stats.slow_steps(stats.n_iter.max()), np.flatnonzero(stats.n_iter == stats.n_iter.max())), \
+        f"wrong slow steps"
+
+    # native Hamiltonian: the same iterations without calling back to python
+    stats_native = solve(0, nt, dt, H, psi_0, stats = True)
+    assert np.array_equal(stats_native.n_iter, stats.n_iter), \
+        f"iteration counts of the native Hamiltonian do not match"
+    assert stats_native.n_apply == stats.n_apply and stats_native.time_apply_h == 0, \
+        f"wrong counters for the native Hamiltonian"
+
+    # methods without the fixed-point iteration count the Hamiltonian applications only
+    stats_krylov = solve(0, nt, dt, H, psi_0, method = 'krylov', stats = True)
+    assert stats_krylov.n_apply > 0 and stats_krylov.n_iter.size == 0, \
+        f"wrong counters for the 'krylov' method"
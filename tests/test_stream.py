@@ -0,0 +1,52 @@
+import asyncio
+import numpy as np
+from lightcones.solvers.schrodinger import solve, propagator
+from .cases import spin_boson_chain
+
+def test_stream():
+    m, H = spin_boson_chain.hamiltonian(4)
+
+    psi_0 = spin_boson_chain.initial_state(m)
+
+    dt = 0.01
+    nt = 300
+    schedule = 20
+
+    expected = {}
+    def eval_o(ti, psi):
+        expected[ti] = psi.copy()
+    solve(0, nt, dt, H, psi_0, eval_o = eval_o, schedule = schedule)
+
+    def apply_h(ti, psi_in, psi_out):
+        psi_out += H @ psi_in
+
+    for h in [H, apply_h]:
+        # interrupted and continued iteration
+        p = propagator(0, nt, dt, h, psi_0, schedule = schedule)
+        states = {}
+        for ti, psi in p:
+            states[ti] = psi.copy()
+            if ti == 100:
+                break
+        for ti, psi in p:
+            states[ti] = psi.copy()
+
+        assert sorted(states) == sorted(expected), \
+            f"wrong steps of the propagator"
+        for ti in expected:
+            assert np.allclose(states[ti], expected[ti], rtol=1e-10, atol=1e-10), \
+                f"state does not match the ethalon"
+
+        async def consume():
+            states = {}
+            async for ti, psi in propagator(0, nt, dt, h, psi_0, schedule = schedule):
+                states[ti] = np.vdot(psi, m.s_z @ psi).real
+                await asyncio.sleep(0)
+            return states
+
+        s_z = asyncio.run(consume())
+        assert sorted(s_z) == sorted(expected), \
+            f"wrong steps of the asynchronous propagator"
+        for ti in expected:
+            assert abs(s_z[ti] - np.vdot(expected[ti], m.s_z @ expected[ti]).real) < 1e-10, \
+                f"average does not match the ethalon"
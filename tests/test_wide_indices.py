@@ -0,0 +1,66 @@
+import numpy as np
+import pytest
+import scipy.sparse
+import lightcones.linalg as la
+from lightcones import fock
+from lightcones.solvers.schrodinger import solve
+from .cases import spin_boson_chain
+
+def wide(m):
+    m = scipy.sparse.csc_matrix(m, dtype = complex, copy = True)
+    m.indices = m.indices.astype(np.int64)
+    m.indptr = m.indptr.astype(np.int64)
+    return m
+
+def test_wide_indices():
+    m, H = spin_boson_chain.hamiltonian(3, 0)
+    H_w = wide(H)
+
+    rng = np.random.default_rng(0)
+    v = rng.normal(size = m.dimension) + 1j * rng.normal(size = m.dimension)
+    w_0 = rng.normal(size = m.dimension) + 1j * rng.normal(size = m.dimension)
+    vb = np.column_stack([v, w_0])
+
+    for h in [H_w, H_w.tocsr(), la.multiterm([(1, H_w)])]:
+        w = w_0.copy()
+        la.mv(h, v, w, cin = 2j, cout = -1)
+        assert np.allclose(w, 2j * H @ v - w_0, rtol=1e-12, atol=1e-12), \
+            f"mv with the 64-bit indices does not match the ethalon"
+        wb = np.zeros(vb.shape, dtype = complex)
+        la.mv(h, vb, wb)
+        assert np.allclose(wb, H @ vb, rtol=1e-12, atol=1e-12), \
+            f"block mv with the 64-bit indices does not match the ethalon"
+
+    h_s = la.single(H_w)
+    assert h_s.indices.dtype == np.int32, \
+        f"single does not narrow the indices which fit into int32"
+    w_s = np.zeros(m.dimension, dtype = np.complex64)
+    la.mv(wide(h_s).astype(np.complex64), v.astype(np.complex64), w_s)
+    assert np.allclose(w_s, H @ v, rtol=1e-5, atol=1e-5), \
+        f"single precision mv with the 64-bit indices does not match the ethalon"
+
+    # the compiled loop is 32-bit: solve applies the matrix by mv instead
+    psi_0 = spin_boson_chain.initial_state(m, flip = False)
+    psi_expected = np.zeros(m.dimension, dtype = complex)
+    solve(0, 200, 0.01, H, psi_0, psi = psi_expected)
+    psi = np.zeros(m.dimension, dtype = complex)
+    solve(0, 200, 0.01, H_w, psi_0, psi = psi)
+    assert np.allclose(psi, psi_expected, rtol=1e-12, atol=1e-12), \
+        f"psi does not match the ethalon"
+
+    mixed = H.copy()
+    mixed.indptr = mixed.indptr.astype(np.int64)
+    with pytest.raises(ValueError):
+        la.mv(mixed, v, w_0)
+
+def test_outer_wide_indices():
+    f = fock.space(statistics = 'Bose', num_modes = 3, max_total_occupation = 2)
+    expected = [[[f.outer(p, q, k).toarray() for q in range(3)] for p in range(3)] for k in range(3)]
+    f.annihilate = [wide(a) for a in f.annihilate]
+    f.create = [wide(a) for a in f.create]
+    ops = f.local_projections_f(f, 3, 2, None)
+    for k in range(3):
+        for p in range(3):
+            for q in range(3):
+                assert np.allclose(ops[k][p][q].toarray(), expected[k][p][q]), \
+                    f"local projection with the 64-bit indices does not match"